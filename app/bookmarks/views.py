@@ -2,6 +2,7 @@ from django.shortcuts import render
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
+from django.db import transaction
 from .models import Bookmark
 from recipes.models import Recipe
 from users.models import User
@@ -31,7 +32,9 @@ class BookmarkToggleView(APIView):
             )
             
         except Bookmark.DoesNotExist:
-            Bookmark.objects.create(user=user, recipe=recipe)
+            # 북마크와 레시피 카운터를 한 트랜잭션에서 저장
+            with transaction.atomic():
+                Bookmark.objects.create(user=user, recipe=recipe)
             message = "즐겨찾기 등록"
             status_value = 1
             
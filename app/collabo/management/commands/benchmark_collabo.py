@@ -0,0 +1,259 @@
+import json
+import math
+import random
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings, setup_databases, teardown_databases
+
+from collabo.models import Interaction
+from collabo.utils.recommend_cache import invalidate_all_recommend
+from collabo.utils.save_similary import (
+    save_all_recipe_similarities,
+    update_pending_similarities,
+)
+from collabo.utils.shard_utils import iter_sharded_neighbor_rows
+from collabo.utils.similarity_engine import load_ingredient_matrix
+from collabo.utils.similary_utils import get_recommend_recipes
+from ingredients.models import Ingredient
+from recipes.models import Recipe, Recipe_ingredient, Unit
+from users.models import User
+
+# 측정 중 버전 키/추천 캐시를 실제 캐시 디렉터리에 쓰지 않도록 프로세스 메모리 캐시 사용
+BENCHMARK_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "coordination": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+class Command(BaseCommand):
+    help = (
+        "가상 카탈로그를 만들어 유사도 계산/저장/추천 시간을 측정하고 JSON lines 로 출력합니다. "
+        "측정은 별도의 테스트 DB 에서 진행되고 끝나면 삭제됩니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000,50000")
+        parser.add_argument("--ingredients", type=int, default=2000)
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", default=None, help="결과를 이어 쓸 파일 경로")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+        commit = get_commit()
+
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with tempfile.TemporaryDirectory() as store_dir, override_settings(
+                # 벤치마크용 이웃 파일과 캐시가 실제 파일/캐시를 덮어쓰지 않도록 분리
+                SIMILARITY_STORE_PATH=f"{store_dir}/neighbors.bin",
+                CACHES=BENCHMARK_CACHES,
+            ):
+                for size in sizes:
+                    rng = random.Random(options["seed"])
+                    users = create_catalog(rng, size, options)
+                    for result in run_benchmarks(rng, users, options):
+                        result.update(
+                            {"commit": commit, "recipes": size, "workers": options["workers"]}
+                        )
+                        self.write_result(result, options["output"])
+                    clear_catalog()
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def write_result(self, result, output):
+        line = json.dumps(result, ensure_ascii=False)
+        self.stdout.write(line)
+        if output:
+            with open(output, "a") as f:
+                f.write(line + "\n")
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def reset_peak_rss():
+    # 리눅스 4.0 이상에서 clear_refs 에 5 를 쓰면 최대 RSS(VmHWM)가 현재 RSS 로 초기화됨
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def read_peak_rss_kb():
+    # 마지막 초기화 이후 이 프로세스의 최대 RSS (KB)
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    return None
+
+
+def children_peak_rss_kb():
+    # ru_maxrss 는 종료된 자식 프로세스 전체의 최댓값이라 초기화할 수 없음 (리눅스 단위는 KB)
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+
+class QueryCounter:
+    # SQL 문자열을 쌓아두지 않고 실행 횟수만 셈 (bulk insert 가 메모리 측정을 흐리지 않도록)
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def measure(stage, result):
+    """
+    단계별 실행 시간, 쿼리 수, 최대 메모리를 result 에 기록합니다.
+    peak_rss_kb 는 단계 시작 때 최대 RSS 를 초기화하고 잰 값이라 앞 단계의 최대치가 섞이지 않습니다.
+    workers_peak_rss_kb 는 이 단계에서 자식 프로세스의 최대치가 새로 커졌을 때만 기록합니다.
+    """
+    counter = QueryCounter()
+    can_reset = reset_peak_rss()
+    children_before = children_peak_rss_kb()
+    with connection.execute_wrapper(counter):
+        started = time.perf_counter()
+        yield result
+        result["seconds"] = round(time.perf_counter() - started, 4)
+    children_after = children_peak_rss_kb()
+    result["stage"] = stage
+    result["queries"] = counter.count
+    result["peak_rss_kb"] = read_peak_rss_kb() if can_reset else None
+    result["workers_peak_rss_kb"] = children_after if children_after > children_before else None
+
+
+def ingredient_counts(rng, size):
+    # 레시피당 재료 수: 중앙값 8개 정도의 로그정규 분포 (2 ~ 30개)
+    return [
+        min(30, max(2, round(rng.lognormvariate(math.log(8), 0.45))))
+        for _ in range(size)
+    ]
+
+
+def create_catalog(rng, size, options):
+    users = User.objects.bulk_create(
+        [
+            User(social_id=f"bench-{i}", nickname=f"bench-{i}", age=20, gender=False)
+            for i in range(options["users"])
+        ]
+    )
+    unit, _ = Unit.objects.get_or_create(id=1, defaults={"unit": "g"})
+    ingredients = Ingredient.objects.bulk_create(
+        [Ingredient(name=f"재료{i}") for i in range(options["ingredients"])]
+    )
+    # 재료 인기도는 Zipf 분포 (순위 r 의 가중치 1 / r^1.05)
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, len(ingredients) + 1):
+        total += 1 / rank**1.05
+        cum_weights.append(total)
+
+    recipes = Recipe.objects.bulk_create(
+        [
+            Recipe(user=users[i % len(users)], title=f"레시피{i}", category=i % 4 + 1)
+            for i in range(size)
+        ],
+        batch_size=5000,
+    )
+    recipe_ingredients = []
+    for recipe, count in zip(recipes, ingredient_counts(rng, size)):
+        chosen = set()
+        while len(chosen) < count:
+            chosen.update(
+                rng.choices(ingredients, cum_weights=cum_weights, k=count - len(chosen))
+            )
+        recipe_ingredients.extend(
+            Recipe_ingredient(recipe=recipe, ingredient=ingredient, unit=unit, quantity=1)
+            for ingredient in chosen
+        )
+    Recipe_ingredient.objects.bulk_create(recipe_ingredients, batch_size=5000)
+
+    # 사용자마다 최근 클릭 30개
+    Interaction.objects.bulk_create(
+        [
+            Interaction(user=user, recipe=rng.choice(recipes))
+            for user in users
+            for _ in range(30)
+        ],
+        batch_size=5000,
+    )
+    return users
+
+
+def clear_catalog():
+    Interaction.objects.all().delete()
+    Recipe.objects.all().delete()
+    Ingredient.objects.all().delete()
+    User.objects.filter(social_id__startswith="bench-").delete()
+
+
+def run_benchmarks(rng, users, options):
+    workers = options["workers"]
+
+    with measure("calculate", {}) as result:
+        matrix = load_ingredient_matrix()
+        rows = sum(
+            len(neighbors)
+            for _, neighbors in iter_sharded_neighbor_rows(matrix, workers=workers)
+        )
+        result["neighbor_rows"] = rows
+    yield result
+
+    with measure("save", {}) as result:
+        generation = save_all_recipe_similarities(workers=workers)
+        result["rows_written"] = generation.row_count
+    yield result
+
+    # 새 레시피 10개를 대기열에 넣고 증분 반영
+    ingredients = list(Ingredient.objects.order_by("?")[:50])
+    author = users[0]
+    for i in range(10):
+        recipe = Recipe.objects.create(user=author, title=f"신규{i}", category=1)
+        Recipe_ingredient.objects.bulk_create(
+            [
+                Recipe_ingredient(recipe=recipe, ingredient=ingredient, unit_id=1)
+                for ingredient in rng.sample(ingredients, 8)
+            ]
+        )
+    with measure("incremental", {}) as result:
+        result["recipes_updated"] = update_pending_similarities()
+    yield result
+
+    latencies = []
+    with measure("recommend", {}) as result:
+        for _ in range(options["repeat"]):
+            # 캐시에 남은 순위가 아니라 매번 계산하는 시간을 측정
+            invalidate_all_recommend()
+            for user in users:
+                started = time.perf_counter()
+                similar_recipes, updated_recipes = get_recommend_recipes(user.id)
+                # 뷰에서처럼 결과를 평가 (나머지 목록은 앞부분만)
+                list(similar_recipes)
+                if updated_recipes is not None:
+                    list(updated_recipes[:100])
+                latencies.append(time.perf_counter() - started)
+    calls = len(latencies)
+    result["calls"] = calls
+    result["queries_per_call"] = round(result.get("queries", 0) / calls, 2) if calls else 0
+    result["median_ms"] = round(statistics.median(latencies) * 1000, 3)
+    result["p95_ms"] = round(sorted(latencies)[int(calls * 0.95) - 1] * 1000, 3)
+    yield result
@@ -0,0 +1,17 @@
+from collabo.utils.partition_utils import compact_partitions
+from common.utils.command_utils import IntervalCommand
+
+
+class Command(IntervalCommand):
+    help = (
+        "--keep-months 달 이전의 Interaction 파티션을 일별 집계(InteractionRollup)로 합치고 "
+        "원본 파티션을 삭제합니다."
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--keep-months", type=int, default=3)
+
+    def run_once(self, **options):
+        for name in compact_partitions(options["keep_months"]):
+            self.stdout.write(f"{name} 집계 후 삭제 완료")
@@ -0,0 +1,14 @@
+from collabo.utils.partition_utils import create_future_partitions
+from common.utils.command_utils import IntervalCommand
+
+
+class Command(IntervalCommand):
+    help = "Interaction 월별 파티션을 이번 달부터 --months 달 뒤까지 미리 만듭니다."
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--months", type=int, default=3)
+
+    def run_once(self, **options):
+        for name in create_future_partitions(options["months"]):
+            self.stdout.write(f"{name} 파티션 생성 완료")
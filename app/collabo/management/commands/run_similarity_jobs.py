@@ -0,0 +1,42 @@
+from collabo.utils.job_utils import (
+    claim_similarity_job,
+    enqueue_similarity_job,
+    run_similarity_job,
+)
+from common.utils.command_utils import IntervalCommand
+
+
+class Command(IntervalCommand):
+    help = "대기 중인 레시피 유사도 전체 재계산 작업을 실행합니다."
+    interval_help = "0보다 크면 대기열을 이 간격(초)으로 계속 확인합니다."
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="실행 전에 재계산 작업을 하나 등록합니다.",
+        )
+
+    def handle(self, *args, **options):
+        if options["enqueue"]:
+            enqueue_similarity_job()
+        super().handle(*args, **options)
+
+    def run_once(self, **options):
+        # 작업을 하나 실행했으면 True 를 반환해서 쉬지 않고 다음 작업을 확인
+        job = claim_similarity_job()
+        if job is None:
+            return False
+
+        self.stdout.write(f"유사도 재계산 작업 {job.id} 시작")
+        try:
+            job = run_similarity_job(job, workers=options["workers"])
+        except Exception as e:
+            self.stderr.write(f"유사도 재계산 작업 {job.id} 실패: {e}")
+        else:
+            self.stdout.write(
+                f"유사도 재계산 작업 {job.id} 완료 (세대 {job.generation_id})"
+            )
+        return True
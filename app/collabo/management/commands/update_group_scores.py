@@ -0,0 +1,15 @@
+from collabo.utils.score_utils import refresh_group_scores
+from common.utils.command_utils import IntervalCommand
+
+
+class Command(IntervalCommand):
+    help = "최근 조회 기록으로 그룹별 레시피 인기 점수(Score)를 다시 계산합니다."
+    interval_help = "0보다 크면 이 간격(초)으로 계속 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--days", type=int, default=None)
+
+    def run_once(self, **options):
+        count = refresh_group_scores(options["days"])
+        self.stdout.write(f"{count}개 레시피 점수 저장 완료")
@@ -0,0 +1,27 @@
+from collabo.utils.neighbor_store import flush_neighbor_store_export
+from collabo.utils.save_similary import update_pending_similarities
+from common.utils.command_utils import IntervalCommand
+
+
+class Command(IntervalCommand):
+    help = "Updated_recipe 대기열에 있는 레시피의 유사도만 계산해서 반영합니다."
+    interval_help = "0보다 크면 대기열을 이 간격(초)으로 계속 확인합니다."
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def run_once(self, **options):
+        # 대기열이 빌 때까지 batch 단위로 처리
+        total = 0
+        while True:
+            count = update_pending_similarities(options["batch_size"])
+            total += count
+            if count < options["batch_size"]:
+                break
+
+        if total:
+            self.stdout.write(f"{total}개 레시피 유사도 반영 완료")
+
+        # 아직 이웃 파일에 반영하지 못한 증분 결과가 있으면 내보냄 (한 번만 실행할 때는 바로)
+        flush_neighbor_store_export(force=options["interval"] <= 0)
@@ -0,0 +1,48 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from collabo.utils.minhash import build_lsh_index, build_signatures, candidate_similarity_row
+from collabo.utils.similarity_engine import load_ingredient_matrix, select_neighbors
+
+
+class Command(BaseCommand):
+    help = "MinHash/LSH 이웃이 정확한 계산 결과의 상위 이웃을 얼마나 찾는지(recall) 확인합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sample", type=int, default=500)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        matrix = load_ingredient_matrix()
+        recipe_ids = list(matrix.recipe_ids)
+        random.Random(options["seed"]).shuffle(recipe_ids)
+        sample = recipe_ids[: options["sample"]]
+
+        started = time.perf_counter()
+        signatures = build_signatures(matrix)
+        index = build_lsh_index(signatures)
+        index_seconds = time.perf_counter() - started
+
+        found = expected = candidate_count = 0
+        for recipe_id in sample:
+            exact = select_neighbors(
+                recipe_id, matrix.similarity_row(matrix.row_index[recipe_id])
+            )
+            signature = signatures.get(recipe_id)
+            candidates = index.candidates(signature) if signature else set()
+            approx = select_neighbors(
+                recipe_id, candidate_similarity_row(matrix, recipe_id, candidates)
+            )
+            expected += len(exact)
+            found += len({i for i, _ in exact} & {i for i, _ in approx})
+            candidate_count += len(candidates)
+
+        recall = found / expected if expected else 1.0
+        self.stdout.write(
+            f"recipes={len(matrix)} sample={len(sample)} "
+            f"recall={recall:.4f} "
+            f"avg_candidates={candidate_count / max(len(sample), 1):.1f} "
+            f"index_seconds={index_seconds:.2f}"
+        )
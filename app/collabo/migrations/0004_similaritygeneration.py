@@ -0,0 +1,61 @@
+# Generated by Django 5.0.14 on 2026-10-18 15:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def assign_legacy_generation(apps, schema_editor):
+    # 기존 유사도 행은 첫 번째 세대로 묶어서 다음 재계산 때 교체되도록 함
+    SimilarityGeneration = apps.get_model("collabo", "SimilarityGeneration")
+    RecipeSimilarity = apps.get_model("collabo", "RecipeSimilarity")
+    if not RecipeSimilarity.objects.exists():
+        return
+    # 예전 재계산은 같은 쌍을 여러 번 저장했으므로 (recipe, similar_recipe) 마다 가장 최근 행만 남김
+    # (중복이 남아 있으면 추천 점수를 합칠 때 같은 이웃이 여러 번 더해짐)
+    newer = RecipeSimilarity.objects.filter(
+        generation__isnull=True,
+        recipe_id=OuterRef("recipe_id"),
+        similar_recipe_id=OuterRef("similar_recipe_id"),
+        id__gt=OuterRef("id"),
+    )
+    RecipeSimilarity.objects.filter(Exists(newer), generation__isnull=True).delete()
+    generation = SimilarityGeneration.objects.create(status="active")
+    RecipeSimilarity.objects.filter(generation__isnull=True).update(
+        generation=generation
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collabo', '0003_group_alter_interaction_recipe_and_more'),
+        ('recipes', '0016_updated_recipe'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarityGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('status', models.CharField(choices=[('building', '작성 중'), ('active', '사용 중'), ('retired', '교체됨')], default='building', max_length=10)),
+                ('recipe_count', models.PositiveIntegerField(default=0)),
+                ('row_count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='recipesimilarity',
+            name='generation',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='collabo.similaritygeneration'),
+        ),
+        migrations.AddIndex(
+            model_name='recipesimilarity',
+            index=models.Index(fields=['generation', 'recipe', '-similarity_score'], name='collabo_sim_generation_idx'),
+        ),
+        migrations.RunPython(assign_legacy_generation, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collabo', '0004_similaritygeneration'),
+        ('recipes', '0016_updated_recipe'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeMinHash',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='recipes.recipe')),
+                ('signature', models.BinaryField()),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
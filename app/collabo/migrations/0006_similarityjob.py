@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collabo', '0005_recipeminhash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarityJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('status', models.CharField(choices=[('queued', '대기'), ('running', '진행 중'), ('done', '완료'), ('failed', '실패')], default='queued', max_length=10)),
+                ('total_shards', models.PositiveIntegerField(default=0)),
+                ('done_shards', models.PositiveIntegerField(default=0)),
+                ('message', models.TextField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(null=True)),
+                ('finished_at', models.DateTimeField(null=True)),
+                ('generation', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='collabo.similaritygeneration')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collabo', '0006_similarityjob'),
+        ('recipes', '0016_updated_recipe'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interaction',
+            index=models.Index(fields=['user', '-id'], name='collabo_interaction_user_idx'),
+        ),
+    ]
@@ -0,0 +1,160 @@
+# Generated by Django 5.0.14 on 2026-10-18 13:40
+
+from datetime import date
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# collabo_interaction 을 created_at 기준 월별 RANGE 파티션 테이블로 바꿈
+# 파티션 테이블의 기본 키에는 파티션 키가 들어가야 하므로 (id, created_at) 로 변경하고,
+# 파티션 테이블에는 IDENTITY 컬럼을 쓸 수 없으므로 id 는 시퀀스 기본값으로 채움
+PARTITION_TABLE_SQL = """
+ALTER TABLE collabo_interaction RENAME TO collabo_interaction_old;
+ALTER INDEX collabo_interaction_user_idx RENAME TO collabo_interaction_old_user_idx;
+ALTER TABLE collabo_interaction_old ALTER COLUMN id DROP IDENTITY;
+
+CREATE SEQUENCE collabo_interaction_id_seq;
+CREATE TABLE collabo_interaction (
+    id bigint NOT NULL DEFAULT nextval('collabo_interaction_id_seq'),
+    created_at timestamp with time zone NOT NULL,
+    updated_at timestamp with time zone NOT NULL,
+    type varchar(255) NOT NULL,
+    recipe_id bigint NOT NULL,
+    user_id bigint NOT NULL,
+    group_id bigint NULL,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+ALTER SEQUENCE collabo_interaction_id_seq OWNED BY collabo_interaction.id;
+CREATE TABLE collabo_interaction_default PARTITION OF collabo_interaction DEFAULT;
+"""
+
+FINISH_TABLE_SQL = """
+SELECT setval(
+    'collabo_interaction_id_seq',
+    COALESCE((SELECT MAX(id) FROM collabo_interaction), 0) + 1,
+    false
+);
+DROP TABLE collabo_interaction_old;
+"""
+
+# 원래 테이블과 같은 이름의 인덱스와 외래 키
+TABLE_INDEXES_SQL = """
+CREATE INDEX collabo_interaction_user_idx ON collabo_interaction (user_id, id DESC);
+CREATE INDEX collabo_interaction_recipe_id_1bb05525 ON collabo_interaction (recipe_id);
+CREATE INDEX collabo_interaction_group_id_c813e90f ON collabo_interaction (group_id);
+ALTER TABLE collabo_interaction
+    ADD CONSTRAINT collabo_interaction_recipe_id_1bb05525_fk_recipes_recipe_id
+    FOREIGN KEY (recipe_id) REFERENCES recipes_recipe (id) DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE collabo_interaction
+    ADD CONSTRAINT collabo_interaction_user_id_a01faa44_fk_users_user_id
+    FOREIGN KEY (user_id) REFERENCES users_user (id) DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE collabo_interaction
+    ADD CONSTRAINT collabo_interaction_group_id_c813e90f_fk_collabo_group_id
+    FOREIGN KEY (group_id) REFERENCES collabo_group (id) DEFERRABLE INITIALLY DEFERRED;
+"""
+
+
+# 되돌릴 때는 0007 의 일반 테이블(IDENTITY id)로 다시 만들고 남아 있는 기록을 복사
+# 이미 InteractionRollup 으로 합쳐진 달은 사용자 정보가 없어서 원래 기록으로 되돌릴 수 없으므로
+# 되돌리면 그 달의 조회 기록(집계)은 사라짐
+PLAIN_TABLE_SQL = """
+ALTER TABLE collabo_interaction RENAME TO collabo_interaction_partitioned;
+DROP INDEX collabo_interaction_user_idx;
+DROP INDEX collabo_interaction_recipe_id_1bb05525;
+DROP INDEX collabo_interaction_group_id_c813e90f;
+ALTER SEQUENCE collabo_interaction_id_seq RENAME TO collabo_interaction_partitioned_id_seq;
+
+CREATE TABLE collabo_interaction (
+    id bigint NOT NULL PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY,
+    created_at timestamp with time zone NOT NULL,
+    updated_at timestamp with time zone NOT NULL,
+    type varchar(255) NOT NULL,
+    recipe_id bigint NOT NULL,
+    user_id bigint NOT NULL,
+    group_id bigint NULL
+);
+INSERT INTO collabo_interaction (id, created_at, updated_at, type, recipe_id, user_id, group_id)
+SELECT id, created_at, updated_at, type, recipe_id, user_id, group_id
+FROM collabo_interaction_partitioned;
+SELECT setval(
+    pg_get_serial_sequence('collabo_interaction', 'id'),
+    COALESCE((SELECT MAX(id) FROM collabo_interaction), 0) + 1,
+    false
+);
+DROP TABLE collabo_interaction_partitioned;
+"""
+
+
+def add_months(day, months):
+    year, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + year, month + 1, 1)
+
+
+def partition_interaction(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(PARTITION_TABLE_SQL)
+
+        # 기존 기록이 있는 달부터 다음 두 달까지 월별 파티션을 만들고 기록 복사
+        cursor.execute("SELECT MIN(created_at)::date FROM collabo_interaction_old")
+        first_day = cursor.fetchone()[0] or date.today()
+        month = first_day.replace(day=1)
+        last_month = add_months(date.today(), 2)
+        while month <= last_month:
+            cursor.execute(
+                f"CREATE TABLE collabo_interaction_p{month:%Y%m} "
+                f"PARTITION OF collabo_interaction "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            )
+            month = add_months(month, 1)
+
+        cursor.execute(
+            "INSERT INTO collabo_interaction "
+            "(id, created_at, updated_at, type, recipe_id, user_id, group_id) "
+            "SELECT id, created_at, updated_at, type, recipe_id, user_id, group_id "
+            "FROM collabo_interaction_old"
+        )
+        cursor.execute(FINISH_TABLE_SQL)
+        cursor.execute(TABLE_INDEXES_SQL)
+
+
+def unpartition_interaction(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        # 파티션 테이블을 만들 때 이전 테이블의 기본 키 이름과 겹쳐서 이름이 자동으로 정해졌으므로 찾아서 지움
+        # (새 테이블의 기본 키가 원래 이름인 collabo_interaction_pkey 를 쓸 수 있도록)
+        cursor.execute(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = 'collabo_interaction'::regclass AND contype = 'p'"
+        )
+        primary_key = cursor.fetchone()[0]
+        cursor.execute(f"ALTER TABLE collabo_interaction DROP CONSTRAINT {primary_key}")
+        cursor.execute(PLAIN_TABLE_SQL)
+        cursor.execute(TABLE_INDEXES_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collabo', '0007_interaction_user_idx'),
+        ('recipes', '0017_recipestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InteractionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('day', models.DateField()),
+                ('type', models.CharField(default='Click', max_length=255)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('group', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='collabo.group')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='recipes.recipe')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='interactionrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'recipe', 'group', 'type'), name='collabo_rollup_unique', nulls_distinct=False),
+        ),
+        migrations.RunPython(partition_interaction, unpartition_interaction),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collabo', '0008_interaction_partitioning'),
+        ('recipes', '0017_recipestats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['group', '-score', 'recipe'], name='collabo_score_group_idx'),
+        ),
+    ]
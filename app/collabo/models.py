@@ -39,15 +39,78 @@ class Interaction(CommonDateModel):
 
     type = models.CharField(max_length=255, default="Click")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-id"], name="collabo_interaction_user_idx"),
+        ]
+
+
+class InteractionRollup(CommonDateModel):
+    # 오래된 Interaction 파티션을 (일, 레시피, 그룹, 종류) 단위로 합친 집계 (원본 파티션은 삭제됨)
+    day = models.DateField()
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, null=True)
+    type = models.CharField(max_length=255, default="Click")
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "recipe", "group", "type"],
+                name="collabo_rollup_unique",
+                nulls_distinct=False,
+            ),
+        ]
+
 
 class Score(CommonDateModel):
+    # 그룹별 레시피 인기 점수 (group 이 없는 행은 전체 사용자 기준), update_group_scores 로 갱신
 
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)
     group = models.ForeignKey(Group, on_delete=models.CASCADE, null=True)
     score = models.PositiveBigIntegerField()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["group", "-score", "recipe"], name="collabo_score_group_idx"
+            ),
+        ]
+
+
+class SimilarityGeneration(CommonDateModel):
+    STATUS_CHOICES = [
+        ("building", "작성 중"),
+        ("active", "사용 중"),
+        ("retired", "교체됨"),
+    ]
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="building")
+    recipe_count = models.PositiveIntegerField(default=0)
+    row_count = models.PositiveBigIntegerField(default=0)
+
+
+class SimilarityJob(CommonDateModel):
+    STATUS_CHOICES = [
+        ("queued", "대기"),
+        ("running", "진행 중"),
+        ("done", "완료"),
+        ("failed", "실패"),
+    ]
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    total_shards = models.PositiveIntegerField(default=0)
+    done_shards = models.PositiveIntegerField(default=0)
+    generation = models.ForeignKey(
+        SimilarityGeneration, on_delete=models.SET_NULL, null=True
+    )
+    message = models.TextField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+
 
 class RecipeSimilarity(CommonDateModel):
+    generation = models.ForeignKey(
+        SimilarityGeneration, on_delete=models.CASCADE, null=True
+    )
     recipe = models.ForeignKey(
         Recipe, related_name="recipe_id", on_delete=models.CASCADE
     )
@@ -55,3 +118,17 @@ class RecipeSimilarity(CommonDateModel):
         Recipe, related_name="similarities", on_delete=models.CASCADE
     )
     similarity_score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["generation", "recipe", "-similarity_score"],
+                name="collabo_sim_generation_idx",
+            ),
+        ]
+
+
+class RecipeMinHash(CommonDateModel):
+    recipe = models.OneToOneField(Recipe, on_delete=models.CASCADE, primary_key=True)
+    # uint32 MinHash 서명 배열
+    signature = models.BinaryField()
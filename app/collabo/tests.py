@@ -1,3 +1,508 @@
-from django.test import TestCase
+import importlib
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.db import IntegrityError, OperationalError, connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from collabo.models import Group, Interaction, InteractionRollup, RecipeSimilarity, Score, SimilarityGeneration, SimilarityJob
+from collabo.utils import interaction_utils, job_utils, neighbor_store
+from collabo.utils.interaction_buffer import InteractionBuffer
+from collabo.utils.generation_utils import publish_generation
+from collabo.utils.interaction_utils import get_recent_interactions
+from collabo.utils.job_utils import (
+    JobHeartbeat,
+    claim_similarity_job,
+    enqueue_similarity_job,
+    fail_stale_similarity_jobs,
+    run_similarity_job,
+)
+from collabo.utils.score_utils import get_group_top_recipe_ids, refresh_group_scores
+from collabo.utils.similary_utils import compute_recommend_recipe_ids
+from collabo.utils.partition_utils import (
+    DEFAULT_PARTITION,
+    add_months,
+    compact_partitions,
+    create_future_partitions,
+    create_partition,
+    list_partitions,
+    partition_name,
+)
+from collabo.utils.neighbor_store import (
+    NeighborStore,
+    export_neighbor_store,
+    get_neighbor_store,
+    get_store_neighbors,
+)
+from collabo.utils.similarity_engine import IngredientMatrix, select_neighbors
+from config.test_settings import TEST_CACHES
+from recipes.models import Recipe, RecipeStats, Updated_recipe
+from users.models import User
+
+
+class IngredientMatrixTests(SimpleTestCase):
+    def setUp(self):
+        self.matrix = IngredientMatrix(
+            {
+                1: {10, 11, 12},
+                2: {10, 11},
+                3: {12, 13},
+                4: {14},
+            }
+        )
+
+    def test_similarity_row_is_jaccard_of_overlapping_rows(self):
+        row = self.matrix.similarity_row(self.matrix.row_index[1])
+        # 자기 자신도 포함되고, 재료가 겹치지 않는 4번은 없음
+        self.assertEqual(row, {1: 1.0, 2: round(2 / 3, 4), 3: 0.25})
+
+    def test_row_without_overlap_only_contains_itself(self):
+        self.assertEqual(self.matrix.similarity_row(self.matrix.row_index[4]), {4: 1.0})
+
+    def test_select_neighbors_excludes_self_and_low_scores(self):
+        row = {1: 1.0, 2: 0.5, 3: 0.25, 5: 0.005}
+        self.assertEqual(
+            select_neighbors(1, row, top_k=0, min_score=0.01), [(2, 0.5), (3, 0.25)]
+        )
+
+    def test_select_neighbors_keeps_top_k_with_smaller_id_on_ties(self):
+        row = {2: 0.5, 3: 0.5, 4: 0.7, 5: 0.1}
+        self.assertEqual(
+            select_neighbors(1, row, top_k=2, min_score=0), [(4, 0.7), (2, 0.5)]
+        )
+
+
+class RecipeFixtureMixin:
+    def create_user(self, name="tester"):
+        return User.objects.create(social_id=name, nickname=name, age=20, gender=False)
+
+    def create_recipes(self, user, count):
+        recipes = [
+            Recipe.objects.create(user=user, title=f"레시피{i}", category=1)
+            for i in range(count)
+        ]
+        # 새 레시피는 점수 반영 대기 중으로 만들어지므로 반영된 것으로 표시
+        Updated_recipe.objects.filter(recipe__in=recipes).update(done=True)
+        return recipes
+
+    def create_similarities(self, generation, pairs):
+        RecipeSimilarity.objects.bulk_create(
+            [
+                RecipeSimilarity(
+                    generation=generation,
+                    recipe=recipe,
+                    similar_recipe=similar,
+                    similarity_score=score,
+                )
+                for recipe, similar, score in pairs
+            ]
+        )
+
+
+class TempStoreMixin:
+    def create_store_path(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return os.path.join(directory.name, "neighbors.bin")
+
+
+@override_settings(CACHES=TEST_CACHES)
+class PublishGenerationTests(RecipeFixtureMixin, TempStoreMixin, TestCase):
+    def setUp(self):
+        self.recipes = self.create_recipes(self.create_user(), 3)
+        self.path = self.create_store_path()
+
+    def test_swaps_generation_and_exports_neighbor_file(self):
+        first, second, third = self.recipes
+        old = SimilarityGeneration.objects.create(status="active")
+        self.create_similarities(old, [(first, second, 0.5)])
+        pending = Updated_recipe.objects.filter(recipe=third)
+        pending.update(done=False)
+        pending_ids = list(pending.values_list("id", flat=True))
+
+        new = SimilarityGeneration.objects.create(status="building")
+        self.create_similarities(new, [(first, third, 0.75)])
+        with override_settings(SIMILARITY_STORE_PATH=self.path):
+            publish_generation(new, pending_ids)
+
+        self.assertEqual(
+            list(SimilarityGeneration.objects.values_list("id", "status")),
+            [(new.id, "active")],
+        )
+        self.assertEqual(
+            list(RecipeSimilarity.objects.values_list("generation_id", flat=True)), [new.id]
+        )
+        self.assertTrue(Updated_recipe.objects.get(recipe=third).done)
+        store = NeighborStore(self.path)
+        self.assertEqual(store.generation, new.id)
+        self.assertEqual([recipe_id for recipe_id, _ in store.neighbors(first.id)], [third.id])
+
+    def test_requeues_recipes_applied_to_old_generation_during_build(self):
+        first = self.recipes[0]
+        new = SimilarityGeneration.objects.create(status="building")
+        # 전체 계산 도중 증분 계산이 이전 세대에 반영한 레시피
+        Updated_recipe.objects.filter(recipe=first).update(done=True, updated_at=new.created_at)
+
+        with override_settings(SIMILARITY_STORE_PATH=self.path):
+            publish_generation(new, [])
+        self.assertFalse(Updated_recipe.objects.get(recipe=first).done)
+
+
+class LegacyGenerationMigrationTests(RecipeFixtureMixin, TestCase):
+    def test_keeps_one_legacy_row_per_pair(self):
+        migration = importlib.import_module("collabo.migrations.0004_similaritygeneration")
+        first, second, third = self.create_recipes(self.create_user(), 3)
+        self.create_similarities(
+            None, [(first, second, 0.5), (first, second, 0.5), (first, third, 0.25)]
+        )
+        latest = RecipeSimilarity.objects.filter(recipe=first, similar_recipe=second).latest("id")
+
+        migration.assign_legacy_generation(apps, None)
+
+        generation = SimilarityGeneration.objects.get()
+        self.assertEqual(generation.status, "active")
+        rows = RecipeSimilarity.objects.filter(recipe=first, similar_recipe=second)
+        self.assertEqual(list(rows.values_list("id", flat=True)), [latest.id])
+        self.assertEqual(RecipeSimilarity.objects.filter(generation=generation).count(), 2)
+
+
+class SimilarityJobTests(TestCase):
+    def make_stale(self, job):
+        stale_at = timezone.now() - timedelta(hours=1)
+        SimilarityJob.objects.filter(id=job.id).update(updated_at=stale_at)
+
+    def test_enqueue_reuses_queued_job(self):
+        job = enqueue_similarity_job()
+        self.assertEqual(enqueue_similarity_job().id, job.id)
+        self.assertEqual(claim_similarity_job().id, job.id)
+        self.assertIsNone(claim_similarity_job())
+
+    def test_running_job_without_heartbeat_is_failed(self):
+        job = enqueue_similarity_job()
+        claim_similarity_job()
+        self.make_stale(job)
+
+        # 멈춘 작업이 실패 처리되어 새 작업을 등록할 수 있음
+        self.assertNotEqual(enqueue_similarity_job().id, job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failed_run_records_traceback(self):
+        enqueue_similarity_job()
+        job = claim_similarity_job()
+        with mock.patch.object(
+            job_utils, "save_all_recipe_similarities", side_effect=RuntimeError("boom")
+        ):
+            with self.assertRaises(RuntimeError):
+                run_similarity_job(job, workers=1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertIn("RuntimeError: boom", job.message)
+
+
+class JobHeartbeatTests(TransactionTestCase):
+    # heartbeat 는 별도 스레드(다른 DB 연결)에서 쓰므로 커밋된 데이터가 필요함
+    def test_heartbeat_keeps_running_job_from_going_stale(self):
+        job = SimilarityJob.objects.create(status="running")
+        stale_at = timezone.now() - timedelta(hours=1)
+        SimilarityJob.objects.filter(id=job.id).update(updated_at=stale_at)
+
+        with JobHeartbeat(job.id, interval=0.05):
+            time.sleep(0.3)
+
+        job.refresh_from_db()
+        self.assertGreater(job.updated_at, stale_at)
+        self.assertEqual(fail_stale_similarity_jobs(), 0)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class NeighborStoreTests(RecipeFixtureMixin, TempStoreMixin, TestCase):
+    def setUp(self):
+        self.recipes = self.create_recipes(self.create_user(), 4)
+        self.generation = SimilarityGeneration.objects.create(status="active")
+        first, second, third, fourth = self.recipes
+        self.create_similarities(
+            self.generation,
+            [(first, second, 0.25), (first, third, 0.75), (third, fourth, 0.5)],
+        )
+        self.path = self.create_store_path()
+
+    def test_round_trip_keeps_neighbors_in_score_order(self):
+        export_neighbor_store(self.generation, self.path)
+        store = NeighborStore(self.path)
+        first, second, third, fourth = self.recipes
+
+        self.assertEqual(store.generation, self.generation.id)
+        self.assertEqual(
+            [(recipe_id, round(score, 4)) for recipe_id, score in store.neighbors(first.id)],
+            [(third.id, 0.75), (second.id, 0.25)],
+        )
+        self.assertEqual([recipe_id for recipe_id, _ in store.neighbors(third.id)], [fourth.id])
+        self.assertEqual(store.neighbors(second.id), [])
+        self.assertEqual(store.changed_recipe_ids(), set())
+
+    def test_recipes_updated_after_export_are_read_from_database(self):
+        first, second, third, fourth = self.recipes
+        export_neighbor_store(self.generation, self.path)
+
+        # 내보낸 뒤에 증분 계산이 fourth 를 반영해서 second 의 새 이웃이 됨
+        self.create_similarities(
+            self.generation, [(fourth, second, 0.5), (second, fourth, 0.5)]
+        )
+        Updated_recipe.objects.filter(recipe=fourth).update(updated_at=timezone.now())
+
+        neighbors = get_store_neighbors(NeighborStore(self.path), [first.id, second.id, fourth.id])
+        self.assertEqual([recipe_id for recipe_id, _ in neighbors[first.id]], [third.id, second.id])
+        self.assertEqual(neighbors[second.id], [(fourth.id, 0.5)])
+        self.assertEqual(neighbors[fourth.id], [(second.id, 0.5)])
+
+    def test_unreadable_file_falls_back_to_database(self):
+        # 프로세스 전역 상태라서 다른 테스트에 남지 않도록 되돌림
+        self.addCleanup(setattr, neighbor_store, "_store", None)
+        self.addCleanup(setattr, neighbor_store, "_bad_file_key", None)
+        with open(self.path, "wb") as f:
+            f.write(b"not a neighbor file" * 4)
+        with override_settings(SIMILARITY_STORE_PATH=self.path):
+            with self.assertLogs(neighbor_store.logger, level="ERROR"):
+                self.assertIsNone(get_neighbor_store())
+
+
+class RecentInteractionTests(RecipeFixtureMixin, TestCase):
+    def setUp(self):
+        self.user = self.create_user()
+        self.recipes = self.create_recipes(self.user, 7)
+
+    def click(self, *recipes):
+        for recipe in recipes:
+            Interaction.objects.create(user=self.user, recipe=recipe)
+
+    def test_returns_distinct_recipes_by_last_click(self):
+        first, second, third = self.recipes[:3]
+        self.click(first, second, first, third)
+        self.assertEqual(
+            get_recent_interactions(self.user, count=5), [third.id, first.id, second.id]
+        )
+
+    def test_reads_past_repeated_clicks_on_one_recipe(self):
+        self.click(*self.recipes[:5])
+        Interaction.objects.bulk_create(
+            [Interaction(user=self.user, recipe=self.recipes[5]) for _ in range(30)]
+        )
+        # 처음 읽는 구간에는 같은 레시피 클릭만 있도록 구간을 줄임
+        with mock.patch.object(interaction_utils, "RECENT_INTERACTION_WINDOW", 4):
+            recent = get_recent_interactions(self.user, count=5)
+        self.assertEqual(
+            recent, [recipe.id for recipe in reversed(self.recipes[1:6])]
+        )
+
+    def test_excludes_recipes_waiting_for_similarity(self):
+        first, second = self.recipes[:2]
+        self.click(first, second)
+        Updated_recipe.objects.filter(recipe=second).update(done=False)
+        self.assertEqual(get_recent_interactions(self.user), [first.id])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class InteractionBufferTests(RecipeFixtureMixin, TestCase):
+    def setUp(self):
+        self.user = self.create_user()
+        self.recipes = self.create_recipes(self.user, 3)
+        # 타이머 스레드가 테스트 도중에 저장하지 않도록 간격을 길게 잡음
+        self.buffer = InteractionBuffer(size=100, interval=3600, debounce=60, max_pending=4)
+        self.addCleanup(self.cancel_timer)
+
+    def cancel_timer(self):
+        if self.buffer._timer is not None:
+            self.buffer._timer.cancel()
+
+    def view(self, recipe, group_id=None):
+        return self.buffer.add(self.user.id, group_id, recipe.id)
+
+    def test_flush_saves_views_with_their_view_time(self):
+        first, second = self.recipes[:2]
+        self.assertTrue(self.view(first))
+        self.assertFalse(self.view(first))
+        self.assertTrue(self.view(second))
+        viewed_at = [event.viewed_at for event in self.buffer._events]
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(
+            list(Interaction.objects.order_by("id").values_list("recipe_id", "created_at")),
+            [(first.id, viewed_at[0]), (second.id, viewed_at[1])],
+        )
+        self.assertEqual(RecipeStats.objects.get(recipe=first).view_count, 1)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_deleted_recipe_is_dropped_and_deleted_group_is_cleared(self):
+        first, second = self.recipes[:2]
+        group = Group.objects.create(gender=False, age=20)
+        self.view(first, group_id=group.id + 1)
+        self.view(second, group_id=group.id)
+        second.delete()
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(
+            list(Interaction.objects.values_list("recipe_id", "group_id")), [(first.id, None)]
+        )
+
+    def test_connection_error_requeues_with_backoff(self):
+        for recipe in self.recipes:
+            self.view(recipe)
+        events = list(self.buffer._events)
+        with mock.patch.object(self.buffer, "_insert", side_effect=OperationalError):
+            with self.assertRaises(OperationalError):
+                self.buffer.flush()
+
+        self.assertEqual(self.buffer._events, events)
+        self.assertEqual(self.buffer._failures, 1)
+        self.assertEqual(self.buffer._timer.interval, 3600)
+        # 재시도 대기 중에 쌓인 기록은 max_pending 을 넘으면 오래된 것부터 버림
+        with self.assertLogs("collabo.utils.interaction_buffer", level="WARNING"):
+            self.buffer._requeue([events[0]] * 3)
+        self.assertEqual(len(self.buffer._events), 4)
+        self.assertEqual(self.buffer._timer.interval, 7200)
+
+        self.assertEqual(self.buffer.flush(), 4)
+        self.assertEqual(self.buffer._failures, 0)
+
+    def test_integrity_error_drops_only_the_bad_view(self):
+        for recipe in self.recipes:
+            self.view(recipe)
+        bad_recipe_id = self.recipes[1].id
+        insert = self.buffer._insert
+
+        def insert_or_fail(events):
+            if any(event.recipe_id == bad_recipe_id for event in events):
+                raise IntegrityError("bad row")
+            insert(events)
+
+        with mock.patch.object(self.buffer, "_insert", side_effect=insert_or_fail):
+            with self.assertLogs("collabo.utils.interaction_buffer", level="WARNING"):
+                self.assertEqual(self.buffer.flush(), 2)
+
+        self.assertEqual(self.buffer._events, [])
+        self.assertEqual(self.buffer._failures, 0)
+        self.assertCountEqual(
+            Interaction.objects.values_list("recipe_id", flat=True),
+            [self.recipes[0].id, self.recipes[2].id],
+        )
+
+
+class InteractionPartitionTests(RecipeFixtureMixin, TestCase):
+    def setUp(self):
+        self.user = self.create_user()
+        self.recipe = self.create_recipes(self.user, 1)[0]
+        self.this_month = date.today().replace(day=1)
+
+    def view_at(self, day, group=None):
+        interaction = Interaction.objects.create(user=self.user, recipe=self.recipe, group=group)
+        # created_at 은 파티션 키라서 바꾸면 해당 달의 파티션으로 옮겨짐
+        Interaction.objects.filter(id=interaction.id).update(created_at=datetime(day.year, day.month, day.day, 12))
+
+    def count_in(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            return cursor.fetchone()[0]
+
+    def check_constraints_now(self):
+        # 테스트 트랜잭션 안에서 넣은 행의 지연된 외래 키 검사가 남아 있으면 파티션을 지울 수 없음
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+    def test_creates_missing_months_and_moves_rows_out_of_default(self):
+        far_month = add_months(self.this_month, 6)
+        self.view_at(far_month)
+        self.assertEqual(self.count_in(DEFAULT_PARTITION), 1)
+
+        created = create_future_partitions(6)
+        self.assertIn(partition_name(far_month), created)
+        self.assertEqual(create_future_partitions(6), [])
+        self.assertEqual(self.count_in(DEFAULT_PARTITION), 0)
+        self.assertEqual(self.count_in(partition_name(far_month)), 1)
+
+    def test_compacts_old_months_into_daily_rollups(self):
+        old_month = add_months(self.this_month, -5)
+        older_day = add_months(self.this_month, -8)
+        create_partition(old_month)
+        group = Group.objects.create(gender=False, age=20)
+        self.view_at(old_month)
+        self.view_at(old_month)
+        self.view_at(old_month, group=group)
+        self.view_at(older_day)
+        self.view_at(self.this_month)
+        self.check_constraints_now()
+
+        compacted = compact_partitions(3)
+        self.assertEqual(compacted, [partition_name(old_month), DEFAULT_PARTITION])
+        self.assertNotIn(old_month, [month for month, _ in list_partitions()])
+        self.assertEqual(
+            set(InteractionRollup.objects.values_list("day", "group_id", "count")),
+            {(old_month, None, 2), (old_month, group.id, 1), (older_day, None, 1)},
+        )
+        self.assertEqual(Interaction.objects.count(), 1)
+        self.assertEqual(compact_partitions(3), [])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class GroupScoreTests(RecipeFixtureMixin, TestCase):
+    def setUp(self):
+        self.user = self.create_user()
+        self.first, self.second = self.create_recipes(self.user, 2)
+        # get_group_id 와 같은 번호로 그룹을 만듦 (남성 20대 = 2, 여성 20대 = 8)
+        self.men = Group.objects.create(id=2, gender=False, age=20)
+        self.women = Group.objects.create(id=8, gender=True, age=20)
+
+    def view(self, recipe, group, count=1, days_ago=0):
+        interactions = Interaction.objects.bulk_create(
+            [Interaction(user=self.user, recipe=recipe, group=group) for _ in range(count)]
+        )
+        if days_ago:
+            Interaction.objects.filter(id__in=[i.id for i in interactions]).update(
+                created_at=timezone.now() - timedelta(days=days_ago)
+            )
+
+    def test_refresh_counts_per_group_and_overall(self):
+        self.view(self.first, self.men, 2)
+        self.view(self.first, None)
+        self.view(self.second, self.women)
+        self.view(self.second, self.men, 5, days_ago=30)
+        InteractionRollup.objects.create(
+            day=date.today(), recipe=self.second, group=self.men, count=3
+        )
+        InteractionRollup.objects.create(
+            day=date.today() - timedelta(days=30), recipe=self.first, group=self.men, count=9
+        )
+
+        self.assertEqual(refresh_group_scores(days=7), 5)
+        self.assertEqual(
+            set(Score.objects.values_list("recipe_id", "group_id", "score")),
+            {
+                (self.first.id, self.men.id, 2),
+                (self.second.id, self.men.id, 3),
+                (self.second.id, self.women.id, 1),
+                (self.first.id, None, 3),
+                (self.second.id, None, 4),
+            },
+        )
+        self.assertEqual(get_group_top_recipe_ids(self.men.id), [self.second.id, self.first.id])
+        self.assertEqual(get_group_top_recipe_ids(None), [self.second.id, self.first.id])
+
+        # 다시 계산하면 이전 점수는 지워짐
+        Interaction.objects.all().delete()
+        InteractionRollup.objects.all().delete()
+        self.assertEqual(refresh_group_scores(days=7), 0)
+        self.assertFalse(Score.objects.exists())
+
+    def test_cold_start_user_gets_group_top_recipes(self):
+        self.view(self.first, self.women, 3)
+        self.view(self.second, self.men)
+        refresh_group_scores(days=7)
+        # 본 레시피가 없는 20대 남성
+        newcomer = self.create_user("newcomer")
+        self.assertEqual(compute_recommend_recipe_ids(newcomer.id), [self.second.id])
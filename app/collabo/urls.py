@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import SaveRecipeSimilarView
+from .views import SaveRecipeSimilarView, RecipeSimilarJobView
 
 urlpatterns = [
     # /api/v1/collabo
     path("", SaveRecipeSimilarView.as_view(), name="create-recipe"),
-]
\ No newline at end of file
+    # /api/v1/collabo/jobs/1
+    path("/jobs/<int:id>", RecipeSimilarJobView.as_view(), name="similarity-job"),
+]
@@ -0,0 +1,71 @@
+from django.db import transaction
+from django.utils import timezone
+
+from collabo.models import RecipeSimilarity, SimilarityGeneration
+from recipes.models import Updated_recipe
+from .neighbor_store import export_active_neighbor_store
+
+
+def get_active_generation():
+    # 추천에서 읽어야 하는 유사도 세대 (없으면 None)
+    return (
+        SimilarityGeneration.objects.filter(status="active").order_by("-id").first()
+    )
+
+
+def get_or_create_active_generation():
+    # 아직 전체 계산을 한 번도 하지 않았으면 빈 세대를 만들어서 증분 계산이 쓸 수 있게 함
+    with transaction.atomic():
+        generation = (
+            SimilarityGeneration.objects.select_for_update()
+            .filter(status="active")
+            .order_by("-id")
+            .first()
+        )
+        if generation is None:
+            generation = SimilarityGeneration.objects.create(status="active")
+    return generation
+
+
+def publish_generation(generation, pending_ids):
+    """
+    작성이 끝난 세대를 사용 중으로 바꾸고 이전 세대를 삭제한 뒤 이웃 파일을 내보냅니다.
+    세대 교체와 대기열 완료 처리는 한 트랜잭션에서 이루어지므로
+    추천 쪽에서는 항상 완성된 세대 하나만 보게 됩니다.
+    """
+    with transaction.atomic():
+        old_generations = list(
+            SimilarityGeneration.objects.select_for_update().filter(status="active")
+        )
+        SimilarityGeneration.objects.filter(
+            id__in=[old.id for old in old_generations]
+        ).update(status="retired")
+
+        generation.status = "active"
+        generation.save()
+
+        # 계산 시작 시점에 대기 중이던 레시피는 이번 세대에 포함됨
+        Updated_recipe.objects.filter(id__in=pending_ids).update(
+            done=True, updated_at=timezone.now()
+        )
+        # 계산 도중 증분 계산이 이전 세대에 반영한 레시피는 새 세대에 다시 반영하도록 되돌림
+        Updated_recipe.objects.filter(
+            done=True, updated_at__gte=generation.created_at
+        ).exclude(id__in=pending_ids).update(done=False)
+
+    drop_retired_generations()
+    # 추천에서 읽는 이웃 파일은 세대를 올릴 때 내보냄
+    export_active_neighbor_store(generation)
+
+
+def drop_retired_generations():
+    # 연결된 모델이 없어서 유사도 행은 DELETE 한 번으로 지워짐
+    retired_ids = list(
+        SimilarityGeneration.objects.filter(status="retired").values_list(
+            "id", flat=True
+        )
+    )
+    RecipeSimilarity.objects.filter(generation_id__in=retired_ids).delete()
+    # 세대가 생기기 전부터 남아 있던 행
+    RecipeSimilarity.objects.filter(generation__isnull=True).delete()
+    SimilarityGeneration.objects.filter(id__in=retired_ids).delete()
@@ -0,0 +1,216 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, namedtuple
+
+from django.conf import settings
+from django.db import (
+    IntegrityError,
+    InterfaceError,
+    OperationalError,
+    connection,
+    transaction,
+)
+from django.utils import timezone
+
+from collabo.models import Group, Interaction
+from common.utils.stats_utils import increase_recipe_stats
+from recipes.models import Recipe
+from users.models import User
+from .recommend_cache import invalidate_user_recommend
+
+logger = logging.getLogger(__name__)
+
+# 버퍼에 모아두는 조회 기록 (viewed_at 은 실제로 조회한 시각으로, 저장할 때 created_at 이 됨)
+ViewEvent = namedtuple("ViewEvent", ["user_id", "group_id", "recipe_id", "viewed_at"])
+
+# created_at 은 auto_now_add 라서 bulk_create 로는 저장 시각이 들어가므로 조회 시각을 직접 넣음
+INSERT_INTERACTIONS_SQL = """
+INSERT INTO collabo_interaction (created_at, updated_at, type, user_id, group_id, recipe_id)
+SELECT viewed_at, viewed_at, %s, user_id, group_id, recipe_id
+FROM unnest(%s::timestamptz[], %s::bigint[], %s::bigint[], %s::bigint[])
+    AS event(viewed_at, user_id, group_id, recipe_id)
+"""
+
+# 잠시 뒤에 다시 시도하면 저장될 수 있는 오류 (DB 연결 끊김, 재시작 등)
+RETRYABLE_ERRORS = (OperationalError, InterfaceError)
+
+
+class InteractionBuffer:
+    """
+    레시피 조회 기록을 워커 메모리에 모았다가 bulk_create 로 한 번에 저장합니다.
+    같은 사용자가 같은 레시피를 debounce 초 안에 다시 보면 한 번만 기록합니다.
+    저장은 요청을 처리하는 스레드가 아니라 타이머 스레드에서 합니다.
+    DB 연결 오류로 저장하지 못한 기록은 버퍼에 되돌려 놓고, 실패가 이어지면 간격을 늘려가며 다시 시도합니다.
+    무결성 오류가 나면 묶음을 반씩 나눠 저장해서 문제가 되는 기록만 버립니다.
+
+    ---
+    """
+
+    def __init__(self, size=None, interval=None, debounce=None, max_pending=None):
+        self.size = size or settings.INTERACTION_BUFFER_SIZE
+        self.interval = interval or settings.INTERACTION_FLUSH_INTERVAL
+        self.debounce = debounce or settings.INTERACTION_DEBOUNCE_SECONDS
+        self.max_pending = max_pending or settings.INTERACTION_BUFFER_MAX_PENDING
+        self._lock = threading.Lock()
+        self._events = []
+        self._last_seen = {}
+        self._timer = None
+        # 연속으로 저장에 실패한 횟수 (0 이 아니면 다시 시도할 때까지 기다림)
+        self._failures = 0
+
+    def add(self, user_id, group_id, recipe_id):
+        # 기록했으면 True, 중복 조회라서 버렸으면 False
+        now = time.monotonic()
+        key = (user_id, recipe_id)
+        with self._lock:
+            seen_at = self._last_seen.get(key)
+            if seen_at is not None and now - seen_at < self.debounce:
+                return False
+            self._last_seen[key] = now
+            self._events.append(ViewEvent(user_id, group_id, recipe_id, timezone.now()))
+
+            # 가득 차면 바로, 아니면 첫 기록 후 interval 초 뒤에 저장 (재시도 대기 중이면 그대로 기다림)
+            if len(self._events) >= self.size and not self._failures:
+                self._schedule(0)
+            elif self._timer is None:
+                self._schedule(self.interval)
+        return True
+
+    def _schedule(self, delay):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._flush_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("조회 기록 저장 실패")
+        finally:
+            # 타이머 스레드가 연 DB 연결 정리
+            connection.close()
+
+    def flush(self):
+        """
+        모아둔 조회 기록을 저장하고 저장한 개수를 반환합니다.
+        조회 기록, 레시피 조회 수, 사용자별 추천 캐시 무효화를 함께 처리합니다.
+        """
+        with self._lock:
+            events, self._events = self._events, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._prune_last_seen()
+        if not events:
+            return 0
+
+        events = self._save_valid(events)
+        with self._lock:
+            self._failures = 0
+
+        for user_id in {event.user_id for event in events}:
+            invalidate_user_recommend(user_id)
+        return len(events)
+
+    def _save_valid(self, events):
+        """
+        조회 기록을 저장하고 저장한 기록을 반환합니다.
+        무결성 오류가 나면 묶음을 반씩 나눠 다시 저장하고, 혼자서도 저장되지 않는 기록은 버립니다.
+        DB 연결 오류가 나면 아직 저장하지 못한 기록을 버퍼에 되돌려 놓고 예외를 다시 올립니다.
+        그 밖의 오류(코드 문제 등)는 다시 시도해도 같으므로 되돌리지 않습니다.
+        """
+        saved = []
+        chunks = [events]
+        while chunks:
+            chunk = chunks.pop()
+            try:
+                saved.extend(self._save(chunk))
+            except IntegrityError:
+                if len(chunk) == 1:
+                    logger.warning("저장할 수 없는 조회 기록을 버림: %s", chunk[0], exc_info=True)
+                    continue
+                middle = len(chunk) // 2
+                chunks.extend([chunk[middle:], chunk[:middle]])
+            except RETRYABLE_ERRORS:
+                self._requeue(chunk + [event for rest in reversed(chunks) for event in rest])
+                raise
+        return saved
+
+    def _save(self, events):
+        # 모으는 동안 삭제된 레시피/사용자의 기록은 버리고, 삭제된 그룹은 비워서 조회 기록은 남김
+        recipe_ids = set(
+            Recipe.objects.filter(
+                id__in={event.recipe_id for event in events}
+            ).values_list("id", flat=True)
+        )
+        user_ids = set(
+            User.objects.filter(
+                id__in={event.user_id for event in events}
+            ).values_list("id", flat=True)
+        )
+        group_ids = set(
+            Group.objects.filter(
+                id__in={event.group_id for event in events if event.group_id is not None}
+            ).values_list("id", flat=True)
+        )
+        events = [
+            event if event.group_id is None or event.group_id in group_ids
+            else event._replace(group_id=None)
+            for event in events
+            if event.recipe_id in recipe_ids and event.user_id in user_ids
+        ]
+        if not events:
+            return events
+
+        with transaction.atomic():
+            self._insert(events)
+            views = Counter(event.recipe_id for event in events)
+            for recipe_id, count in views.items():
+                increase_recipe_stats(recipe_id, view_count=count)
+        return events
+
+    def _insert(self, events):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                INSERT_INTERACTIONS_SQL,
+                [
+                    Interaction._meta.get_field("type").default,
+                    [event.viewed_at for event in events],
+                    [event.user_id for event in events],
+                    [event.group_id for event in events],
+                    [event.recipe_id for event in events],
+                ],
+            )
+
+    def _requeue(self, events):
+        """
+        저장하지 못한 기록을 버퍼 앞에 되돌려 놓고, 실패 횟수에 따라 interval 의 2배씩 (최대 32배) 늦춰서 다시 시도합니다.
+        DB 장애가 길어져도 메모리가 계속 늘지 않도록 max_pending 개를 넘는 오래된 기록은 버립니다.
+        """
+        with self._lock:
+            self._events = events + self._events
+            dropped = len(self._events) - self.max_pending
+            if dropped > 0:
+                del self._events[:dropped]
+                logger.warning("저장하지 못한 조회 기록 %d개를 버림", dropped)
+            self._failures += 1
+            self._schedule(self.interval * 2 ** min(self._failures - 1, 5))
+
+    def _prune_last_seen(self):
+        # debounce 시간이 지난 기록은 더 볼 필요가 없으므로 삭제
+        now = time.monotonic()
+        self._last_seen = {
+            key: seen_at
+            for key, seen_at in self._last_seen.items()
+            if now - seen_at < self.debounce
+        }
+
+
+interaction_buffer = InteractionBuffer()
+
+# gunicorn 은 worker_exit 훅에서, 그 밖의 프로세스는 종료할 때 남은 기록 저장
+atexit.register(interaction_buffer.flush)
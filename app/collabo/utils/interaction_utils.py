@@ -1,44 +1,46 @@
 from collabo.models import Interaction
-from users.models import User
 from .utils import get_group_id
+from .interaction_buffer import interaction_buffer
 from recipes.models import Updated_recipe
 
 
 def create_interaction(user, recipe):
-    if not user:
+    # 요청의 사용자 객체를 그대로 쓰고, 저장은 버퍼가 모아서 처리
+    if not user or not user.is_authenticated:
         return
-    user = User.objects.get(id=user.id)
-    age = user.age
-    gender = user.gender
-    recipe_id = recipe.id
+    group_id = get_group_id(user.age, user.gender)
+    interaction_buffer.add(user.id, group_id, recipe.id)
 
-    group_id = get_group_id(age, gender)
 
-    Interaction.objects.create(
-        user=user,
-        group_id=group_id,
-        recipe_id=recipe_id,
-    )
+# 최근 클릭을 이 개수부터 읽고, 서로 다른 레시피가 모자라면 다음 구간을 두 배씩 늘려가며 읽음
+RECENT_INTERACTION_WINDOW = 100
 
 
 # 유저가 가장 최근에 클릭한 레시피 5개 가져오기
-def get_recent_interactions(user):
-    # 중복을 제외하고 interaction_id 순서대로 상위 5개 가져오기
-    recent_interactions = (
+def get_recent_interactions(user, count=5):
+    # (user, -id) 인덱스로 최근 클릭부터 읽어서 레시피별 마지막 클릭 순서대로 상위 5개 가져오기
+    # 아직 점수 반영 안된 레시피는 제외
+    pending_recipe_ids = Updated_recipe.objects.filter(done=False).values("recipe")
+    interactions = (
         Interaction.objects.filter(user=user)
+        .exclude(recipe_id__in=pending_recipe_ids)
         .order_by("-id")
-        .values_list("recipe_id", flat=True)
     )
 
-    # 아직 점수 반영 안된 레시피는 제외
-    updated_recipe_ids = updated_recipe_ids = Updated_recipe.objects.filter(
-        done=False
-    ).values_list("recipe", flat=True)
-
-    recent_recipe_ids = []
-    for i in recent_interactions:
-        if len(recent_recipe_ids) >= 5:
+    recipe_ids = []
+    window = RECENT_INTERACTION_WINDOW
+    last_id = None
+    while len(recipe_ids) < count:
+        # 같은 레시피를 반복해서 클릭했으면 이전 구간보다 오래된 클릭을 이어서 읽음
+        rows = interactions if last_id is None else interactions.filter(id__lt=last_id)
+        rows = list(rows.values_list("id", "recipe_id")[:window])
+        for _, recipe_id in rows:
+            if recipe_id not in recipe_ids:
+                recipe_ids.append(recipe_id)
+                if len(recipe_ids) == count:
+                    break
+        if len(rows) < window:
             break
-        if i not in recent_recipe_ids and i not in updated_recipe_ids:
-            recent_recipe_ids.append(i)
-    return recent_recipe_ids
+        last_id = rows[-1][0]
+        window *= 2
+    return recipe_ids
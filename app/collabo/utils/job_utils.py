@@ -0,0 +1,122 @@
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from collabo.models import SimilarityJob
+from .save_similary import save_all_recipe_similarities
+from .shard_utils import default_workers
+
+
+def fail_stale_similarity_jobs():
+    """
+    진행 중인데 SIMILARITY_JOB_STALE_SECONDS 동안 heartbeat(updated_at)가 없는 작업을 실패로 바꿉니다.
+    워커가 작업 도중에 죽으면(컨테이너 재시작, OOM 등) 작업이 계속 running 으로 남아서
+    새 작업을 등록할 수 없게 되는 것을 막습니다. 실패 처리한 작업 수를 반환합니다.
+    """
+    deadline = timezone.now() - timedelta(seconds=settings.SIMILARITY_JOB_STALE_SECONDS)
+    return SimilarityJob.objects.filter(status="running", updated_at__lt=deadline).update(
+        status="failed",
+        message="작업 중이던 워커의 응답이 없어서 실패 처리했습니다.",
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+
+
+def enqueue_similarity_job():
+    # 이미 대기 중이거나 진행 중인 작업이 있으면 새로 만들지 않고 그 작업을 반환
+    fail_stale_similarity_jobs()
+    with transaction.atomic():
+        job = (
+            SimilarityJob.objects.select_for_update()
+            .filter(status__in=["queued", "running"])
+            .order_by("id")
+            .first()
+        )
+        if job is None:
+            job = SimilarityJob.objects.create()
+    return job
+
+
+def claim_similarity_job():
+    # 여러 워커가 떠 있어도 대기 중인 작업은 하나의 워커만 가져감
+    fail_stale_similarity_jobs()
+    with transaction.atomic():
+        job = (
+            SimilarityJob.objects.select_for_update(skip_locked=True)
+            .filter(status="queued")
+            .order_by("id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = "running"
+        job.started_at = timezone.now()
+        job.save()
+    return job
+
+
+class JobHeartbeat:
+    """
+    작업이 도는 동안 SIMILARITY_JOB_HEARTBEAT_SECONDS 마다 updated_at 을 갱신하는 스레드입니다.
+    샤드 하나가 오래 걸려도 살아 있는 작업이 fail_stale_similarity_jobs 에 걸리지 않게 합니다.
+
+    ---
+    """
+
+    def __init__(self, job_id, interval=None):
+        self.job_id = job_id
+        self.interval = interval or settings.SIMILARITY_JOB_HEARTBEAT_SECONDS
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                SimilarityJob.objects.filter(id=self.job_id, status="running").update(
+                    updated_at=timezone.now()
+                )
+            finally:
+                # 프로세스 풀이 fork 될 때 이 스레드의 DB 연결을 물려주지 않도록 매번 닫음
+                connection.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_similarity_job(job, workers=None):
+    def on_progress(done, total):
+        SimilarityJob.objects.filter(id=job.id).update(
+            done_shards=done, total_shards=total, updated_at=timezone.now()
+        )
+
+    try:
+        with JobHeartbeat(job.id):
+            generation = save_all_recipe_similarities(
+                workers=workers or default_workers(), on_progress=on_progress
+            )
+    except Exception:
+        SimilarityJob.objects.filter(id=job.id).update(
+            status="failed",
+            message=traceback.format_exc(),
+            finished_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        raise
+
+    SimilarityJob.objects.filter(id=job.id).update(
+        status="done",
+        generation=generation,
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    job.refresh_from_db()
+    return job
@@ -0,0 +1,176 @@
+import random
+from array import array
+from collections import defaultdict
+
+from django.conf import settings
+
+from collabo.models import RecipeMinHash
+from recipes.models import Recipe_ingredient
+from .similarity_engine import BLOCK_SIZE
+
+# 2^61 - 1 (메르센 소수)
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = 0xFFFFFFFF
+SEED = 20240613
+
+
+class MinHasher:
+    """
+    재료 id 집합의 MinHash 서명을 만듭니다.
+    h_i(x) = (a_i * x + b_i) mod p 를 NUM_PERM 개 사용하고, 서명은 uint32 배열입니다.
+
+    ---
+    """
+
+    def __init__(self, num_perm=None, seed=SEED):
+        self.num_perm = num_perm or (
+            settings.SIMILARITY_MINHASH_BANDS * settings.SIMILARITY_MINHASH_ROWS
+        )
+        rng = random.Random(seed)
+        self.params = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(self.num_perm)
+        ]
+        # 재료 수는 레시피 수보다 훨씬 적으므로 재료별 해시 벡터를 캐시
+        self._ingredient_hashes = {}
+
+    def ingredient_hashes(self, ingredient_id):
+        hashes = self._ingredient_hashes.get(ingredient_id)
+        if hashes is None:
+            hashes = [
+                ((a * ingredient_id + b) % MERSENNE_PRIME) & MAX_HASH
+                for a, b in self.params
+            ]
+            self._ingredient_hashes[ingredient_id] = hashes
+        return hashes
+
+    def signature(self, ingredient_ids):
+        if not ingredient_ids:
+            return array("I", [MAX_HASH] * self.num_perm)
+        vectors = [self.ingredient_hashes(i) for i in ingredient_ids]
+        return array("I", map(min, zip(*vectors)))
+
+
+class LSHIndex:
+    """
+    MinHash 서명을 band 단위로 나눠서 같은 bucket 에 들어간 레시피를 후보 이웃으로 반환합니다.
+
+    ---
+    """
+
+    def __init__(self, bands=None, rows=None):
+        self.bands = bands or settings.SIMILARITY_MINHASH_BANDS
+        self.rows = rows or settings.SIMILARITY_MINHASH_ROWS
+        self.buckets = defaultdict(list)
+
+    def band_keys(self, signature):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start : start + self.rows].tobytes()
+
+    def add(self, recipe_id, signature):
+        for key in self.band_keys(signature):
+            self.buckets[key].append(recipe_id)
+
+    def candidates(self, signature):
+        result = set()
+        for key in self.band_keys(signature):
+            result.update(self.buckets.get(key, ()))
+        return result
+
+
+def build_signatures(matrix, hasher=None):
+    # {recipe_id: 서명} (재료가 없는 레시피는 이웃이 없으므로 제외)
+    hasher = hasher or MinHasher()
+    return {
+        recipe_id: hasher.signature(ingredients)
+        for recipe_id, ingredients in zip(matrix.recipe_ids, matrix.rows)
+        if ingredients
+    }
+
+
+def build_lsh_index(signatures):
+    index = LSHIndex()
+    for recipe_id, signature in signatures.items():
+        index.add(recipe_id, signature)
+    return index
+
+
+def candidate_similarity_row(matrix, recipe_id, candidates):
+    # 후보 레시피에 대해서만 정확한 자카드 유사도 계산
+    ingredients = matrix.rows[matrix.row_index[recipe_id]]
+    row = {}
+    for other_id in candidates:
+        other = matrix.rows[matrix.row_index[other_id]]
+        intersection = len(ingredients & other)
+        if intersection:
+            union = len(ingredients) + len(other) - intersection
+            row[other_id] = round(intersection / union, 4)
+    return row
+
+
+def save_signatures(signatures, batch_size=BLOCK_SIZE):
+    # 서명은 uint32 배열을 bytes 로 저장 (NUM_PERM * 4 bytes)
+    RecipeMinHash.objects.bulk_create(
+        [
+            RecipeMinHash(recipe_id=recipe_id, signature=signature.tobytes())
+            for recipe_id, signature in signatures.items()
+        ],
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["recipe"],
+        update_fields=["signature", "updated_at"],
+    )
+
+
+def load_signatures(matrix, refresh_ids=(), hasher=None):
+    """
+    저장된 서명을 읽어서 {recipe_id: 서명} 을 반환합니다.
+    서명이 없거나 서명 길이(NUM_PERM)가 바뀌었거나 refresh_ids 에 든 레시피만 새로 계산해서 저장하고,
+    재료가 없어진 레시피의 서명은 지웁니다.
+    """
+    hasher = hasher or MinHasher()
+    signature_size = hasher.num_perm * array("I").itemsize
+    refresh_ids = set(refresh_ids)
+    stored = {
+        recipe_id: bytes(signature)
+        for recipe_id, signature in RecipeMinHash.objects.values_list(
+            "recipe_id", "signature"
+        ).iterator()
+    }
+
+    signatures, changed = {}, {}
+    for recipe_id, ingredients in zip(matrix.recipe_ids, matrix.rows):
+        if not ingredients:
+            continue
+        data = stored.get(recipe_id)
+        if data is not None and len(data) == signature_size and recipe_id not in refresh_ids:
+            signature = array("I")
+            signature.frombytes(data)
+            signatures[recipe_id] = signature
+        else:
+            signatures[recipe_id] = changed[recipe_id] = hasher.signature(ingredients)
+
+    save_signatures(changed)
+    RecipeMinHash.objects.filter(recipe_id__in=stored.keys() - signatures.keys()).delete()
+    return signatures
+
+
+def refresh_signatures(recipe_ids, hasher=None):
+    # 재료가 바뀐 레시피들의 서명만 다시 계산해서 저장 (재료가 없으면 삭제)
+    hasher = hasher or MinHasher()
+    recipe_ingredients = defaultdict(set)
+    for recipe_id, ingredient_id in Recipe_ingredient.objects.filter(
+        recipe_id__in=recipe_ids
+    ).values_list("recipe_id", "ingredient_id"):
+        recipe_ingredients[recipe_id].add(ingredient_id)
+
+    save_signatures(
+        {
+            recipe_id: hasher.signature(ingredients)
+            for recipe_id, ingredients in recipe_ingredients.items()
+        }
+    )
+    RecipeMinHash.objects.filter(
+        recipe_id__in=set(recipe_ids) - recipe_ingredients.keys()
+    ).delete()
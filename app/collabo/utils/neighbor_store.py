@@ -0,0 +1,272 @@
+import logging
+import mmap
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from collabo.models import RecipeSimilarity, SimilarityGeneration
+from recipes.models import Updated_recipe
+
+logger = logging.getLogger(__name__)
+
+# 파일 구조 (모두 native byte order)
+#   header: magic(8s) generation(Q) exported_at(d) recipe_count(I) neighbor_count(I)
+#           exported_at 은 유사도 행을 읽기 시작한 시각 (unix timestamp)
+#   recipe_ids  int32[recipe_count]        정렬된 레시피 id
+#   offsets     int32[recipe_count + 1]    CSR offset (recipe_ids[i] 의 이웃은 offsets[i]:offsets[i+1])
+#   neighbors   int32[neighbor_count]      이웃 레시피 id (점수 내림차순)
+#   scores      float32[neighbor_count]
+MAGIC = b"NDDNBR02"
+HEADER = struct.Struct("=8sQdII")
+
+# 다른 프로세스가 새 파일을 올렸는지 확인하는 간격(초)
+RELOAD_INTERVAL = 5
+
+# 파일 내보내기끼리 겹치지 않도록 잡는 advisory lock 키
+# 증분 계산은 같은 키를 공유 잠금으로 잡으므로, 내보내기가 시작되면 진행 중인 증분 반영은 모두 커밋된 상태
+EXPORT_LOCK_KEY = 7_020_001
+
+
+def lock_neighbor_store_export(shared=False):
+    # 현재 트랜잭션이 끝날 때까지 내보내기 잠금을 잡음
+    function = "pg_advisory_xact_lock_shared" if shared else "pg_advisory_xact_lock"
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {function}(%s)", [EXPORT_LOCK_KEY])
+
+
+def from_timestamp(timestamp):
+    # 헤더의 exported_at 을 DB 에 저장된 시각과 비교할 수 있게 변환
+    # USE_TZ=False 이면 저장된 시각은 로컬 시각이고, timestamp()/fromtimestamp() 도 로컬 기준으로 변환함
+    if settings.USE_TZ:
+        return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+    return datetime.fromtimestamp(timestamp)
+
+
+def export_neighbor_store(generation, path=None, exported_at=None):
+    """
+    세대의 유사도를 CSR 형태의 바이너리 파일로 내보냅니다.
+    임시 파일에 쓴 뒤 os.replace 로 교체하므로 읽는 쪽은 항상 완성된 파일만 봅니다.
+    exported_at 이후에 증분 계산이 반영된 레시피는 읽는 쪽에서 DB 로 확인합니다.
+    """
+    path = path or settings.SIMILARITY_STORE_PATH
+    exported_at = exported_at or timezone.now()
+    recipe_ids = array("i")
+    offsets = array("i", [0])
+    neighbors = array("i")
+    scores = array("f")
+
+    rows = (
+        RecipeSimilarity.objects.filter(generation=generation)
+        .order_by("recipe_id", "-similarity_score", "similar_recipe_id")
+        .values_list("recipe_id", "similar_recipe_id", "similarity_score")
+    )
+    for recipe_id, similar_recipe_id, score in rows.iterator(chunk_size=10000):
+        if not recipe_ids or recipe_ids[-1] != recipe_id:
+            if recipe_ids:
+                offsets.append(len(neighbors))
+            recipe_ids.append(recipe_id)
+        neighbors.append(similar_recipe_id)
+        scores.append(score)
+    if recipe_ids:
+        offsets.append(len(neighbors))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC, generation.id, exported_at.timestamp(), len(recipe_ids), len(neighbors)
+            )
+        )
+        for values in (recipe_ids, offsets, neighbors, scores):
+            values.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def export_active_neighbor_store(generation, path=None):
+    """
+    generation 이 아직 사용 중인 세대일 때만 파일로 내보내고, 내보냈으면 True 를 반환합니다.
+    내보내기는 advisory lock 으로 한 번에 하나씩만 하므로, 새 세대가 올라간 뒤에
+    이전 세대를 늦게 내보내서 새 파일을 덮어쓰는 일이 없습니다.
+    """
+    with transaction.atomic():
+        lock_neighbor_store_export()
+        # 잠금을 잡은 뒤의 시각이므로 이보다 먼저 반영된 증분 결과는 모두 파일에 들어감
+        exported_at = timezone.now()
+        if not SimilarityGeneration.objects.filter(
+            id=generation.id, status="active"
+        ).exists():
+            return False
+        export_neighbor_store(generation, path, exported_at)
+    return True
+
+
+# 증분 계산 결과를 파일에 반영할 세대와 마지막으로 내보낸 시각 (증분 계산 프로세스 안에서만 사용)
+_pending_export = {"generation": None, "exported_at": 0.0}
+
+
+def schedule_neighbor_store_export(generation):
+    # 증분 계산이 반영된 세대를 표시해두고 SIMILARITY_STORE_REFRESH_SECONDS 마다 한 번만 내보냄
+    # 그 사이에 반영된 레시피는 get_store_neighbors 가 DB 에서 읽으므로 추천에는 바로 보임
+    _pending_export["generation"] = generation
+    flush_neighbor_store_export()
+
+
+def flush_neighbor_store_export(force=False):
+    generation = _pending_export["generation"]
+    if generation is None:
+        return False
+    now = time.monotonic()
+    if not force and now - _pending_export["exported_at"] < settings.SIMILARITY_STORE_REFRESH_SECONDS:
+        return False
+    _pending_export["generation"] = None
+    _pending_export["exported_at"] = now
+    return export_active_neighbor_store(generation)
+
+
+class NeighborStore:
+    """
+    export_neighbor_store 로 만든 파일을 읽기 전용 mmap 으로 엽니다.
+    gunicorn 워커들이 같은 파일을 열면 페이지 캐시 한 벌을 같이 씁니다.
+
+    ---
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.file_key = (stat.st_ino, stat.st_mtime_ns)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.generation, self.exported_at, recipe_count, neighbor_count = (
+            HEADER.unpack_from(self._mmap)
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} 는 유사도 파일이 아닙니다.")
+        expected_size = HEADER.size + (2 * recipe_count + 1 + 2 * neighbor_count) * 4
+        if len(self._mmap) < expected_size:
+            raise ValueError(f"{path} 파일이 잘렸습니다.")
+
+        view = memoryview(self._mmap)
+        start = HEADER.size
+        self.recipe_ids, start = self._section(view, start, recipe_count, "i")
+        self.offsets, start = self._section(view, start, recipe_count + 1, "i")
+        self.neighbor_ids, start = self._section(view, start, neighbor_count, "i")
+        self.scores, start = self._section(view, start, neighbor_count, "f")
+
+        self._changed_ids = None
+        self._changed_checked_at = 0.0
+
+    @staticmethod
+    def _section(view, start, count, typecode):
+        end = start + count * 4
+        return view[start:end].cast(typecode), end
+
+    def neighbors(self, recipe_id):
+        # [(similar_recipe_id, score)] 점수 내림차순
+        idx = bisect_left(self.recipe_ids, recipe_id)
+        if idx == len(self.recipe_ids) or self.recipe_ids[idx] != recipe_id:
+            return []
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        return list(zip(self.neighbor_ids[start:end], self.scores[start:end]))
+
+    def changed_recipe_ids(self):
+        # 파일을 내보낸 뒤 증분 계산으로 유사도가 바뀐 레시피 (RELOAD_INTERVAL 동안 재사용)
+        now = time.monotonic()
+        if self._changed_ids is None or now - self._changed_checked_at >= RELOAD_INTERVAL:
+            self._changed_ids = set(
+                Updated_recipe.objects.filter(
+                    done=True, updated_at__gte=from_timestamp(self.exported_at)
+                ).values_list("recipe_id", flat=True)
+            )
+            self._changed_checked_at = now
+        return self._changed_ids
+
+
+def get_store_neighbors(store, recipe_ids):
+    """
+    recipe_ids 의 이웃을 {recipe_id: [(similar_recipe_id, score)]} (점수 내림차순) 로 반환합니다.
+    기본은 파일에서 읽고, 파일을 내보낸 뒤 이웃 목록이 바뀌었을 수 있는 레시피만 DB 에서 읽습니다.
+    그래서 새 레시피나 재료를 바꾼 레시피도 다음 내보내기를 기다리지 않고 바로 추천에 반영됩니다.
+    """
+    neighbors = {recipe_id: store.neighbors(recipe_id) for recipe_id in recipe_ids}
+    changed = store.changed_recipe_ids()
+    if not changed:
+        return neighbors
+
+    # 자기 자신이 바뀌었거나, 파일의 이웃 중에 바뀐 레시피가 있거나, 바뀐 레시피가 새 이웃이 된 경우
+    stale_ids = {
+        recipe_id
+        for recipe_id, rows in neighbors.items()
+        if recipe_id in changed or any(similar_id in changed for similar_id, _ in rows)
+    }
+    rest_ids = neighbors.keys() - stale_ids
+    if rest_ids:
+        stale_ids.update(
+            RecipeSimilarity.objects.filter(
+                generation__status="active",
+                recipe_id__in=rest_ids,
+                similar_recipe_id__in=changed,
+            ).values_list("recipe_id", flat=True)
+        )
+    if not stale_ids:
+        return neighbors
+
+    rows = defaultdict(list)
+    for recipe_id, similar_recipe_id, score in (
+        RecipeSimilarity.objects.filter(generation__status="active", recipe_id__in=stale_ids)
+        .order_by("recipe_id", "-similarity_score", "similar_recipe_id")
+        .values_list("recipe_id", "similar_recipe_id", "similarity_score")
+    ):
+        rows[recipe_id].append((similar_recipe_id, score))
+    for recipe_id in stale_ids:
+        neighbors[recipe_id] = rows[recipe_id]
+    return neighbors
+
+
+_store = None
+_checked_at = 0.0
+# 열지 못한 파일 (같은 파일을 요청마다 다시 열지 않도록 기록)
+_bad_file_key = None
+
+
+def get_neighbor_store():
+    """
+    현재 프로세스의 NeighborStore 를 반환합니다. 파일이 없거나 읽을 수 없으면 None 이고,
+    이때 추천은 DB 에서 이웃을 읽습니다.
+    RELOAD_INTERVAL 마다 파일이 교체됐는지 확인해서 새 세대를 다시 엽니다.
+    """
+    global _store, _checked_at, _bad_file_key
+
+    now = time.monotonic()
+    if _store is not None and now - _checked_at < RELOAD_INTERVAL:
+        return _store
+    _checked_at = now
+
+    path = settings.SIMILARITY_STORE_PATH
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        _store = None
+        return None
+
+    file_key = (stat.st_ino, stat.st_mtime_ns)
+    if _store is None or _store.file_key != file_key:
+        if file_key == _bad_file_key:
+            return None
+        try:
+            _store = NeighborStore(path)
+        except (OSError, ValueError, TypeError, struct.error):
+            logger.exception("유사도 파일을 열 수 없어서 DB 에서 이웃을 읽습니다.")
+            _store, _bad_file_key = None, file_key
+    return _store
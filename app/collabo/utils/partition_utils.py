@@ -0,0 +1,111 @@
+from datetime import date, datetime
+
+from django.db import connection, transaction
+
+from collabo.models import Interaction, InteractionRollup
+
+# Interaction 은 created_at 기준 월별 RANGE 파티션 테이블 (collabo 0008 마이그레이션)
+TABLE = Interaction._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_PREFIX = f"{TABLE}_p"
+ROLLUP_TABLE = InteractionRollup._meta.db_table
+
+
+def add_months(day, months):
+    year, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + year, month + 1, 1)
+
+
+def partition_name(month):
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+def list_partitions():
+    # [(월 시작일, 파티션 이름)] 오래된 순 (기본 파티션 제외)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return sorted(
+        (datetime.strptime(name[len(PARTITION_PREFIX) :], "%Y%m").date(), name)
+        for name in names
+        if name.startswith(PARTITION_PREFIX)
+    )
+
+
+def create_partition(month):
+    """
+    month 가 속한 달의 파티션을 만듭니다.
+    기본 파티션에 이미 그 달의 기록이 들어가 있으면 새 파티션으로 옮긴 뒤 붙입니다.
+    """
+    name = partition_name(month)
+    start, end = month, add_months(month, 1)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)")
+        cursor.execute(
+            f"WITH moved AS ("
+            f"DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE created_at >= %s AND created_at < %s RETURNING *"
+            f") INSERT INTO {name} SELECT * FROM moved",
+            [start, end],
+        )
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+
+
+def create_future_partitions(months):
+    # 이번 달부터 months 달 뒤까지 없는 파티션을 만들고, 만든 파티션 이름을 반환
+    existing = {month for month, _ in list_partitions()}
+    this_month = date.today().replace(day=1)
+    created = []
+    for offset in range(months + 1):
+        month = add_months(this_month, offset)
+        if month not in existing:
+            create_partition(month)
+            created.append(partition_name(month))
+    return created
+
+
+ROLLUP_SQL = f"""
+INSERT INTO {ROLLUP_TABLE} (created_at, updated_at, day, recipe_id, group_id, type, count)
+SELECT NOW(), NOW(), created_at::date, recipe_id, group_id, type, COUNT(*)
+FROM {{source}}
+{{where}}
+GROUP BY created_at::date, recipe_id, group_id, type
+ON CONFLICT ON CONSTRAINT collabo_rollup_unique
+DO UPDATE SET count = {ROLLUP_TABLE}.count + EXCLUDED.count, updated_at = EXCLUDED.updated_at
+"""
+
+
+def compact_partitions(keep_months):
+    """
+    이번 달 기준 keep_months 달 이전의 기록을 일별 집계(InteractionRollup)로 합치고
+    원본 파티션은 떼어내서 삭제합니다. 합친 파티션 이름 목록을 반환합니다.
+    """
+    cutoff = add_months(date.today(), -keep_months)
+    compacted = []
+    for month, name in list_partitions():
+        if month >= cutoff:
+            break
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(ROLLUP_SQL.format(source=name, where=""))
+            cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+            cursor.execute(f"DROP TABLE {name}")
+        compacted.append(name)
+
+    # 파티션을 미리 만들지 못해서 기본 파티션에 남은 오래된 기록도 합침
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            ROLLUP_SQL.format(source=DEFAULT_PARTITION, where="WHERE created_at < %s"),
+            [cutoff],
+        )
+        cursor.execute(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < %s", [cutoff])
+        if cursor.rowcount:
+            compacted.append(DEFAULT_PARTITION)
+    return compacted
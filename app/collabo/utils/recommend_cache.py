@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from common.utils.version_utils import bump_version, get_version
+
+# 유사도 테이블이 바뀔 때마다 새 값으로 바뀌는 버전 (사용자별 캐시 키에 들어감)
+SIMILARITY_VERSION_KEY = "recommend:similarity_version"
+
+
+def get_similarity_version():
+    return get_version(SIMILARITY_VERSION_KEY)
+
+
+def recommend_cache_key(user_id):
+    return f"recommend:{user_id}:{get_similarity_version()}"
+
+
+def get_cached_recommend_ids(user_id, compute):
+    """
+    사용자의 추천 레시피 id 목록을 캐시에서 꺼냅니다. 없으면 compute() 로 계산해서 저장합니다.
+    추천할 레시피가 없는 사용자는 빈 목록도 그대로 캐시합니다.
+    """
+    key = recommend_cache_key(user_id)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached["ids"]
+
+    ids = compute()
+    cache.set(key, {"ids": ids}, timeout=settings.RECOMMEND_CACHE_TIMEOUT)
+    return ids
+
+
+def invalidate_user_recommend(user_id):
+    # 새 클릭이 생기면 해당 사용자의 추천만 다시 계산
+    cache.delete(recommend_cache_key(user_id))
+
+
+def invalidate_all_recommend():
+    # 유사도나 그룹 점수가 다시 계산되면 버전을 바꿔서 모든 사용자의 캐시를 한 번에 무효화
+    bump_version(SIMILARITY_VERSION_KEY)
@@ -1,40 +1,160 @@
-from recipes.models import Recipe, Recipe_ingredient
-from collabo.models import RecipeSimilarity
-
-def calculate_all_recipe_similarities():
-    all_recipes = Recipe.objects.all()
-    all_recipe_ingredients = {}
-    
-    for recipe in all_recipes:
-        ingredients = Recipe_ingredient.objects.filter(recipe=recipe)
-        ingredient_names = [ingredient.ingredient.name for ingredient in ingredients]
-        all_recipe_ingredients[recipe.id] = set(ingredient_names)
-
-    def jaccard_similarity(set1, set2):
-        intersection = len(set1.intersection(set2))
-        union = len(set1.union(set2))
-        similarity = round(intersection / union, 4) if union != 0 else 0.0000
-        return similarity
-
-    recipe_similarities = {}
-    for recipe1 in all_recipes:
-        for recipe2 in all_recipes:
-            similarity = jaccard_similarity(all_recipe_ingredients[recipe1.id], all_recipe_ingredients[recipe2.id])
-            recipe_similarities[(recipe1.id, recipe2.id)] = similarity
-
-    return recipe_similarities
-
-def save_all_recipe_similarities():
-    recipe_similarities = calculate_all_recipe_similarities()
-    for (recipe1_id, recipe2_id), similarity in recipe_similarities.items():
-        # recipe1_id와 recipe2_id가 같은 경우 건너뛰기
-        if recipe1_id == recipe2_id:
-            continue
-
-        recipe1 = Recipe.objects.get(id=recipe1_id)
-        recipe2 = Recipe.objects.get(id=recipe2_id)
-        RecipeSimilarity.objects.create(
-            recipe=recipe1,
-            similar_recipe=recipe2,
-            similarity_score=similarity
-        )
\ No newline at end of file
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from collabo.models import RecipeSimilarity, SimilarityGeneration
+from recipes.models import Updated_recipe
+from .similarity_engine import (
+    load_ingredient_matrix,
+    select_neighbors,
+    compute_similarity_rows,
+)
+from .minhash import load_signatures, refresh_signatures
+from .shard_utils import iter_sharded_neighbor_rows
+from .neighbor_store import lock_neighbor_store_export, schedule_neighbor_store_export
+from .generation_utils import get_or_create_active_generation, publish_generation
+from .recommend_cache import invalidate_all_recommend
+
+
+def save_all_recipe_similarities(chunk_size=5000, workers=1, on_progress=None):
+    """
+    새 세대에 전체 유사도를 나눠서 저장한 뒤 한 번에 교체합니다.
+    저장이 끝나기 전까지 추천은 이전 세대만 읽습니다.
+    계산은 레시피 id 구간(샤드)별로 workers 개 프로세스에서 나눠 합니다.
+    """
+    # 계산 시작 전에 쌓여 있던 대기열은 전체 계산에 포함되므로 끝나면 완료 처리
+    pending_ids = list(
+        Updated_recipe.objects.filter(done=False).values_list("id", flat=True)
+    )
+    generation = SimilarityGeneration.objects.create(status="building")
+    try:
+        matrix = load_ingredient_matrix()
+        signatures = None
+        if settings.SIMILARITY_ENGINE == "minhash":
+            # 저장된 서명을 재사용하고, 대기열에 있던(재료가 바뀌었을 수 있는) 레시피만 다시 계산
+            signatures = load_signatures(
+                matrix,
+                refresh_ids=Updated_recipe.objects.filter(id__in=pending_ids).values_list(
+                    "recipe_id", flat=True
+                ),
+            )
+        neighbor_rows = iter_sharded_neighbor_rows(
+            matrix, signatures, workers=workers, on_progress=on_progress
+        )
+
+        rows = []
+        row_count = 0
+        for recipe1_id, neighbors in neighbor_rows:
+            rows.extend(
+                RecipeSimilarity(
+                    generation=generation,
+                    recipe_id=recipe1_id,
+                    similar_recipe_id=recipe2_id,
+                    similarity_score=similarity,
+                )
+                for recipe2_id, similarity in neighbors
+            )
+            if len(rows) >= chunk_size:
+                RecipeSimilarity.objects.bulk_create(rows)
+                row_count += len(rows)
+                rows = []
+
+        RecipeSimilarity.objects.bulk_create(rows)
+        row_count += len(rows)
+    except Exception:
+        # 작성 중이던 세대는 추천에서 읽지 않으므로 그대로 지우면 됨
+        RecipeSimilarity.objects.filter(generation=generation).delete()
+        generation.delete()
+        raise
+
+    generation.recipe_count = len(matrix)
+    generation.row_count = row_count
+    publish_generation(generation, pending_ids)
+    invalidate_all_recommend()
+    return generation
+
+
+def update_pending_similarities(batch_size=100):
+    """
+    아직 점수가 반영되지 않은 Updated_recipe 들만 유사도를 계산해서 반영합니다.
+    처리한 레시피 수를 반환합니다.
+    """
+    with transaction.atomic():
+        # 여러 프로세스가 동시에 돌아도 같은 행을 처리하지 않도록 잠금
+        pending = list(
+            Updated_recipe.objects.select_for_update(skip_locked=True)
+            .filter(done=False)
+            .order_by("id")[:batch_size]
+        )
+        if not pending:
+            return 0
+
+        recipe_ids = {updated.recipe_id for updated in pending}
+        similarities = compute_similarity_rows(recipe_ids)
+        generation = get_or_create_active_generation()
+
+        # 해당 레시피가 들어간 기존 유사도는 양방향 모두 지우고 다시 저장
+        RecipeSimilarity.objects.filter(
+            Q(recipe_id__in=recipe_ids) | Q(similar_recipe_id__in=recipe_ids),
+            generation=generation,
+        ).delete()
+
+        pairs = {}
+        for recipe_id, row in similarities.items():
+            for similar_recipe_id, score in select_neighbors(recipe_id, row):
+                pairs[(recipe_id, similar_recipe_id)] = score
+            # 반대 방향은 상대 레시피의 상위 이웃에 들어갈 수도 있으므로 일단 모두 넣고 아래에서 정리
+            for similar_recipe_id, score in select_neighbors(recipe_id, row, top_k=0):
+                pairs[(similar_recipe_id, recipe_id)] = score
+
+        RecipeSimilarity.objects.bulk_create(
+            [
+                RecipeSimilarity(
+                    generation=generation,
+                    recipe_id=recipe_id,
+                    similar_recipe_id=similar_recipe_id,
+                    similarity_score=score,
+                )
+                for (recipe_id, similar_recipe_id), score in pairs.items()
+            ],
+            batch_size=1000,
+        )
+        trim_neighbors(generation, {recipe_id for recipe_id, _ in pairs})
+        # 다음 전체 재계산(minhash)에서 읽는 서명도 함께 갱신
+        refresh_signatures(recipe_ids)
+
+        # 이웃 파일 내보내기가 이 반영을 놓치지 않도록, 커밋할 때까지 내보내기를 기다리게 함
+        # (내보내기는 잠금을 잡은 뒤의 시각을 기록하므로 그 전에 반영된 레시피는 모두 파일에 들어감)
+        lock_neighbor_store_export(shared=True)
+        # update()는 auto_now 를 갱신하지 않으므로 updated_at 을 직접 기록
+        Updated_recipe.objects.filter(id__in=[updated.id for updated in pending]).update(
+            done=True, updated_at=timezone.now()
+        )
+
+    # 이웃 파일 전체를 다시 쓰는 일이므로 배치마다 하지 않고 일정 간격으로만 내보냄
+    schedule_neighbor_store_export(generation)
+    invalidate_all_recommend()
+    return len(recipe_ids)
+
+
+def trim_neighbors(generation, recipe_ids):
+    # 레시피별로 상위 SIMILARITY_TOP_K 개를 넘는 이웃 삭제
+    top_k = settings.SIMILARITY_TOP_K
+    if not top_k or not recipe_ids:
+        return
+
+    overflow_ids = list(
+        RecipeSimilarity.objects.filter(generation=generation, recipe_id__in=recipe_ids)
+        .annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=F("recipe_id"),
+                order_by=[F("similarity_score").desc(), F("similar_recipe_id").asc()],
+            )
+        )
+        .filter(rank__gt=top_k)
+        .values_list("id", flat=True)
+    )
+    RecipeSimilarity.objects.filter(id__in=overflow_ids).delete()
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from collabo.models import Interaction, InteractionRollup, Score
+from .recommend_cache import invalidate_all_recommend
+
+SCORE_TABLE = Score._meta.db_table
+
+# 최근 조회 수를 (레시피, 그룹) 별로 세고, GROUPING SETS 로 전체 사용자 기준(group_id NULL) 행도 함께 만듦
+# 그룹이 없는 사용자의 조회는 전체 기준에만 들어감
+REFRESH_SQL = f"""
+INSERT INTO {SCORE_TABLE} (created_at, updated_at, recipe_id, group_id, score)
+SELECT NOW(), NOW(), recipe_id, group_id, SUM(count)
+FROM (
+    SELECT recipe_id, group_id, COUNT(*) AS count
+    FROM {Interaction._meta.db_table}
+    WHERE created_at >= %s
+    GROUP BY recipe_id, group_id
+    UNION ALL
+    SELECT recipe_id, group_id, SUM(count) AS count
+    FROM {InteractionRollup._meta.db_table}
+    WHERE day >= %s
+    GROUP BY recipe_id, group_id
+) AS counts
+GROUP BY GROUPING SETS ((recipe_id, group_id), (recipe_id))
+HAVING GROUPING(group_id) = 1 OR group_id IS NOT NULL
+"""
+
+
+def refresh_group_scores(days=None):
+    """
+    최근 days 일 동안의 조회 기록으로 Score 테이블을 다시 채우고 저장한 행 수를 반환합니다.
+    삭제와 저장이 한 트랜잭션이므로 읽는 쪽은 이전 점수나 새 점수 중 하나만 봅니다.
+    """
+    days = days or settings.GROUP_SCORE_DAYS
+    since = timezone.now() - timedelta(days=days)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SCORE_TABLE}")
+        cursor.execute(REFRESH_SQL, [since, since.date()])
+        count = cursor.rowcount
+    invalidate_all_recommend()
+    return count
+
+
+def get_group_top_recipe_ids(group_id, limit=None):
+    # 그룹의 인기 레시피 id (점수 내림차순), 그룹이 없으면 전체 사용자 기준
+    limit = limit or settings.GROUP_SCORE_LIMIT
+    return list(
+        Score.objects.filter(group_id=group_id)
+        .order_by("-score", "recipe_id")
+        .values_list("recipe_id", flat=True)[:limit]
+    )
@@ -0,0 +1,84 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+from .minhash import build_lsh_index, candidate_similarity_row
+from .similarity_engine import select_neighbors
+
+# 샤드 하나에 들어가는 레시피 행 수
+SHARD_SIZE = 2000
+
+# fork 된 자식 프로세스가 그대로 물려받는 계산 상태 (자식에서는 DB 를 쓰지 않음)
+_shard_state = {}
+
+
+def split_shards(matrix, shard_size=None):
+    # 정렬된 레시피 id 를 연속 구간(행 번호 범위)으로 나누기
+    shard_size = shard_size or SHARD_SIZE
+    return [
+        (start, min(start + shard_size, len(matrix)))
+        for start in range(0, len(matrix), shard_size)
+    ]
+
+
+def compute_shard(bounds):
+    # minhash 엔진이면 LSH 후보만 정확히 계산 (예전 iter_minhash_neighbor_rows 를 샤드 단위로 옮김)
+    start, end = bounds
+    matrix = _shard_state["matrix"]
+    index = _shard_state.get("index")
+    signatures = _shard_state.get("signatures")
+
+    rows = []
+    for idx in range(start, end):
+        recipe_id = matrix.recipe_ids[idx]
+        if index is None:
+            row = matrix.similarity_row(idx)
+        elif recipe_id in signatures:
+            candidates = index.candidates(signatures[recipe_id])
+            row = candidate_similarity_row(matrix, recipe_id, candidates)
+        else:
+            row = {}
+        rows.append((recipe_id, select_neighbors(recipe_id, row)))
+    return rows
+
+
+def iter_sharded_neighbor_rows(matrix, signatures=None, workers=1, on_progress=None):
+    """
+    샤드 단위로 이웃 목록을 계산해서 (recipe_id, [(similar_recipe_id, score)]) 를 반환합니다.
+    workers 가 2 이상이면 프로세스 풀에서 샤드를 나눠 계산합니다.
+    on_progress(끝난 샤드 수, 전체 샤드 수) 는 샤드가 끝날 때마다 호출됩니다.
+    """
+    _shard_state.clear()
+    _shard_state["matrix"] = matrix
+    if signatures is not None:
+        _shard_state["signatures"] = signatures
+        _shard_state["index"] = build_lsh_index(signatures)
+
+    shards = split_shards(matrix)
+    try:
+        if workers <= 1:
+            results = map(compute_shard, shards)
+            yield from _report_progress(results, len(shards), on_progress)
+            return
+
+        # 자식 프로세스가 부모의 DB 연결을 물려받아 닫아버리지 않도록 먼저 닫기
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            results = executor.map(compute_shard, shards)
+            yield from _report_progress(results, len(shards), on_progress)
+    finally:
+        _shard_state.clear()
+
+
+def _report_progress(results, total, on_progress):
+    for done, rows in enumerate(results, 1):
+        yield from rows
+        if on_progress:
+            on_progress(done, total)
+
+
+def default_workers():
+    return settings.SIMILARITY_JOB_WORKERS or multiprocessing.cpu_count()
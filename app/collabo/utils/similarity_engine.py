@@ -0,0 +1,139 @@
+import heapq
+from collections import Counter, defaultdict
+from itertools import chain
+
+from django.conf import settings
+
+from recipes.models import Recipe, Recipe_ingredient
+
+# 한 번에 처리할 레시피 행(row) 수. 블록 단위로 나눠서 메모리 사용량을 일정하게 유지
+BLOCK_SIZE = 500
+
+
+class IngredientMatrix:
+    """
+    레시피 x 재료 희소 행렬
+
+    각 행은 레시피 하나의 재료 id 집합이고, 역색인(재료 id -> 행 번호 목록)을 함께 들고 있어
+    A·Aᵀ 곱(교집합 크기)을 0이 아닌 칸만 골라서 계산할 수 있습니다.
+
+    ---
+    """
+
+    def __init__(self, recipe_ingredients):
+        # recipe_ingredients: {recipe_id: 재료 id 집합}
+        self.recipe_ids = sorted(recipe_ingredients)
+        self.rows = [frozenset(recipe_ingredients[i]) for i in self.recipe_ids]
+        self.row_index = {recipe_id: idx for idx, recipe_id in enumerate(self.recipe_ids)}
+
+        self.postings = defaultdict(list)
+        for idx, ingredients in enumerate(self.rows):
+            for ingredient_id in ingredients:
+                self.postings[ingredient_id].append(idx)
+
+    def __len__(self):
+        return len(self.recipe_ids)
+
+    def intersection_counts(self, idx):
+        # idx 행과 재료가 하나 이상 겹치는 행들의 교집합 크기
+        return Counter(
+            chain.from_iterable(self.postings[i] for i in self.rows[idx])
+        )
+
+    def similarity_row(self, idx):
+        """
+        idx 행과 나머지 모든 행의 자카드 유사도 중 0이 아닌 값만 반환합니다.
+        점수는 기존 jaccard_similarity와 같이 소수점 4자리로 반올림합니다.
+        """
+        size = len(self.rows[idx])
+        row = {}
+        for other, intersection in self.intersection_counts(idx).items():
+            union = size + len(self.rows[other]) - intersection
+            row[self.recipe_ids[other]] = round(intersection / union, 4)
+        return row
+
+
+def select_neighbors(recipe_id, row, top_k=None, min_score=None):
+    """
+    유사도 row({similar_recipe_id: score})에서 저장할 이웃만 골라
+    [(similar_recipe_id, score)] 를 점수 내림차순으로 반환합니다.
+    top_k 가 있으면 힙으로 상위 k개만 선택하고, 0이면 개수 제한 없이 모두 반환합니다.
+    """
+    if top_k is None:
+        top_k = settings.SIMILARITY_TOP_K
+    if min_score is None:
+        min_score = settings.SIMILARITY_MIN_SCORE
+
+    candidates = (
+        (similar_recipe_id, score)
+        for similar_recipe_id, score in row.items()
+        if similar_recipe_id != recipe_id and score > 0 and score >= min_score
+    )
+    # 점수가 같으면 id가 작은 레시피 우선
+    key = lambda item: (item[1], -item[0])
+    if top_k:
+        return heapq.nlargest(top_k, candidates, key=key)
+    return sorted(candidates, key=key, reverse=True)
+
+
+def load_ingredient_matrix():
+    # 레시피와 재료 id를 한 번의 쿼리(LEFT JOIN)로 가져오기
+    # 재료가 없는 레시피는 ingredient_id가 None으로 들어옴
+    recipe_ingredients = defaultdict(set)
+    rows = Recipe.objects.values_list("id", "recipe_ingredient__ingredient_id")
+    for recipe_id, ingredient_id in rows.iterator(chunk_size=5000):
+        ingredients = recipe_ingredients[recipe_id]
+        if ingredient_id is not None:
+            ingredients.add(ingredient_id)
+    return IngredientMatrix(recipe_ingredients)
+
+
+def compute_similarity_rows(recipe_ids):
+    """
+    주어진 레시피들만 전체 카탈로그와 비교한 유사도(0이 아닌 값)를 반환합니다.
+    전체 행렬을 올리지 않고, 대상 레시피와 재료가 겹치는 레시피만 불러옵니다.
+    """
+    targets = defaultdict(set)
+    rows = Recipe.objects.filter(id__in=recipe_ids).values_list(
+        "id", "recipe_ingredient__ingredient_id"
+    )
+    for recipe_id, ingredient_id in rows:
+        ingredients = targets[recipe_id]
+        if ingredient_id is not None:
+            ingredients.add(ingredient_id)
+
+    ingredient_ids = set().union(*targets.values())
+    if not ingredient_ids:
+        return {recipe_id: {} for recipe_id in targets}
+
+    # 대상 레시피와 재료가 하나라도 겹치는 후보 레시피의 전체 재료
+    candidate_ids = (
+        Recipe_ingredient.objects.filter(ingredient_id__in=ingredient_ids)
+        .values("recipe_id")
+        .distinct()
+    )
+    candidates = defaultdict(set)
+    rows = Recipe_ingredient.objects.filter(recipe_id__in=candidate_ids).values_list(
+        "recipe_id", "ingredient_id"
+    )
+    for recipe_id, ingredient_id in rows.iterator(chunk_size=5000):
+        candidates[recipe_id].add(ingredient_id)
+
+    postings = defaultdict(list)
+    for recipe_id, ingredients in candidates.items():
+        for ingredient_id in ingredients & ingredient_ids:
+            postings[ingredient_id].append(recipe_id)
+
+    similarities = {}
+    for recipe_id, ingredients in targets.items():
+        counts = Counter(chain.from_iterable(postings[i] for i in ingredients))
+
+        similarities[recipe_id] = {
+            other: round(
+                intersection
+                / (len(ingredients) + len(candidates[other]) - intersection),
+                4,
+            )
+            for other, intersection in counts.items()
+        }
+    return similarities
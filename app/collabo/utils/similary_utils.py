@@ -1,79 +1,123 @@
+import heapq
+from collections import defaultdict
+
 from collabo.models import RecipeSimilarity
 from collabo.utils.interaction_utils import get_recent_interactions
-from recipes.models import Recipe, Updated_recipe
-from django.db.models import Case, When, Count, F, Q
+from collabo.utils.neighbor_store import get_neighbor_store, get_store_neighbors
+from collabo.utils.recommend_cache import get_cached_recommend_ids
+from collabo.utils.score_utils import get_group_top_recipe_ids
+from collabo.utils.utils import get_group_id
+from common.utils.stats_utils import annotate_recipe_stats
+from recipes.models import Recipe
+from users.models import User
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import (
+    BigIntegerField,
+    Case,
+    F,
+    FloatField,
+    Func,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast
 
 
 def get_sorted_recipes_without_similar(queryset):
-    return queryset.annotate(
-        like_count=Count("like", filter=Q(like__recipe_id=F("id"))),
-        comment_count=Count("comment", filter=Q(comment__recipe_id=F("id"))),
-        bookmark_count=Count("bookmark", filter=Q(bookmark__recipe_id=F("id"))),
-        total_interaction=F("like_count") + F("comment_count") + F("bookmark_count"),
-    ).order_by("-total_interaction")
+    return annotate_recipe_stats(queryset).order_by("-total_interaction")
 
 
 def get_category_recipes(category_name):
     """
     해당 카테고리의 레시피를 상호작용 수 기준으로 정렬하여 반환합니다.
     """
-    return (
+    return get_sorted_recipes_without_similar(
         Recipe.objects.filter(category=category_name)
-        .annotate(
-            like_count=Count("like", filter=Q(like__recipe_id=F("id"))),
-            comment_count=Count("comment", filter=Q(comment__recipe_id=F("id"))),
-            bookmark_count=Count("bookmark", filter=Q(bookmark__recipe_id=F("id"))),
-            total_interaction=F("like_count")
-            + F("comment_count")
-            + F("bookmark_count"),
-        )
-        .order_by("-total_interaction")
     )
 
 
-def get_recommend_recipes(user_id,):
-    # 사용자의 최근 상호작용 레시피 ID 목록 가져오기
-    recent_recipe_ids = get_recent_interactions(user_id)
-    similar_recipes_with_scores = {}
-    if recent_recipe_ids:
-        WEIGHTS = [1.5, 1.4, 1.3, 1.2, 1.1]
-        for idx, recipe_id in enumerate(recent_recipe_ids):
-            # 최근 상호작용일수록 높은 가중치 부여
-            similar_recipe_ids = RecipeSimilarity.objects.filter(
-                recipe=recipe_id
-            ).values("similar_recipe", "similarity_score")
-
-            for similar_recipe in similar_recipe_ids:
-                sim_recipe_id = similar_recipe["similar_recipe"]
-                similarity_score = similar_recipe["similarity_score"]
-                score = similarity_score * WEIGHTS[idx]
-
-                if sim_recipe_id in similar_recipes_with_scores:
-                    similar_recipes_with_scores[sim_recipe_id] += score
-                else:
-                    similar_recipes_with_scores[sim_recipe_id] = score
-
-        sorted_similar_recipe_ids = sorted(
-            similar_recipes_with_scores.keys(),
-            key=lambda x: similar_recipes_with_scores[x],
-            reverse=True,
-        )
-        preserved_order = Case(
-            *[When(id=pk, then=pos) for pos, pk in enumerate(sorted_similar_recipe_ids)]
-        )
-        similar_recipes = Recipe.objects.filter(
-            id__in=sorted_similar_recipe_ids
-        ).order_by(preserved_order)
+# 최근 상호작용일수록 높은 가중치 부여
+WEIGHTS = [1.5, 1.4, 1.3, 1.2, 1.1]
+
+
+def order_by_ids(queryset, ids):
+    # ids 순서대로 정렬 (id 개수만큼 CASE WHEN 을 만드는 대신 array_position 한 번으로 정렬)
+    id_array = Cast(
+        Value(list(ids), output_field=ArrayField(BigIntegerField())),
+        ArrayField(BigIntegerField()),
+    )
+    return queryset.filter(id__in=ids).order_by(
+        Func(id_array, F("id"), function="array_position")
+    )
+
+
+def get_recommend_recipe_ids(recent_recipe_ids, limit=None):
+    """
+    최근 본 레시피들의 이웃 점수를 가중합해서 추천 레시피 id 를 점수 순으로 반환합니다.
+    """
+    limit = limit or settings.SIMILARITY_RECOMMEND_LIMIT
+    weights = dict(zip(recent_recipe_ids, WEIGHTS))
 
-        updated_recipe_ids = Updated_recipe.objects.filter(done=False).values_list(
-            "recipe", flat=True
+    # 이웃 파일이 있으면 mmap 에서 읽기 (파일을 내보낸 뒤 바뀐 레시피만 DB 에서 읽음)
+    store = get_neighbor_store()
+    if store is not None:
+        neighbors = get_store_neighbors(store, weights.keys())
+        scores = defaultdict(float)
+        for recipe_id, weight in weights.items():
+            for similar_recipe_id, similarity_score in neighbors[recipe_id]:
+                scores[similar_recipe_id] += similarity_score * weight
+        return heapq.nlargest(limit, scores, key=lambda x: (scores[x], -x))
+
+    # 사용 중인 세대의 이웃을 한 번의 GROUP BY 쿼리로 가중합
+    weight = Case(
+        *[When(recipe_id=recipe_id, then=Value(w)) for recipe_id, w in weights.items()],
+        output_field=FloatField(),
+    )
+    return list(
+        RecipeSimilarity.objects.filter(
+            generation__status="active", recipe_id__in=weights.keys()
         )
+        .values("similar_recipe_id")
+        .annotate(score=Sum(F("similarity_score") * weight))
+        .order_by("-score", "similar_recipe_id")
+        .values_list("similar_recipe_id", flat=True)[:limit]
+    )
+
 
-        # 혹시 모를 겹치는 부분 제거
-        updated_recipes = Recipe.objects.filter(id__in=updated_recipe_ids).exclude(
-            id__in=sorted_similar_recipe_ids
+def get_user_recommend_ids(user_id):
+    # 사용자의 추천 순위는 새 클릭이나 유사도/점수 재계산이 있을 때까지 캐시에서 재사용
+    return get_cached_recommend_ids(
+        user_id, lambda: compute_recommend_recipe_ids(user_id)
+    )
+
+
+def get_recommend_recipes(user_id,):
+    sorted_recipe_ids = get_user_recommend_ids(user_id)
+    if sorted_recipe_ids:
+        similar_recipes = order_by_ids(
+            annotate_recipe_stats(Recipe.objects.all()), sorted_recipe_ids
         )
-        # similar_recipe += Recipe.objects.filter(id__in)
+
+        # 추천 목록에 없는 레시피(아직 점수 반영 안된 레시피 포함)는
+        # 상호작용 수 기준으로 뒤에 붙임
+        updated_recipes = Recipe.objects.exclude(id__in=sorted_recipe_ids)
         return similar_recipes, get_sorted_recipes_without_similar(updated_recipes)
     else:
         return get_sorted_recipes_without_similar(Recipe.objects.all()), None
+
+
+def compute_recommend_recipe_ids(user_id):
+    # 최근 상호작용이 있으면 유사도 기반, 없으면 사용자 그룹의 인기 레시피
+    recent_recipe_ids = get_recent_interactions(user_id)
+    if recent_recipe_ids:
+        return get_recommend_recipe_ids(recent_recipe_ids)
+    return get_group_top_recipe_ids(get_user_group_id(user_id))
+
+
+def get_user_group_id(user_id):
+    user = User.objects.filter(id=user_id).values("age", "gender").first()
+    if user is None:
+        return None
+    return get_group_id(user["age"], user["gender"])
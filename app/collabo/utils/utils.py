@@ -1,2 +1,6 @@
 def get_group_id(age, gender):
-    return (gender * 6) + (age // 10)
\ No newline at end of file
+    # 나이/성별을 입력하지 않은 사용자는 그룹 없이 기록
+    if age is None or gender is None:
+        return None
+    # Group 은 10대 ~ 60대 이상까지만 있음
+    return (gender * 6) + min(max(age // 10, 1), 6)
@@ -1,16 +1,47 @@
 from django.shortcuts import render
+from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from .utils.save_similary import save_all_recipe_similarities
+from .models import SimilarityJob
+from .utils.job_utils import enqueue_similarity_job
 
 
+def get_job_data(job):
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "done_shards": job.done_shards,
+        "total_shards": job.total_shards,
+        "generation": job.generation_id,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
 
 
 class SaveRecipeSimilarView(APIView):
     def get(self, request):
-        # 모든 레시피 간 유사도 계산 및 저장
-        save_all_recipe_similarities()
+        # 모든 레시피 간 유사도 계산은 run_similarity_jobs 워커가 처리하도록 작업만 등록
+        job = enqueue_similarity_job()
 
-        return Response({"message": "Recipe similarities saved successfully."})
+        return Response(
+            {
+                "status": 202,
+                "message": "Recipe similarity rebuild queued.",
+                "data": get_job_data(job),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
 
+
+class RecipeSimilarJobView(APIView):
+    def get(self, request, id):
+        try:
+            job = SimilarityJob.objects.get(pk=id)
+        except SimilarityJob.DoesNotExist:
+            return Response(
+                {"status": 404, "message": f"ID {id}에 해당하는 작업을 찾을 수 없습니다."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return Response({"status": 200, "message": "조회 성공", "data": get_job_data(job)})
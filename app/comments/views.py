@@ -5,6 +5,7 @@ from users.models import User
 from recipes.models import Recipe
 from django.http import JsonResponse
 from rest_framework import status
+from django.db import transaction
 
 
 class CommentView(APIView):
@@ -30,7 +31,11 @@ class CommentView(APIView):
             return Response(
                 {"error": "Recipe not found"}, status=status.HTTP_404_NOT_FOUND
             )
-        comment = Comment.objects.create(user=user, recipe=recipe, comment=comment_text)
+        # 댓글과 레시피 카운터를 한 트랜잭션에서 저장
+        with transaction.atomic():
+            comment = Comment.objects.create(
+                user=user, recipe=recipe, comment=comment_text
+            )
         return Response(
             {
                 "comment_id": comment.id,
@@ -1,3 +1,190 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import OperationalError
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from collabo.management.commands import update_group_scores
+from common.utils import command_utils
+from common.utils import ingredient_index as ingredient_index_module
+from common.utils.fridge_utils import parse_fridge_cursor, rank_fridge_recipes
+from common.utils.ingredient_index import IngredientIndex, record_index_changes
+from config.test_settings import TEST_CACHES
+from ingredients.models import Ingredient
+from likes.models import Like
+from recipes.models import Recipe, Recipe_ingredient, RecipeIngredientChange, Unit
+from users.models import User
+
+
+class StopLoop(Exception):
+    pass
+
+
+class IntervalCommandTests(SimpleTestCase):
+    def test_loop_logs_errors_and_keeps_running(self):
+        refresh = mock.Mock(side_effect=[OperationalError("connection lost"), 3])
+        with mock.patch.object(update_group_scores, "refresh_group_scores", refresh), \
+                mock.patch.object(command_utils.time, "sleep", side_effect=[None, StopLoop]), \
+                mock.patch.object(command_utils.connections, "close_all") as close_all:
+            with self.assertLogs(command_utils.logger, level="ERROR"):
+                with self.assertRaises(StopLoop):
+                    call_command("update_group_scores", interval=1, stdout=mock.Mock())
+
+        self.assertEqual(refresh.call_count, 2)
+        close_all.assert_called_once()
+
+    def test_single_run_raises(self):
+        refresh = mock.Mock(side_effect=OperationalError("connection lost"))
+        with mock.patch.object(update_group_scores, "refresh_group_scores", refresh):
+            with self.assertRaises(OperationalError):
+                call_command("update_group_scores", stdout=mock.Mock())
+
+
+@override_settings(CACHES=TEST_CACHES)
+class IngredientFixtureTestCase(TestCase):
+    def setUp(self):
+        # 버전 키를 지워서 워커 메모리 인덱스가 이 테스트의 데이터로 다시 만들어지게 함
+        caches["coordination"].clear()
+        self.user = User.objects.create(social_id="tester", nickname="tester", age=20, gender=False)
+        self.unit = Unit.objects.create(id=1, unit="g")
+        self.ingredients = [Ingredient.objects.create(name=f"재료{i}") for i in range(6)]
+
+    def create_recipe(self, *ingredients):
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = Recipe.objects.create(user=self.user, title="레시피", category=1)
+            for ingredient in ingredients:
+                Recipe_ingredient.objects.create(
+                    recipe=recipe, ingredient=ingredient, unit=self.unit, quantity=1
+                )
+        return recipe
+
+
+class IngredientIndexTests(IngredientFixtureTestCase):
+    def test_match_counts_and_set_operations(self):
+        a, b, c, d = self.ingredients[:4]
+        first = self.create_recipe(a, b, c)
+        second = self.create_recipe(b, d)
+        third = self.create_recipe(d)
+
+        index = IngredientIndex()
+        self.assertEqual(
+            index.match_counts([a.id, b.id]), {first.id: (2, 3), second.id: (1, 2)}
+        )
+        self.assertEqual(index.recipe_ids(index.all_of([a.id, b.id])), [first.id])
+        self.assertEqual(
+            index.recipe_ids(index.any_of([a.id, d.id])), sorted([first.id, second.id, third.id])
+        )
+        self.assertEqual(index.count(index.any_of([a.id, d.id])), 3)
+        self.assertEqual(index.recipe_ids(index.at_least([a.id, b.id, c.id], 2)), [first.id])
+        self.assertEqual(index.recipe_ids(index.all_of([])), [])
+
+    def test_ingredient_ids_is_a_copy(self):
+        a, b = self.ingredients[:2]
+        recipe = self.create_recipe(a)
+        index = IngredientIndex()
+        ingredient_ids = index.ingredient_ids()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Recipe_ingredient.objects.create(recipe=recipe, ingredient=b, unit=self.unit, quantity=1)
+        self.assertEqual(index.ingredient_ids(), {a.id, b.id})
+        self.assertEqual(ingredient_ids, {a.id})
+
+    def test_other_worker_reloads_only_changed_recipes(self):
+        a, b, c = self.ingredients[:3]
+        recipe = self.create_recipe(a)
+        deleted = self.create_recipe(a, c)
+        reader = IngredientIndex()
+        self.assertEqual(reader.match_counts([a.id]), {recipe.id: (1, 1), deleted.id: (1, 2)})
+
+        # 재료 행 저장/삭제 신호로 커밋 후 변경 기록이 한 번에 남음
+        RecipeIngredientChange.objects.all().delete()
+        deleted_id = deleted.id
+        with self.captureOnCommitCallbacks(execute=True):
+            Recipe_ingredient.objects.filter(recipe=recipe).delete()
+            for ingredient in (b, c):
+                Recipe_ingredient.objects.create(
+                    recipe=recipe, ingredient=ingredient, unit=self.unit, quantity=1
+                )
+            deleted.delete()
+        self.assertEqual(
+            sorted(RecipeIngredientChange.objects.values_list("recipe_id", flat=True)),
+            sorted([recipe.id, deleted_id]),
+        )
+
+        with mock.patch.object(IngredientIndex, "_build") as build:
+            self.assertEqual(reader.match_counts([a.id]), {})
+            self.assertEqual(reader.match_counts([b.id, c.id]), {recipe.id: (2, 2)})
+        build.assert_not_called()
+
+    def test_too_many_changes_rebuild(self):
+        a = self.ingredients[0]
+        recipe = self.create_recipe(a)
+        reader = IngredientIndex()
+        reader.match_counts([a.id])
+
+        with mock.patch.object(ingredient_index_module, "MAX_CHANGES", 1):
+            record_index_changes([recipe.id, recipe.id + 1])
+            with mock.patch.object(IngredientIndex, "_build", wraps=reader._build) as build:
+                self.assertEqual(reader.match_counts([a.id]), {recipe.id: (1, 1)})
+        build.assert_called_once()
+
+
+class RankFridgeRecipesTests(IngredientFixtureTestCase):
+    def rank_all(self, fridge, size):
+        pages, cursor = [], None
+        while True:
+            recipes, cursor = rank_fridge_recipes(
+                fridge, cursor=cursor and parse_fridge_cursor(cursor), size=size
+            )
+            pages.append([recipe.id for recipe in recipes])
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_every_candidate_once_in_coverage_order(self):
+        a, b, c, d, e, f = self.ingredients
+        full = self.create_recipe(a, b)
+        half = [self.create_recipe(a, c), self.create_recipe(b, d), self.create_recipe(a, f)]
+        third = self.create_recipe(a, e, f)
+        self.create_recipe(e)
+        # 충족률이 같으면 인기, 그다음 최신 순
+        Like.objects.create(user=self.user, recipe=half[0])
+
+        self.assertEqual(
+            self.rank_all([a.id, b.id], size=2),
+            [[full.id, half[0].id], [half[2].id, half[1].id], [third.id]],
+        )
+        self.assertEqual(
+            self.rank_all([a.id, b.id], size=10),
+            [[full.id, half[0].id, half[2].id, half[1].id, third.id]],
+        )
+
+    def test_recipe_fields_and_last_page(self):
+        a, b = self.ingredients[:2]
+        recipe = self.create_recipe(a, b)
+        Like.objects.create(user=self.user, recipe=recipe)
+
+        recipes, cursor = rank_fridge_recipes([a.id], size=5)
+        self.assertIsNone(cursor)
+        self.assertEqual(
+            (recipes[0].id, recipes[0].matched_count, recipes[0].ingredient_count),
+            (recipe.id, 1, 2),
+        )
+        self.assertEqual((recipes[0].coverage, recipes[0].popularity), (0.5, 1))
+        self.assertEqual(
+            rank_fridge_recipes([a.id], cursor=(0.5, 1, recipe.id), size=5), ([], None)
+        )
+        self.assertEqual(rank_fridge_recipes([], size=5), ([], None))
+
+    def test_cursor_round_trips(self):
+        a, b, c = self.ingredients[:3]
+        self.create_recipe(a, b, c)
+        recipe = self.create_recipe(a, b, c)
+        self.create_recipe(a, b, c)
+
+        recipes, cursor = rank_fridge_recipes([a.id], size=1)
+        recipes, cursor = rank_fridge_recipes([a.id], cursor=parse_fridge_cursor(cursor), size=1)
+        self.assertEqual([r.id for r in recipes], [recipe.id])
+        self.assertEqual(parse_fridge_cursor(cursor), (1 / 3, 0, recipe.id))
+        with self.assertRaises(ValueError):
+            parse_fridge_cursor("0.5,1")
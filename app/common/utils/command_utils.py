@@ -0,0 +1,50 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class IntervalCommand(BaseCommand):
+    """
+    run_once 를 한 번 실행하거나, --interval 을 주면 그 간격(초)으로 계속 반복하는 명령어입니다.
+    반복 중에 난 예외(DB 연결 끊김 등)는 로그로 남기고 다음 반복에서 다시 시도하므로
+    일시적인 오류로 반복이 멈추지 않습니다. 한 번만 실행할 때는 예외를 그대로 올립니다.
+
+    ---
+    """
+
+    interval_help = "0보다 크면 이 간격(초)으로 계속 실행합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help=self.interval_help,
+        )
+
+    def run_once(self, **options):
+        # 한 번 실행할 작업. True 를 반환하면 남은 작업이 있다는 뜻으로 쉬지 않고 바로 다시 실행
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        while True:
+            try:
+                busy = self.run_once(**options)
+            except Exception:
+                if interval <= 0:
+                    raise
+                logger.exception("%s 실행 중 오류가 나서 다음 반복에서 다시 시도합니다.", self.__module__)
+                # 끊기거나 실패한 트랜잭션에 걸린 연결은 버리고 다음 반복에서 새로 연결
+                connections.close_all()
+                busy = False
+
+            if busy:
+                continue
+            if interval <= 0:
+                return
+            time.sleep(interval)
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch, prefetch_related_objects
+
+from recipes.models import Recipe_ingredient, Recipe_step
+from recipes.serializers import RecipeSerializer
+
+
+def recipe_detail_cache_key(recipe):
+    # 레시피를 수정하면 updated_at 이 바뀌므로 이전 캐시는 자연스럽게 쓰이지 않음
+    return f"recipe_detail:{recipe.id}:{recipe.updated_at.isoformat()}"
+
+
+def build_recipe_detail(recipe):
+    """
+    모든 사용자에게 같은 레시피 상세 데이터 (레시피 필드, 재료, 단계) 를 만듭니다.
+    재료(재료 이름, 단위)와 단계는 prefetch 로 쿼리 두 번에 가져옵니다.
+    """
+    prefetch_related_objects(
+        [recipe],
+        Prefetch(
+            "recipe_ingredient",
+            queryset=Recipe_ingredient.objects.select_related("ingredient", "unit").order_by("id"),
+        ),
+        Prefetch("recipe_step", queryset=Recipe_step.objects.order_by("id")),
+    )
+    return {
+        "recipe": dict(RecipeSerializer(recipe).data),
+        "ingredients": [
+            {
+                "id": ingredient.id,
+                "name": ingredient.ingredient.name,
+                "quantity": ingredient.quantity,
+                "unit": ingredient.unit.unit,
+            }
+            for ingredient in recipe.recipe_ingredient.all()
+        ],
+        "steps": [
+            {
+                "step": step.step,
+                "image": step.image.url if step.image else "",
+            }
+            for step in recipe.recipe_step.all()
+        ],
+    }
+
+
+def get_recipe_detail(recipe):
+    # 캐시에 없으면 새로 만들어서 RECIPE_DETAIL_CACHE_TIMEOUT 동안 저장
+    key = recipe_detail_cache_key(recipe)
+    detail = cache.get(key)
+    if detail is None:
+        detail = build_recipe_detail(recipe)
+        cache.set(key, detail, timeout=settings.RECIPE_DETAIL_CACHE_TIMEOUT)
+    return detail
@@ -0,0 +1,95 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.functions import Coalesce
+
+from recipes.models import Recipe, Recipe_ingredient
+from .ingredient_index import ingredient_index
+
+
+def parse_fridge_cursor(cursor):
+    # "충족률,인기,레시피 id" 문자열을 정렬 키로 바꿈 (형식이 틀리면 ValueError)
+    coverage, popularity, recipe_id = cursor.split(",")
+    return float(coverage), int(popularity), int(recipe_id)
+
+
+def format_fridge_cursor(recipe):
+    # 다음 페이지 요청에 넘길 마지막 레시피의 정렬 키 (충족률은 그대로 되돌릴 수 있도록 repr)
+    return f"{recipe.coverage!r},{recipe.popularity},{recipe.id}"
+
+
+def rank_fridge_recipes(ingredient_ids, cursor=None, size=None):
+    """
+    냉장고 재료가 하나라도 들어간 레시피를 (충족률, 인기, id) 내림차순으로 정렬해서 cursor 다음 size 개를 반환합니다.
+    충족률 = 레시피 재료 중 냉장고에 있는 재료 수 / 레시피 재료 수, 인기 = 좋아요 + 북마크 수
+    cursor 는 이전 페이지 마지막 레시피의 (충족률, 인기, id) 이고, 반환값은 (레시피 목록, 다음 cursor 또는 None) 입니다.
+    각 레시피에는 matched_count, ingredient_count, coverage, popularity 가 붙습니다.
+    """
+    size = size or settings.FRIDGE_RECOMMEND_PAGE_SIZE
+    # 겹치는 재료 수와 레시피 재료 수는 워커 메모리의 재료 -> 레시피 인덱스에서 계산
+    match_counts = ingredient_index.match_counts(ingredient_ids)
+    tiers = defaultdict(list)
+    for recipe_id, (matched, total) in match_counts.items():
+        coverage = matched / total
+        if cursor is None or coverage <= cursor[0]:
+            tiers[coverage].append(recipe_id)
+
+    # 충족률이 높은 묶음부터 한 페이지 + 1 개를 채울 수 있을 만큼만 고름
+    # cursor 가 가리키는 묶음은 이미 보여준 레시피가 섞여 있으므로 개수에 넣지 않음
+    coverages, candidate_count = [], 0
+    for coverage in sorted(tiers, reverse=True):
+        if candidate_count > size:
+            break
+        coverages.append(coverage)
+        if cursor is None or coverage != cursor[0]:
+            candidate_count += len(tiers[coverage])
+    if not coverages:
+        return [], None
+
+    # 묶음 순서, 인기, id 순으로 DB 에서 정렬해서 size + 1 개만 가져옴
+    recipes = (
+        Recipe.objects.filter(
+            id__in=[recipe_id for coverage in coverages for recipe_id in tiers[coverage]]
+        )
+        .select_related("user")
+        .annotate(
+            tier=Case(
+                *[
+                    When(id__in=tiers[coverage], then=Value(rank))
+                    for rank, coverage in enumerate(coverages)
+                ],
+                output_field=IntegerField(),
+            ),
+            popularity=Coalesce(F("stats__like_count"), 0)
+            + Coalesce(F("stats__bookmark_count"), 0),
+        )
+    )
+    if cursor is not None and coverages[0] == cursor[0]:
+        # cursor 와 충족률이 같은 묶음에서는 cursor 보다 뒤에 오는 레시피만
+        _, popularity, recipe_id = cursor
+        recipes = recipes.filter(
+            Q(tier__gt=0)
+            | Q(popularity__lt=popularity)
+            | Q(popularity=popularity, id__lt=recipe_id)
+        )
+    recipes = list(recipes.order_by("tier", "-popularity", "-id")[: size + 1])
+
+    for recipe in recipes:
+        recipe.matched_count, recipe.ingredient_count = match_counts[recipe.id]
+        recipe.coverage = recipe.matched_count / recipe.ingredient_count
+    # 한 개 더 가져와서 다음 페이지가 있는지 확인
+    if len(recipes) > size:
+        recipes = recipes[:size]
+        return recipes, format_fridge_cursor(recipes[-1])
+    return recipes, None
+
+
+def get_recipe_ingredients(recipe_ids):
+    # 레시피별 재료 (id, 이름) 목록 {recipe_id: [(ingredient_id, name)]} (쿼리 한 번)
+    recipe_ingredients = defaultdict(list)
+    for recipe_id, ingredient_id, name in Recipe_ingredient.objects.filter(
+        recipe_id__in=recipe_ids
+    ).values_list("recipe_id", "ingredient_id", "ingredient__name"):
+        recipe_ingredients[recipe_id].append((ingredient_id, name))
+    return recipe_ingredients
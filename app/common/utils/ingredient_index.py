@@ -0,0 +1,248 @@
+import bisect
+import threading
+import time
+from array import array
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from recipes.models import Recipe_ingredient, RecipeIngredientChange
+from .version_utils import bump_version, get_version
+
+# 어느 프로세스에서든 레시피 재료가 바뀌면 새 값으로 바뀌는 버전 (바뀐 레시피 목록은 DB 에 기록)
+INDEX_VERSION_KEY = "ingredient_index:version"
+# 변경 기록 유지 시간(초), 이보다 오래 조회가 없던 워커는 처음부터 다시 만듦
+CHANGE_TIMEOUT = 60 * 60 * 24
+# 따라갈 변경 기록이 이보다 많으면 처음부터 다시 만듦
+MAX_CHANGES = 1000
+# 변경 기록을 남기는 작업끼리 겹치지 않도록 잡는 advisory lock 키 (id 순서 = 커밋 순서)
+CHANGE_LOCK_KEY = 7_020_003
+
+# 레시피 id 목록 타입 (부호 없는 32비트 정수)
+POSTING_TYPE = "I"
+
+
+def build_posting(recipe_ids):
+    # 정렬된 레시피 id 배열 (레시피 하나당 4바이트)
+    return array(POSTING_TYPE, sorted(recipe_ids))
+
+
+def posting_remove(posting, recipe_id):
+    position = bisect.bisect_left(posting, recipe_id)
+    if position < len(posting) and posting[position] == recipe_id:
+        del posting[position]
+
+
+def posting_contains(posting, recipe_id):
+    position = bisect.bisect_left(posting, recipe_id)
+    return position < len(posting) and posting[position] == recipe_id
+
+
+def posting_add(posting, recipe_id):
+    position = bisect.bisect_left(posting, recipe_id)
+    if position == len(posting) or posting[position] != recipe_id:
+        posting.insert(position, recipe_id)
+
+
+class IngredientIndex:
+    """
+    재료 id -> 그 재료가 들어간 레시피 id 의 정렬된 배열 (array('I')) 을 워커 메모리에 둡니다.
+    첫 조회 때 Recipe_ingredient 를 한 번 읽어서 만들고, 레시피 재료가 바뀌면 신호에서 변경 기록을 DB 에 남겨서
+    각 워커가 다음 조회 때 바뀐 레시피의 재료만 다시 읽습니다.
+    냉장고 재료 중 하나라도/모두/k개 이상 들어간 레시피를 정렬된 배열의 합집합/교집합/개수 세기로 찾습니다.
+
+    ---
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}
+        self._recipe_ingredients = {}
+        self._version = None
+        self._change_id = None
+        self._checked_at = None
+
+    def _sync(self):
+        # 잠금 안에서 조회마다 한 번 호출, 다른 워커의 변경이 있으면 바뀐 레시피만 (기록이 끊겼으면 전체를) 다시 읽음
+        now = time.monotonic()
+        expired = self._checked_at is None or now - self._checked_at > CHANGE_TIMEOUT
+        self._checked_at = now
+        version = get_version(INDEX_VERSION_KEY)
+        if self._version == version and not expired:
+            return
+        recipe_ids = None if expired else self._changed_recipe_ids()
+        if recipe_ids is None:
+            self._build()
+        else:
+            self._reload(recipe_ids)
+        self._version = version
+
+    def _changed_recipe_ids(self):
+        # 이 워커가 마지막으로 읽은 기록 다음부터 바뀐 레시피 id (너무 많으면 None)
+        changes = list(
+            RecipeIngredientChange.objects.filter(id__gt=self._change_id)
+            .order_by("id")
+            .values_list("id", "recipe_id")[: MAX_CHANGES + 1]
+        )
+        if len(changes) > MAX_CHANGES:
+            return None
+        if changes:
+            self._change_id = changes[-1][0]
+        return {recipe_id for _, recipe_id in changes}
+
+    def _build(self):
+        # 만드는 동안 남은 변경 기록은 다음 조회 때 다시 읽도록 마지막 기록 id 를 먼저 읽음
+        self._change_id = RecipeIngredientChange.objects.aggregate(last=Max("id"))["last"] or 0
+        ingredient_recipes = defaultdict(list)
+        recipe_ingredients = defaultdict(set)
+        for recipe_id, ingredient_id in Recipe_ingredient.objects.values_list(
+            "recipe_id", "ingredient_id"
+        ).iterator():
+            ingredient_recipes[ingredient_id].append(recipe_id)
+            recipe_ingredients[recipe_id].add(ingredient_id)
+        self._postings = {
+            ingredient_id: build_posting(set(recipe_ids))
+            for ingredient_id, recipe_ids in ingredient_recipes.items()
+        }
+        self._recipe_ingredients = {
+            recipe_id: frozenset(ingredient_ids)
+            for recipe_id, ingredient_ids in recipe_ingredients.items()
+        }
+
+    def _reload(self, recipe_ids):
+        # 바뀐 레시피의 재료를 쿼리 한 번으로 읽어서 해당 배열만 고침 (삭제된 레시피는 재료 없음)
+        recipe_ingredients = defaultdict(set)
+        for recipe_id, ingredient_id in Recipe_ingredient.objects.filter(
+            recipe_id__in=recipe_ids
+        ).values_list("recipe_id", "ingredient_id"):
+            recipe_ingredients[recipe_id].add(ingredient_id)
+        for recipe_id in recipe_ids:
+            self._set_recipe(recipe_id, recipe_ingredients.get(recipe_id, ()))
+
+    def _set_recipe(self, recipe_id, ingredient_ids):
+        for ingredient_id in self._recipe_ingredients.pop(recipe_id, ()):
+            posting = self._postings[ingredient_id]
+            posting_remove(posting, recipe_id)
+            if not posting:
+                del self._postings[ingredient_id]
+        if ingredient_ids:
+            for ingredient_id in ingredient_ids:
+                posting = self._postings.get(ingredient_id)
+                if posting is None:
+                    posting = self._postings[ingredient_id] = array(POSTING_TYPE)
+                posting_add(posting, recipe_id)
+            self._recipe_ingredients[recipe_id] = frozenset(ingredient_ids)
+
+    def refresh_recipe(self, recipe_id):
+        """
+        Recipe_ingredient 저장/삭제 신호에서 호출합니다.
+        같은 트랜잭션에서 재료 행마다 여러 번 불러도 커밋 후 레시피 id 를 모아서 변경 기록을 한 번에 남깁니다.
+        """
+        if not hasattr(_pending, "recipe_ids"):
+            _pending.recipe_ids = set()
+        _pending.recipe_ids.add(recipe_id)
+        transaction.on_commit(flush_index_changes)
+
+    def _get_postings(self, ingredient_ids):
+        with self._lock:
+            self._sync()
+            return [
+                self._postings.get(ingredient_id, array(POSTING_TYPE))
+                for ingredient_id in set(ingredient_ids)
+            ]
+
+    def any_of(self, ingredient_ids):
+        # 재료가 하나라도 들어간 레시피 id 배열
+        with self._lock:
+            recipe_ids = set()
+            for posting in self._get_postings(ingredient_ids):
+                recipe_ids.update(posting)
+            return build_posting(recipe_ids)
+
+    def all_of(self, ingredient_ids):
+        # 재료가 모두 들어간 레시피 id 배열 (가장 짧은 배열부터 나머지 배열에서 이분 탐색)
+        with self._lock:
+            postings = sorted(self._get_postings(ingredient_ids), key=len)
+            if not postings:
+                return array(POSTING_TYPE)
+            result = array(POSTING_TYPE, postings[0])
+            for posting in postings[1:]:
+                result = array(
+                    POSTING_TYPE,
+                    (recipe_id for recipe_id in result if posting_contains(posting, recipe_id)),
+                )
+            return result
+
+    def at_least(self, ingredient_ids, k):
+        # 재료가 k개 이상 들어간 레시피 id 배열
+        return build_posting(
+            recipe_id
+            for recipe_id, (matched, _) in self.match_counts(ingredient_ids).items()
+            if matched >= k
+        )
+
+    def match_counts(self, ingredient_ids):
+        """
+        재료가 하나라도 들어간 레시피별로 {recipe_id: (겹치는 재료 수, 레시피 재료 수)} 를 반환합니다.
+        버전은 한 번만 확인하고 두 값을 같은 상태에서 읽으므로 레시피 재료 수는 항상 1 이상입니다.
+        """
+        with self._lock:
+            counts = defaultdict(int)
+            for posting in self._get_postings(ingredient_ids):
+                for recipe_id in posting:
+                    counts[recipe_id] += 1
+            recipe_ingredients = self._recipe_ingredients
+            return {
+                recipe_id: (matched, len(recipe_ingredients[recipe_id]))
+                for recipe_id, matched in counts.items()
+            }
+
+    def ingredient_ids(self):
+        # 레시피에 하나라도 쓰인 재료 id (다른 스레드가 인덱스를 고쳐도 바뀌지 않는 복사본)
+        with self._lock:
+            self._sync()
+            return frozenset(self._postings)
+
+    @staticmethod
+    def count(posting):
+        return len(posting)
+
+    @staticmethod
+    def recipe_ids(posting):
+        return list(posting)
+
+
+# 커밋 후 변경 기록을 남길 레시피 id (스레드마다 따로 모음)
+_pending = threading.local()
+
+
+def flush_index_changes():
+    # 같은 트랜잭션에서 등록된 나머지 호출은 모을 id 가 없으므로 바로 끝남
+    recipe_ids = getattr(_pending, "recipe_ids", None)
+    if not recipe_ids:
+        return
+    _pending.recipe_ids = set()
+    record_index_changes(recipe_ids)
+
+
+def record_index_changes(recipe_ids):
+    """
+    재료가 바뀐 레시피를 변경 기록에 남기고 버전을 바꿔서 모든 워커가 이 레시피들만 다시 읽게 합니다.
+    advisory lock 안에서 기록하므로 기록 id 는 커밋 순서대로 늘어나고, 버전은 커밋 후에 바꿉니다.
+    유지 시간이 지난 기록은 이때 함께 지웁니다.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CHANGE_LOCK_KEY])
+        RecipeIngredientChange.objects.bulk_create(
+            [RecipeIngredientChange(recipe_id=recipe_id) for recipe_id in recipe_ids]
+        )
+        RecipeIngredientChange.objects.filter(
+            created_at__lt=timezone.now() - timedelta(seconds=CHANGE_TIMEOUT)
+        ).delete()
+    bump_version(INDEX_VERSION_KEY)
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,39 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .version_utils import bump_version, get_version
+
+# 레시피나 레시피 재료가 바뀔 때마다 새 값으로 바뀌는 버전 (검색어별 캐시 키에 들어감)
+CATALOG_VERSION_KEY = "search:catalog_version"
+
+
+def get_catalog_version():
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def search_cache_key(keyword):
+    # keyword 는 정규화된 검색어 (한글도 캐시 키에 안전하도록 해시 사용)
+    digest = hashlib.md5(keyword.encode()).hexdigest()
+    return f"search:{get_catalog_version()}:{digest}"
+
+
+def get_cached_search_results(keyword, compute):
+    """
+    정규화된 검색어의 검색 결과 [(recipe_id, 검색 순위)] 를 캐시에서 꺼냅니다. 없으면 compute() 로 계산해서 저장합니다.
+    결과가 없는 검색어도 그대로 캐시하고, SEARCH_CACHE_TIMEOUT 이 지나면 다시 계산합니다.
+    """
+    key = search_cache_key(keyword)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached["results"]
+
+    results = compute()
+    cache.set(key, {"results": results}, timeout=settings.SEARCH_CACHE_TIMEOUT)
+    return results
+
+
+def invalidate_search_cache():
+    # 레시피 작성/수정/삭제 시 버전을 바꿔서 모든 검색어 캐시를 한 번에 무효화
+    bump_version(CATALOG_VERSION_KEY)
@@ -0,0 +1,113 @@
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from django.db import transaction
+
+from recipes.models import Recipe, Recipe_ingredient
+from .search_cache import get_cached_search_results, invalidate_search_cache
+from .stats_utils import annotate_recipe_stats
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_search_text(text):
+    # 한글 자모 조합(NFC), 대소문자, 공백 차이를 없앰
+    text = unicodedata.normalize("NFC", text or "")
+    return WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def build_search_text(title, ingredient_names):
+    """
+    레시피 제목과 재료 이름을 합친 검색용 문자열을 만듭니다.
+    "김치 찌개" 처럼 띄어 쓴 제목도 "김치찌개" 로 찾을 수 있도록 공백을 뺀 제목을 함께 넣습니다.
+    """
+    title = normalize_search_text(title)
+    parts = [title, title.replace(" ", "")]
+    parts.extend(normalize_search_text(name) for name in ingredient_names)
+    return "\n".join(part for part in parts if part)
+
+
+def refresh_search_texts(recipe_ids):
+    """
+    레시피들의 검색용 문자열을 제목과 재료 이름으로 다시 만들어서 바뀐 것만 저장합니다 (updated_at 은 건드리지 않음).
+    바뀐 레시피가 있으면 검색 결과 캐시를 무효화하고, 바뀐 레시피 수를 반환합니다.
+    """
+    ingredient_names = defaultdict(list)
+    for recipe_id, name in Recipe_ingredient.objects.filter(
+        recipe_id__in=recipe_ids
+    ).values_list("recipe_id", "ingredient__name"):
+        ingredient_names[recipe_id].append(name)
+
+    changed = []
+    for recipe in Recipe.objects.filter(id__in=recipe_ids).only("id", "title", "search_text"):
+        search_text = build_search_text(recipe.title, ingredient_names[recipe.id])
+        if recipe.search_text != search_text:
+            recipe.search_text = search_text
+            changed.append(recipe)
+    if changed:
+        Recipe.objects.bulk_update(changed, ["search_text"], batch_size=1000)
+        transaction.on_commit(invalidate_search_cache)
+    return len(changed)
+
+
+# 커밋 후 검색용 문자열을 다시 만들 레시피 id (스레드마다 따로 모음)
+_pending = threading.local()
+
+
+def refresh_search_text_on_commit(recipe_ids):
+    """
+    레시피 제목/재료/재료 이름이 바뀐 신호에서 호출합니다.
+    같은 트랜잭션에서 재료 행마다 여러 번 불러도 커밋 후 레시피 id 를 모아서 한 번에 갱신합니다.
+    """
+    if not hasattr(_pending, "recipe_ids"):
+        _pending.recipe_ids = set()
+    _pending.recipe_ids.update(recipe_ids)
+    transaction.on_commit(flush_search_text_refresh)
+
+
+def flush_search_text_refresh():
+    # 같은 트랜잭션에서 등록된 나머지 호출은 모을 id 가 없으므로 바로 끝남
+    recipe_ids = getattr(_pending, "recipe_ids", None)
+    if not recipe_ids:
+        return
+    _pending.recipe_ids = set()
+    refresh_search_texts(recipe_ids)
+
+
+def search_recipes(queryset, keyword):
+    # search_text 의 pg_trgm GIN 인덱스로 부분 일치 검색 (LIKE '%keyword%')
+    return queryset.filter(search_text__contains=normalize_search_text(keyword))
+
+
+def search_rank(title, keyword):
+    # 제목이 검색어로 시작 > 제목에 포함 > 재료 이름에만 포함
+    keyword = normalize_search_text(keyword)
+    title = normalize_search_text(title)
+    if title.startswith(keyword) or title.replace(" ", "").startswith(keyword):
+        return 2
+    if keyword in title or keyword in title.replace(" ", ""):
+        return 1
+    return 0
+
+
+def rank_search_results(keyword):
+    # 검색 결과 [(recipe_id, 검색 순위)], 검색 순위가 같으면 상호작용 수가 많은 순
+    recipes = (
+        annotate_recipe_stats(search_recipes(Recipe.objects.all(), keyword))
+        .order_by("-total_interaction", "-id")
+        .values_list("id", "title")
+    )
+    results = [(recipe_id, search_rank(title, keyword)) for recipe_id, title in recipes]
+    results.sort(key=lambda result: -result[1])
+    return results
+
+
+def get_search_results(keyword):
+    """
+    모든 사용자에게 같은 검색 결과 [(recipe_id, 검색 순위)] 를 반환합니다.
+    정규화된 검색어 기준으로 캐시하므로 " 김치", "김치" 는 같은 결과를 씁니다.
+    """
+    keyword = normalize_search_text(keyword)
+    return get_cached_search_results(keyword, lambda: rank_search_results(keyword))
@@ -0,0 +1,105 @@
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest
+
+from bookmarks.models import Bookmark
+from collabo.models import Interaction, InteractionRollup
+from comments.models import Comment
+from likes.models import Like
+from recipes.models import Recipe, RecipeStats
+
+# 카운터 필드와 실제 개수를 세는 (모델, 집계) 목록
+# 오래된 조회 기록은 파티션을 정리하면서 InteractionRollup 으로 합쳐지므로 둘을 더함
+STAT_SOURCES = {
+    "like_count": [(Like, Count("id"))],
+    "bookmark_count": [(Bookmark, Count("id"))],
+    "comment_count": [(Comment, Count("id"))],
+    "view_count": [(Interaction, Count("id")), (InteractionRollup, Sum("count"))],
+}
+
+
+def increase_recipe_stats(recipe_id, **counts):
+    """
+    레시피 카운터를 counts 만큼 늘립니다. 예) increase_recipe_stats(1, like_count=1)
+    카운터 행이 없는 레시피(bulk_create 로 만든 레시피 등)는 실제 개수로 새로 채웁니다.
+    """
+    updated = RecipeStats.objects.filter(recipe_id=recipe_id).update(
+        **{field: F(field) + count for field, count in counts.items()}
+    )
+    if not updated:
+        reconcile_recipe_stats([recipe_id])
+
+
+def decrease_recipe_stats(recipe_id, **counts):
+    # 레시피가 삭제되는 중에도 불릴 수 있으므로 행이 없으면 새로 만들지 않음
+    RecipeStats.objects.filter(recipe_id=recipe_id).update(
+        **{field: Greatest(F(field) - count, 0) for field, count in counts.items()}
+    )
+
+
+def count_subquery(model, aggregate):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(recipe_id=OuterRef("recipe_id"))
+            .order_by()
+            .values("recipe_id")
+            .annotate(total=aggregate)
+            .values("total")
+        ),
+        0,
+    )
+
+
+def real_count(field):
+    sources = iter(STAT_SOURCES[field])
+    expression = count_subquery(*next(sources))
+    for model, aggregate in sources:
+        expression = expression + count_subquery(model, aggregate)
+    return expression
+
+
+def reconcile_recipe_stats(recipe_ids=None):
+    """
+    카운터를 실제 좋아요/북마크/댓글/조회 수와 비교해서 다른 행만 다시 계산합니다.
+    recipe_ids 가 없으면 전체 레시피를 확인하고, 고친 행 수를 반환합니다.
+    """
+    recipes = Recipe.objects.filter(stats__isnull=True)
+    stats = RecipeStats.objects.all()
+    if recipe_ids is not None:
+        recipes = recipes.filter(id__in=recipe_ids)
+        stats = stats.filter(recipe_id__in=recipe_ids)
+
+    RecipeStats.objects.bulk_create(
+        [RecipeStats(recipe_id=recipe_id) for recipe_id in recipes.values_list("id", flat=True)],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+    real_counts = {f"real_{field}": real_count(field) for field in STAT_SOURCES}
+    matched = Q()
+    for field in STAT_SOURCES:
+        matched &= Q(**{field: F(f"real_{field}")})
+    drifted_ids = list(
+        stats.annotate(**real_counts).exclude(matched).values_list("recipe_id", flat=True)
+    )
+
+    return RecipeStats.objects.filter(recipe_id__in=drifted_ids).update(
+        **{field: real_count(field) for field in STAT_SOURCES}
+    )
+
+
+def annotate_recipe_stats(queryset):
+    # 레시피 목록에 카운터를 붙임 (카운터 행이 없으면 0)
+    return queryset.annotate(
+        like_count=Coalesce(F("stats__like_count"), 0),
+        comment_count=Coalesce(F("stats__comment_count"), 0),
+        bookmark_count=Coalesce(F("stats__bookmark_count"), 0),
+        total_interaction=F("like_count") + F("comment_count") + F("bookmark_count"),
+    )
+
+
+def get_recipe_stats(recipe):
+    # 카운터 행이 아직 없는 레시피는 0 으로 채운 (저장하지 않은) 객체 반환
+    try:
+        return recipe.stats
+    except RecipeStats.DoesNotExist:
+        return RecipeStats(recipe=recipe)
@@ -0,0 +1,22 @@
+import time
+
+from django.core.cache import caches
+
+
+def get_version_cache():
+    # 버전 키는 오래된 항목 정리(cull)가 일어나지 않는 별도 캐시(coordination)에 둠
+    return caches["coordination"]
+
+
+def get_version(key):
+    # 캐시에서 버전이 사라졌으면 새 버전으로 시작 (이전 키와 겹치지 않도록 시각 사용)
+    version_cache = get_version_cache()
+    version_cache.add(key, time.time_ns(), timeout=None)
+    return version_cache.get(key)
+
+
+def bump_version(key):
+    # 새 버전을 저장하고 반환 (이 버전이 들어간 캐시 키는 모두 새로 만들어짐)
+    version = time.time_ns()
+    get_version_cache().set(key, version, timeout=None)
+    return version
@@ -0,0 +1,66 @@
+from django.db.models import Value
+
+from bookmarks.models import Bookmark
+from likes.models import Like
+from recipes.models import RecipeStats
+
+
+def load_viewer_status(user_id, recipe_ids):
+    """
+    recipe_ids 중 사용자가 좋아요/북마크한 레시피 id 집합을 (liked, bookmarked) 로 반환합니다.
+    좋아요와 북마크를 UNION 으로 묶어서 쿼리 한 번으로 가져옵니다.
+    """
+    liked, bookmarked = set(), set()
+    if not user_id or not recipe_ids:
+        return liked, bookmarked
+
+    likes = Like.objects.filter(user_id=user_id, recipe_id__in=recipe_ids).values_list(
+        "recipe_id", Value("like")
+    )
+    bookmarks = Bookmark.objects.filter(
+        user_id=user_id, recipe_id__in=recipe_ids
+    ).values_list("recipe_id", Value("bookmark"))
+    for recipe_id, kind in likes.union(bookmarks, all=True):
+        (liked if kind == "like" else bookmarked).add(recipe_id)
+    return liked, bookmarked
+
+
+class ViewerState:
+    """
+    레시피 목록에 대한 사용자의 좋아요/북마크 여부와 좋아요/북마크 수를 담습니다.
+    load_viewer_state 로 만들고, 목록 길이와 상관없이 쿼리는 두 번입니다.
+
+    ---
+    """
+
+    def __init__(self, liked, bookmarked, counts):
+        self.liked = liked
+        self.bookmarked = bookmarked
+        self.counts = counts
+
+    def like_status(self, recipe_id):
+        return 1 if recipe_id in self.liked else -1
+
+    def bookmark_status(self, recipe_id):
+        return 1 if recipe_id in self.bookmarked else -1
+
+    def like_count(self, recipe_id):
+        return self.counts.get(recipe_id, (0, 0))[0]
+
+    def bookmark_count(self, recipe_id):
+        return self.counts.get(recipe_id, (0, 0))[1]
+
+
+def load_viewer_state(user_id, recipe_ids):
+    # 좋아요/북마크 여부(UNION 쿼리 한 번)와 카운터(IN 쿼리 한 번)
+    recipe_ids = list(recipe_ids)
+    liked, bookmarked = load_viewer_status(user_id, recipe_ids)
+    counts = {}
+    if recipe_ids:
+        counts = {
+            recipe_id: (like_count, bookmark_count)
+            for recipe_id, like_count, bookmark_count in RecipeStats.objects.filter(
+                recipe_id__in=recipe_ids
+            ).values_list("recipe_id", "like_count", "bookmark_count")
+        }
+    return ViewerState(liked, bookmarked, counts)
@@ -69,6 +69,7 @@ DJANGO_SYSTEM_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 ]
 
 LIBRARY_APPS = [
@@ -260,3 +261,80 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
 }
 
+
+# 레시피 유사도 설정
+# 레시피마다 유사도가 높은 이웃 SIMILARITY_TOP_K 개만 저장 (None 이면 0보다 큰 쌍 모두 저장)
+SIMILARITY_TOP_K = 50
+# 이 점수보다 낮은 이웃은 저장하지 않음
+SIMILARITY_MIN_SCORE = 0.01
+
+# 유사도 계산 방식: "exact"(모든 쌍) 또는 "minhash"(LSH 후보만 정확히 계산)
+SIMILARITY_ENGINE = "exact"
+# MinHash 서명 길이 = BANDS * ROWS, 후보가 되는 유사도 기준은 대략 (1 / BANDS) ** (1 / ROWS)
+SIMILARITY_MINHASH_BANDS = 32
+SIMILARITY_MINHASH_ROWS = 2
+# 전체 재계산 작업에서 사용할 프로세스 수 (None 이면 CPU 코어 수)
+SIMILARITY_JOB_WORKERS = None
+# 전체 재계산 작업이 진행 중임을 기록하는 간격(초), 이 시간(초) 동안 기록이 없으면 워커가 죽은 것으로 보고 실패 처리
+SIMILARITY_JOB_HEARTBEAT_SECONDS = 30
+SIMILARITY_JOB_STALE_SECONDS = 60 * 5
+# 추천에서 mmap 으로 읽는 레시피 이웃 파일 (재계산 때마다 새로 내보냄)
+SIMILARITY_STORE_PATH = os.path.join(BASE_DIR, "data", "similarity_neighbors.bin")
+# 증분 계산 결과를 이웃 파일에 반영하는 최소 간격(초) (전체 재계산은 세대를 올릴 때 바로 내보냄)
+# 그 사이에 반영된 레시피의 이웃은 추천할 때 DB 에서 읽음
+SIMILARITY_STORE_REFRESH_SECONDS = 60 * 5
+# 유사도 기반 추천 목록에 올리는 최대 레시피 수
+SIMILARITY_RECOMMEND_LIMIT = 100
+
+
+# 유사도 작업 프로세스와 웹 워커가 같은 캐시를 보도록 공유 볼륨(data)의 파일 캐시 사용
+# default: 추천 순위/검색 결과/상세/메인 스냅샷 (MAX_ENTRIES 를 넘으면 1/CULL_FREQUENCY 만큼 정리)
+# coordination: 캐시 버전 키처럼 사라지면 안 되는 몇 개의 키만 두는 캐시 (정리되지 않도록 넉넉하게)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, "data", "cache"),
+        "OPTIONS": {
+            "MAX_ENTRIES": 5000,
+            "CULL_FREQUENCY": 4,
+        },
+    },
+    "coordination": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, "data", "coordination"),
+        "OPTIONS": {
+            "MAX_ENTRIES": 1_000_000,
+        },
+    },
+}
+# 사용자별 추천 순위 캐시 유지 시간(초)
+RECOMMEND_CACHE_TIMEOUT = 60 * 10
+
+# 레시피 조회 기록은 워커 메모리에 모았다가 한 번에 저장
+# 이 개수만큼 모이거나 첫 기록 후 이 시간(초)이 지나면 저장
+INTERACTION_BUFFER_SIZE = 100
+INTERACTION_FLUSH_INTERVAL = 5
+# 같은 사용자가 같은 레시피를 이 시간(초) 안에 다시 보면 한 번만 기록
+INTERACTION_DEBOUNCE_SECONDS = 60
+# 저장에 실패한 기록은 버퍼에 되돌려 다시 시도 (DB 장애가 길어지면 이 개수를 넘는 오래된 기록부터 버림)
+INTERACTION_BUFFER_MAX_PENDING = 10000
+
+# 최근 상호작용이 없는 사용자에게 보여줄 그룹별 인기 레시피
+# 최근 GROUP_SCORE_DAYS 일 동안의 조회 수로 점수를 매기고 상위 GROUP_SCORE_LIMIT 개를 추천
+GROUP_SCORE_DAYS = 30
+GROUP_SCORE_LIMIT = 100
+
+# 메인 페이지 공용 데이터(주간 베스트, 카테고리별 최신 레시피) 캐시 유지 시간(초)
+MAIN_SNAPSHOT_TIMEOUT = 60
+
+# 냉장고 재료 기반 추천에서 한 번에 보여줄 레시피 수
+FRIDGE_RECOMMEND_PAGE_SIZE = 15
+
+# 재료 이름 자동완성에서 한 번에 보여줄 재료 수
+INGREDIENT_AUTOCOMPLETE_LIMIT = 30
+
+# 검색어별 검색 결과 캐시 유지 시간(초), 레시피가 작성/수정/삭제되면 바로 무효화
+SEARCH_CACHE_TIMEOUT = 60 * 10
+
+# 레시피 상세의 공용 데이터(레시피 필드, 재료, 단계) 캐시 유지 시간(초), 키에 updated_at 이 들어가서 수정되면 새로 만듦
+RECIPE_DETAIL_CACHE_TIMEOUT = 60 * 60
@@ -0,0 +1,7 @@
+# 테스트에서 쓰는 설정값
+# 버전 키/캐시를 실제 data/ 디렉터리의 파일 캐시에 쓰지 않도록 프로세스 메모리 캐시를 사용
+# 사용 예) @override_settings(CACHES=TEST_CACHES)
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "coordination": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
@@ -5,6 +5,7 @@ from rest_framework import status
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from .models import Fridge, Ingredient
+from common.utils.ingredient_index import ingredient_index
 
 User = get_user_model()
 
@@ -18,12 +19,20 @@ class FridgeView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        fridge_items = Fridge.objects.filter(user=user)
+        fridge_items = Fridge.objects.filter(user=user).select_related("ingredient")
         ingredients = [
             {"id": item.ingredient.id, "name": item.ingredient.name}
             for item in fridge_items
         ]
 
+        # 냉장고 재료가 들어간 레시피 수와 모든 재료가 냉장고에 있는 레시피 수 (워커 메모리 인덱스에서 계산)
+        match_counts = ingredient_index.match_counts(
+            [ingredient["id"] for ingredient in ingredients]
+        )
+        cookable_count = sum(
+            1 for matched, total in match_counts.values() if matched == total
+        )
+
         return Response(
             {
                 "status": 200,
@@ -31,6 +40,8 @@ class FridgeView(APIView):
                 "data": {
                     "nickname": user.nickname,  # assuming `nickname` is a field in the custom User model
                     "ingredients": ingredients,
+                    "matched_count": len(match_counts),
+                    "cookable_count": cookable_count,
                 },
             },
             status=status.HTTP_200_OK,
@@ -15,4 +15,11 @@ accesslog = '/log/access.log'
 errorlog = '/log/error.log'
 
 # 로그 수준
-loglevel = 'info'
\ No newline at end of file
+loglevel = 'info'
+
+
+def worker_exit(server, worker):
+    # 워커가 종료되기 전에 메모리에 모아둔 레시피 조회 기록 저장
+    from collabo.utils.interaction_buffer import interaction_buffer
+
+    interaction_buffer.flush()
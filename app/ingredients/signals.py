@@ -0,0 +1,26 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Ingredient
+from .utils.autocomplete_utils import invalidate_ingredient_autocomplete
+from common.utils.search_utils import refresh_search_text_on_commit
+from recipes.models import Recipe_ingredient
+
+
+# 재료가 추가/수정/삭제되면 자동완성 인덱스를 다시 만듦
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def refresh_ingredient_autocomplete(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_ingredient_autocomplete)
+
+
+# 재료 이름이 바뀌면 그 재료가 들어간 레시피의 검색용 문자열 갱신 (새 재료는 아직 쓰인 레시피가 없음)
+@receiver(post_save, sender=Ingredient)
+def refresh_search_text_on_ingredient(sender, instance, created, update_fields, **kwargs):
+    if created or (update_fields is not None and "name" not in update_fields):
+        return
+    refresh_search_text_on_commit(
+        Recipe_ingredient.objects.filter(ingredient=instance)
+        .values_list("recipe_id", flat=True)
+        .distinct()
+    )
@@ -1,3 +1,85 @@
-from django.test import TestCase
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from config.test_settings import TEST_CACHES
+from ingredients.models import Ingredient
+from ingredients.utils.autocomplete_utils import (
+    IngredientAutocomplete,
+    get_choseong,
+    iter_grams,
+)
+from recipes.models import Recipe, Recipe_ingredient, Unit
+from users.models import User
+
+
+class ChoseongTests(SimpleTestCase):
+    def test_get_choseong_keeps_non_hangul(self):
+        self.assertEqual(get_choseong("감자abc"), "ㄱㅈabc")
+
+    def test_iter_grams_mixes_syllables_and_choseong(self):
+        self.assertCountEqual(
+            iter_grams("감자", "ㄱㅈ", 2), ["감자", "감ㅈ", "ㄱ자", "ㄱㅈ"]
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class IngredientAutocompleteTests(TestCase):
+    def setUp(self):
+        # 버전 키를 지워서 워커 메모리 인덱스가 이 테스트의 데이터로 다시 만들어지게 함
+        caches["coordination"].clear()
+        self.ids = {
+            name: Ingredient.objects.create(name=name).id
+            for name in ["감자", "왕감자", "감자전분", "고구마", "고추장", "양파", "대파"]
+        }
+        self.autocomplete = IngredientAutocomplete()
+
+    def names(self, query, **kwargs):
+        return [name for _, name in self.autocomplete.search(query, **kwargs)]
+
+    def test_prefix_matches_come_before_infix_matches(self):
+        self.assertEqual(self.names("감자"), ["감자", "감자전분", "왕감자"])
+        self.assertEqual(self.names("파"), ["대파", "양파"])
+
+    def test_choseong_query(self):
+        self.assertEqual(self.names("ㄱㅈ"), ["감자", "감자전분", "왕감자"])
+        self.assertEqual(self.names("ㄱㅊ"), ["고추장"])
+
+    def test_mixed_query(self):
+        self.assertEqual(self.names("감ㅈ"), ["감자", "감자전분", "왕감자"])
+        self.assertEqual(self.names("ㄱ추"), ["고추장"])
+
+    def test_filters_by_ingredient_ids_and_limit(self):
+        self.assertEqual(
+            self.names("ㄱ", ingredient_ids={self.ids["고구마"], self.ids["왕감자"]}),
+            ["고구마", "왕감자"],
+        )
+        self.assertEqual(self.names("ㄱ", limit=2), ["감자", "감자전분"])
+
+    def test_new_ingredient_is_found_after_invalidation(self):
+        self.assertEqual(self.names("당근"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.create(name="당근")
+        self.assertEqual(self.names("ㄷㄱ"), ["당근"])
+
+    def test_fridge_search_returns_only_ingredients_used_in_recipes(self):
+        user = User.objects.create(social_id="tester", nickname="tester")
+        recipe = Recipe.objects.create(user=user, title="감자전", category=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Recipe_ingredient.objects.create(
+                recipe=recipe,
+                ingredient_id=self.ids["감자"],
+                unit=Unit.objects.create(id=1, unit="g"),
+                quantity=1,
+            )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.get("/api/v1/ingredients/fridge/감자")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"], [{"id": self.ids["감자"], "name": "감자"}])
+        response = client.get("/api/v1/ingredients/recipe/감자")
+        self.assertEqual(
+            [ingredient["name"] for ingredient in response.data["data"]],
+            ["감자", "감자전분", "왕감자"],
+        )
@@ -0,0 +1,181 @@
+import bisect
+import heapq
+import threading
+from itertools import islice
+
+from django.conf import settings
+
+from common.utils.search_utils import normalize_search_text
+from common.utils.version_utils import bump_version, get_version
+from ingredients.models import Ingredient
+
+# 어느 프로세스에서든 재료가 추가/수정되면 새 값으로 바뀌는 버전 (다른 워커는 다음 검색 때 다시 만듦)
+AUTOCOMPLETE_VERSION_KEY = "ingredient_autocomplete:version"
+
+HANGUL_START, HANGUL_END = 0xAC00, 0xD7A3
+# 한글 음절 = 0xAC00 + (초성 * 21 + 중성) * 28 + 종성
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+CHOSEONG_SET = set(CHOSEONG)
+
+
+def get_choseong(text):
+    # 한글 음절은 초성으로 바꾸고 나머지 글자는 그대로 둠 ("감자" -> "ㄱㅈ")
+    return "".join(
+        CHOSEONG[(ord(char) - HANGUL_START) // 588]
+        if HANGUL_START <= ord(char) <= HANGUL_END
+        else char
+        for char in text
+    )
+
+
+def match_at(name, choseong, query, start):
+    # 검색어의 초성 글자는 이름의 초성과, 나머지 글자는 이름 글자와 비교
+    for offset, char in enumerate(query):
+        target = choseong if char in CHOSEONG_SET else name
+        if target[start + offset] != char:
+            return False
+    return True
+
+
+def find_match(name, choseong, query):
+    # 검색어가 처음 일치하는 위치 (없으면 -1)
+    for start in range(len(name) - len(query) + 1):
+        if match_at(name, choseong, query, start):
+            return start
+    return -1
+
+
+def iter_grams(name, choseong, size):
+    """
+    이름에서 size 글자씩 이어진 조각을 모두 만듭니다.
+    검색어 글자가 초성이면 이름의 초성과, 아니면 이름 글자와 비교하므로 자리마다 두 글자를 모두 넣습니다.
+    ("감자" 의 2글자 조각은 "감자", "감ㅈ", "ㄱ자", "ㄱㅈ")
+    """
+    for start in range(len(name) - size + 1):
+        grams = [""]
+        for offset in range(start, start + size):
+            chars = {name[offset], choseong[offset]}
+            grams = [gram + char for gram in grams for char in chars]
+        yield from grams
+
+
+class IngredientAutocomplete:
+    """
+    재료 이름 자동완성을 워커 메모리에서 처리합니다.
+    정규화한 이름을 정렬한 배열에서 이진 탐색으로 앞부분 일치를 찾고,
+    중간 일치는 1글자/2글자 조각 -> 재료 위치 역색인으로 후보를 좁힌 뒤 확인합니다.
+    "ㄱㅈ" 처럼 초성만 입력하거나 "감ㅈ" 처럼 섞어 입력해도 "감자" 를 찾습니다.
+
+    ---
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        # (엔트리, 정규화 이름 배열, 초성 배열, 조각 역색인) 을 한 번에 바꿔서 검색 중에 섞이지 않게 함
+        # 엔트리는 (정규화 이름, 초성, id, 원래 이름) 을 정규화 이름 순으로 정렬
+        # 초성 배열은 초성만 입력한 경우 앞부분 일치용 (초성, 엔트리 위치) 정렬 배열
+        self._state = ([], [], [], {})
+
+    def _current_version(self):
+        return get_version(AUTOCOMPLETE_VERSION_KEY)
+
+    def _ensure_built(self):
+        version = self._current_version()
+        with self._lock:
+            if self._version == version:
+                return self._state
+            entries = []
+            for ingredient_id, name in Ingredient.objects.values_list("id", "name"):
+                normalized = normalize_search_text(name)
+                if normalized:
+                    entries.append((normalized, get_choseong(normalized), ingredient_id, name))
+            entries.sort()
+            names = [entry[0] for entry in entries]
+            choseongs = sorted((entry[1], position) for position, entry in enumerate(entries))
+            grams = {}
+            for position, (name, choseong, _, _) in enumerate(entries):
+                for size in (1, 2):
+                    for gram in set(iter_grams(name, choseong, size)):
+                        grams.setdefault(gram, []).append(position)
+            self._state = (entries, names, choseongs, grams)
+            self._version = version
+            return self._state
+
+    def search(self, query, ingredient_ids=None, limit=None):
+        """
+        검색어가 들어간 재료 [(id, 이름)] 을 최대 limit 개 반환합니다.
+        앞부분이 일치하는 재료를 먼저 이름 순으로, 그 다음 중간에 일치하는 재료를 일치 위치와 이름 순으로 정렬합니다.
+        앞부분 일치만으로 limit 개가 차면 중간 일치는 찾지 않습니다.
+        ingredient_ids 가 주어지면 그 안의 재료만 반환합니다.
+        """
+        limit = limit or settings.INGREDIENT_AUTOCOMPLETE_LIMIT
+        entries, names, choseongs, grams = self._ensure_built()
+        query = normalize_search_text(query)
+        if not query:
+            return []
+
+        def allowed(position):
+            return ingredient_ids is None or entries[position][2] in ingredient_ids
+
+        # 앞부분 일치: 정렬 배열에서 이진 탐색 (초성이 섞인 검색어는 조각 역색인 후보에서 확인)
+        if all(char in CHOSEONG_SET for char in query):
+            start = bisect.bisect_left(choseongs, (query,))
+            prefix = []
+            for choseong, position in choseongs[start:]:
+                if not choseong.startswith(query):
+                    break
+                prefix.append(position)
+            prefix.sort()
+        elif not CHOSEONG_SET.intersection(query):
+            start = bisect.bisect_left(names, query)
+            end = bisect.bisect_left(names, query + "\U0010ffff")
+            prefix = range(start, end)
+        else:
+            prefix = [
+                position
+                for position in self._candidates(grams, query)
+                if len(entries[position][0]) >= len(query)
+                and match_at(entries[position][0], entries[position][1], query, 0)
+            ]
+        prefix = list(islice((position for position in prefix if allowed(position)), limit))
+        if len(prefix) == limit:
+            return [(entries[position][2], entries[position][3]) for position in prefix]
+
+        # 중간 일치: 검색어의 조각이 모두 들어간 재료만 확인
+        prefix_set = set(prefix)
+        infix = []
+        for position in self._candidates(grams, query):
+            if position in prefix_set or not allowed(position):
+                continue
+            name, choseong, _, _ = entries[position]
+            found = find_match(name, choseong, query)
+            if found > 0:
+                infix.append((found, position))
+        infix = heapq.nsmallest(limit - len(prefix), infix)
+
+        results = prefix + [position for _, position in infix]
+        return [(entries[position][2], entries[position][3]) for position in results]
+
+    @staticmethod
+    def _candidates(grams, query):
+        # 검색어의 1글자(검색어가 한 글자일 때) 또는 2글자 조각이 모두 들어간 재료 위치 (적은 목록부터 교집합)
+        size = 1 if len(query) == 1 else 2
+        postings = sorted(
+            (grams.get(query[start : start + size], []) for start in range(len(query) - size + 1)),
+            key=len,
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return sorted(candidates)
+
+
+def invalidate_ingredient_autocomplete():
+    # 재료가 추가/수정/삭제되면 버전을 바꿔서 모든 워커가 다음 검색 때 다시 만들게 함
+    bump_version(AUTOCOMPLETE_VERSION_KEY)
+
+
+ingredient_autocomplete = IngredientAutocomplete()
@@ -1,10 +1,11 @@
 from django.shortcuts import render
-from django.db.models import Q
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 
 from .models import Ingredient
+from .utils.autocomplete_utils import ingredient_autocomplete
+from common.utils.ingredient_index import ingredient_index
 from recipes.models import Recipe_ingredient
 
 
@@ -72,14 +73,17 @@ class IngredientTypeSearchView(APIView):
                 {"status": 400, "message": "잘못된 type입니다."}, status=400
             )
 
-        ingredients = get_ingredients_by_type(type).filter(name__icontains=search)
+        # 키 입력마다 호출되므로 DB 대신 워커 메모리의 자동완성 인덱스에서 검색
+        # fridge 는 레시피에 쓰인 재료만 (재료 -> 레시피 인덱스 기준)
+        ingredient_ids = ingredient_index.ingredient_ids() if type == "fridge" else None
+        ingredients = ingredient_autocomplete.search(search, ingredient_ids)
 
         ingredient_data = [
             {
-                "id": ingredient.id,
-                "name": ingredient.name,
+                "id": ingredient_id,
+                "name": name,
             }
-            for ingredient in ingredients
+            for ingredient_id, name in ingredients
         ]
 
         response_data = {"status": 200, "message": "조회 성공", "data": ingredient_data}
@@ -2,6 +2,7 @@ from django.shortcuts import render
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
+from django.db import transaction
 from .models import Like
 from recipes.models import Recipe
 from users.models import User
@@ -18,7 +19,6 @@ class LikeToggleView(APIView):
         recipe_id = request.data.get("recipe")
         
         try:
-            print(Like.objects.get(user=user, recipe_id=recipe_id))
             Like.objects.get(user=user, recipe_id=recipe_id).delete()
             message = "좋아요 취소"
             status_value = -1
@@ -30,7 +30,9 @@ class LikeToggleView(APIView):
             )
             
         except Like.DoesNotExist:
-            Like.objects.create(user=user, recipe_id=recipe_id)
+            # 좋아요와 레시피 카운터를 한 트랜잭션에서 저장
+            with transaction.atomic():
+                Like.objects.create(user=user, recipe_id=recipe_id)
             message = "좋아요 등록"
             status_value = 1
             
@@ -0,0 +1,18 @@
+from common.utils.command_utils import IntervalCommand
+from main.utils.leaderboard_utils import rollover_leaderboards
+from main.utils.snapshot_utils import invalidate_main_snapshot
+
+
+class Command(IntervalCommand):
+    help = "최근 일별 좋아요/북마크 수를 갱신하고, 주가 바뀌면 지난 주 리더보드를 만듭니다."
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--days", type=int, default=8)
+
+    def run_once(self, **options):
+        week_start = rollover_leaderboards(options["days"])
+        if week_start:
+            # 메인 페이지가 새 주의 1위를 바로 보여주도록 스냅샷 무효화
+            invalidate_main_snapshot()
+            self.stdout.write(f"{week_start} 주 리더보드 생성 완료")
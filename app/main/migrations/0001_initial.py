@@ -0,0 +1,47 @@
+# Generated by Django 5.0.14 on 2026-10-18 15:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('recipes', '0017_recipestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeReactionDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('day', models.DateField()),
+                ('like_count', models.PositiveIntegerField(default=0)),
+                ('bookmark_count', models.PositiveIntegerField(default=0)),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='recipes.recipe')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WeeklyLeaderboard',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('week_start', models.DateField(primary_key=True, serialize=False)),
+                ('best_like_count', models.PositiveIntegerField(default=0)),
+                ('best_bookmark_count', models.PositiveIntegerField(default=0)),
+                ('best_bookmarked_recipe', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='recipes.recipe')),
+                ('best_recipe', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='recipes.recipe')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='recipereactiondaily',
+            constraint=models.UniqueConstraint(fields=('day', 'recipe'), name='main_reaction_daily_unique'),
+        ),
+    ]
@@ -1,3 +1,31 @@
 from django.db import models
+from common.models import CommonDateModel
+from recipes.models import Recipe
 
-# Create your models here.
+
+class RecipeReactionDaily(CommonDateModel):
+    # 레시피별 하루 동안 생긴 좋아요/북마크 수 (기간별 순위는 이 테이블을 합산)
+    day = models.DateField()
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)
+    like_count = models.PositiveIntegerField(default=0)
+    bookmark_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "recipe"], name="main_reaction_daily_unique"
+            ),
+        ]
+
+
+class WeeklyLeaderboard(CommonDateModel):
+    # 지난 주(일요일 시작)에 좋아요/북마크가 가장 많았던 레시피, 주가 끝나면 바뀌지 않음
+    week_start = models.DateField(primary_key=True)
+    best_recipe = models.ForeignKey(
+        Recipe, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    best_like_count = models.PositiveIntegerField(default=0)
+    best_bookmarked_recipe = models.ForeignKey(
+        Recipe, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    best_bookmark_count = models.PositiveIntegerField(default=0)
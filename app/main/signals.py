@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from recipes.models import Recipe
+from likes.models import Like
+from bookmarks.models import Bookmark
+from .utils.snapshot_utils import invalidate_main_snapshot
+
+
+# 레시피가 생기거나 바뀌거나 지워지면 카테고리 목록이 달라지므로 스냅샷 무효화
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_main_snapshot_on_recipe(sender, instance, **kwargs):
+    invalidate_main_snapshot()
+
+
+# 좋아요/북마크 수는 스냅샷에 들어 있는 레시피가 바뀔 때만 무효화
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+@receiver(post_save, sender=Bookmark)
+@receiver(post_delete, sender=Bookmark)
+def invalidate_main_snapshot_on_reaction(sender, instance, **kwargs):
+    invalidate_main_snapshot(instance.recipe_id)
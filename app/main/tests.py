@@ -1,3 +1,171 @@
-from django.test import TestCase
+from datetime import datetime, timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from bookmarks.models import Bookmark
+from config.test_settings import TEST_CACHES
+from likes.models import Like
+from main.models import RecipeReactionDaily, WeeklyLeaderboard
+from main.utils.leaderboard_utils import (
+    get_week_start,
+    get_weekly_leaderboard,
+    refresh_daily_reactions,
+    rollover_leaderboards,
+)
+from main.utils.snapshot_utils import SNAPSHOT_KEY, get_category_recipes, get_main_snapshot
+from recipes.models import Recipe
+from users.models import User
+
+
+@override_settings(CACHES=TEST_CACHES)
+class MainTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(social_id="tester", nickname="tester", age=20, gender=False)
+
+    def create_recipe(self, title, category=1):
+        return Recipe.objects.create(
+            user=self.user, title=title, category=category, main_image="recipes/a.jpg"
+        )
+
+
+class MainSnapshotTests(MainTestCase):
+    def test_category_recipes_are_newest_first_and_limited(self):
+        daily = [self.create_recipe(f"일상 {i}") for i in range(6)]
+        healthy = self.create_recipe("건강", category=2)
+
+        category_recipes = get_category_recipes([1, 2, 3], count=4)
+
+        self.assertEqual(
+            [recipe.id for recipe in category_recipes[1]],
+            [recipe.id for recipe in reversed(daily[2:])],
+        )
+        self.assertEqual([recipe.id for recipe in category_recipes[2]], [healthy.id])
+        self.assertEqual(category_recipes[3], [])
+
+    def test_reaction_invalidates_only_snapshots_containing_the_recipe(self):
+        old = self.create_recipe("오래된 레시피")
+        for i in range(4):
+            self.create_recipe(f"새 레시피 {i}")
+        snapshot = get_main_snapshot()
+        self.assertNotIn(old.id, snapshot["recipe_ids"])
+
+        Like.objects.create(user=self.user, recipe=old)
+        self.assertIsNotNone(cache.get(SNAPSHOT_KEY))
+
+        Like.objects.create(user=self.user, recipe_id=max(snapshot["recipe_ids"]))
+        self.assertIsNone(cache.get(SNAPSHOT_KEY))
+
+    def test_new_recipe_invalidates_snapshot(self):
+        get_main_snapshot()
+        recipe = self.create_recipe("새 레시피")
+        self.assertIsNone(cache.get(SNAPSHOT_KEY))
+        self.assertIn(recipe.id, get_main_snapshot()["recipe_ids"])
+
+
+class MainPageViewTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_viewer_flags_are_added_per_request(self):
+        liked = self.create_recipe("좋아요 누른 레시피")
+        other = self.create_recipe("다른 레시피")
+        Like.objects.create(user=self.user, recipe=liked)
+
+        response = self.client.get("/api/v1/main")
+        self.assertEqual(response.status_code, 200)
+        data = response.data["data"]
+        self.assertEqual(data["detailStatus"], 1)
+        self.assertIsNone(data["best"])
+        statuses = {recipe["recipe_id"]: recipe["like_status"] for recipe in data["daily"]}
+        self.assertEqual(statuses, {liked.id: 1, other.id: -1})
+
+        # 다른 사용자에게는 같은 스냅샷에 자기 상태만 붙음
+        viewer = User.objects.create(social_id="viewer", nickname="viewer")
+        self.client.force_authenticate(viewer)
+        data = self.client.get("/api/v1/main").data["data"]
+        self.assertEqual(data["detailStatus"], -1)
+        self.assertEqual({recipe["like_status"] for recipe in data["daily"]}, {-1})
+        self.assertEqual(
+            {recipe["likes_count"] for recipe in data["daily"] if recipe["recipe_id"] == liked.id},
+            {1},
+        )
+
+    def test_anonymous_user_is_rejected(self):
+        response = APIClient().get("/api/v1/main")
+        self.assertEqual(response.status_code, 404)
+
+
+class WeeklyLeaderboardTests(MainTestCase):
+    def setUp(self):
+        super().setUp()
+        self.week_start = get_week_start()
+        self.first = self.create_recipe("첫 번째")
+        self.second = self.create_recipe("두 번째")
+
+    def react(self, model, recipe, day, social_id):
+        user = User.objects.create(social_id=social_id, nickname=social_id)
+        reaction = model.objects.create(user=user, recipe=recipe)
+        model.objects.filter(id=reaction.id).update(
+            created_at=datetime.combine(day, datetime.min.time()) + timedelta(hours=12)
+        )
+        return reaction
+
+    def test_daily_counts_follow_the_source_rows(self):
+        day = self.week_start + timedelta(days=1)
+        like = self.react(Like, self.first, day, "a")
+        self.react(Like, self.first, day, "b")
+        self.react(Bookmark, self.first, day, "c")
+        end = day + timedelta(days=1)
+
+        refresh_daily_reactions(day, end)
+        daily = RecipeReactionDaily.objects.get(day=day, recipe=self.first)
+        self.assertEqual((daily.like_count, daily.bookmark_count), (2, 1))
+
+        # 좋아요 취소는 다시 계산할 때 반영되고, 원본이 모두 지워진 행은 사라짐
+        like.delete()
+        refresh_daily_reactions(day, end)
+        daily.refresh_from_db()
+        self.assertEqual((daily.like_count, daily.bookmark_count), (1, 1))
+
+        Like.objects.all().delete()
+        Bookmark.objects.all().delete()
+        refresh_daily_reactions(day, end)
+        self.assertFalse(RecipeReactionDaily.objects.exists())
+
+    def test_rollover_builds_last_week_once(self):
+        self.react(Like, self.first, self.week_start, "a")
+        self.react(Like, self.second, self.week_start + timedelta(days=2), "b")
+        self.react(Like, self.second, self.week_start + timedelta(days=3), "c")
+        self.react(Bookmark, self.first, self.week_start + timedelta(days=6), "d")
+        # 지난 주가 끝난 뒤의 좋아요는 세지 않음
+        for i in range(3):
+            self.react(Like, self.first, self.week_start + timedelta(days=7), f"e{i}")
+
+        self.assertEqual(rollover_leaderboards(), self.week_start)
+        board = WeeklyLeaderboard.objects.get(week_start=self.week_start)
+        self.assertEqual((board.best_recipe_id, board.best_like_count), (self.second.id, 2))
+        self.assertEqual(
+            (board.best_bookmarked_recipe_id, board.best_bookmark_count), (self.first.id, 1)
+        )
+        self.assertIsNone(rollover_leaderboards())
+
+    def test_missing_week_falls_back_to_latest_board(self):
+        self.assertIsNone(get_weekly_leaderboard().best_recipe)
+
+        WeeklyLeaderboard.objects.create(
+            week_start=self.week_start - timedelta(days=7), best_recipe=self.first, best_like_count=4
+        )
+        board = get_weekly_leaderboard()
+        self.assertEqual(board.best_recipe, self.first)
+
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        best = client.get("/api/v1/main").data["data"]["best"]
+        self.assertEqual(best["recipe_id"], self.first.id)
+        self.assertEqual(best["likes_count"], 0)
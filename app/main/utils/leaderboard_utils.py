@@ -0,0 +1,143 @@
+from datetime import date, datetime, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from bookmarks.models import Bookmark
+from likes.models import Like
+from main.models import RecipeReactionDaily, WeeklyLeaderboard
+
+DAILY_TABLE = RecipeReactionDaily._meta.db_table
+
+# 일별 수를 다시 계산하는 작업끼리 순서대로 실행되도록 잡는 advisory lock 키
+REFRESH_LOCK_KEY = 7_020_002
+
+# 기간 안에 생긴 좋아요/북마크를 (일, 레시피) 별로 합쳐서 채움
+# 이미 있는 행은 새 값으로 덮어쓰고, 좋아요 취소처럼 원본이 지워져서 합계에 없는 행은 지움
+# (DELETE 와 INSERT 가 다루는 행은 겹치지 않음)
+REFRESH_DAILY_SQL = f"""
+WITH reactions AS (
+    SELECT day, recipe_id, SUM(like_count) AS like_count, SUM(bookmark_count) AS bookmark_count
+    FROM (
+        SELECT created_at::date AS day, recipe_id, COUNT(*) AS like_count, 0 AS bookmark_count
+        FROM {Like._meta.db_table}
+        WHERE created_at >= %(start)s AND created_at < %(end)s
+        GROUP BY created_at::date, recipe_id
+        UNION ALL
+        SELECT created_at::date, recipe_id, 0, COUNT(*)
+        FROM {Bookmark._meta.db_table}
+        WHERE created_at >= %(start)s AND created_at < %(end)s
+        GROUP BY created_at::date, recipe_id
+    ) AS counts
+    GROUP BY day, recipe_id
+),
+removed AS (
+    DELETE FROM {DAILY_TABLE} AS daily
+    WHERE daily.day >= %(start_day)s AND daily.day < %(end_day)s
+    AND NOT EXISTS (
+        SELECT 1 FROM reactions
+        WHERE reactions.day = daily.day AND reactions.recipe_id = daily.recipe_id
+    )
+)
+INSERT INTO {DAILY_TABLE} (created_at, updated_at, day, recipe_id, like_count, bookmark_count)
+SELECT NOW(), NOW(), day, recipe_id, like_count, bookmark_count
+FROM reactions
+ON CONFLICT (day, recipe_id) DO UPDATE SET
+    updated_at = EXCLUDED.updated_at,
+    like_count = EXCLUDED.like_count,
+    bookmark_count = EXCLUDED.bookmark_count
+"""
+
+
+def get_week_start(today=None):
+    # 지난 주 시작일 (일요일)
+    # 파이썬은 월요일을 0으로 계산하기 때문에 일요일부터 계산하기 위해 1일을 추가로 빼줌
+    today = today or date.today()
+    start_of_this_week = today - timedelta(days=today.weekday()) - timedelta(days=1)
+    return start_of_this_week - timedelta(days=7)
+
+
+def refresh_daily_reactions(start_day, end_day):
+    """
+    [start_day, end_day) 기간의 일별 좋아요/북마크 수를 원본에서 다시 계산합니다.
+    기간 안의 행은 새 값으로 덮어쓰고, 좋아요 취소처럼 원본이 지워진 행은 지웁니다.
+    여러 프로세스가 동시에 실행해도 advisory lock 으로 한 번에 하나씩만 갱신합니다.
+    """
+    params = {
+        "start": datetime.combine(start_day, datetime.min.time()),
+        "end": datetime.combine(end_day, datetime.min.time()),
+        "start_day": start_day,
+        "end_day": end_day,
+    }
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [REFRESH_LOCK_KEY])
+        cursor.execute(REFRESH_DAILY_SQL, params)
+
+
+def rank_recipes(start_day, end_day, field, limit=1):
+    # [start_day, end_day) 기간의 일별 수를 합산한 순위 [(recipe_id, 합계)]
+    return list(
+        RecipeReactionDaily.objects.filter(day__gte=start_day, day__lt=end_day)
+        .values("recipe_id")
+        .annotate(total=Sum(field))
+        .filter(total__gt=0)
+        .order_by("-total", "recipe_id")
+        .values_list("recipe_id", "total")[:limit]
+    )
+
+
+def build_weekly_leaderboard(week_start):
+    # 해당 주의 일별 수를 다시 계산한 뒤 1위를 저장
+    week_end = week_start + timedelta(days=7)
+    refresh_daily_reactions(week_start, week_end)
+
+    best = rank_recipes(week_start, week_end, "like_count")
+    best_bookmarked = rank_recipes(week_start, week_end, "bookmark_count")
+    board, _ = WeeklyLeaderboard.objects.update_or_create(
+        week_start=week_start,
+        defaults={
+            "best_recipe_id": best[0][0] if best else None,
+            "best_like_count": best[0][1] if best else 0,
+            "best_bookmarked_recipe_id": best_bookmarked[0][0] if best_bookmarked else None,
+            "best_bookmark_count": best_bookmarked[0][1] if best_bookmarked else 0,
+        },
+    )
+    return board
+
+
+def get_weekly_leaderboard(week_start=None):
+    """
+    지난 주 리더보드를 기본 키로 읽습니다. 1위 레시피와 작성자, 카운터를 함께 가져옵니다.
+    리더보드는 rollover_leaderboards 명령이 만들고 요청 중에는 만들지 않습니다.
+    아직 만들어지지 않았으면 가장 최근 리더보드를, 그것도 없으면 1위가 없는 빈 리더보드를 반환합니다.
+    """
+    week_start = week_start or get_week_start()
+    board = (
+        WeeklyLeaderboard.objects.select_related(
+            "best_recipe__user",
+            "best_recipe__stats",
+            "best_bookmarked_recipe__user",
+            "best_bookmarked_recipe__stats",
+        )
+        .filter(week_start__lte=week_start)
+        .order_by("-week_start")
+        .first()
+    )
+    if board is None:
+        board = WeeklyLeaderboard(week_start=week_start)
+    return board
+
+
+def rollover_leaderboards(days=8):
+    """
+    최근 days 일의 일별 수를 갱신하고, 아직 없는 지난 주 리더보드를 만듭니다.
+    만든 리더보드 주 시작일 (이미 있으면 None) 을 반환합니다.
+    """
+    today = date.today()
+    refresh_daily_reactions(today - timedelta(days=days), today + timedelta(days=1))
+
+    week_start = get_week_start(today)
+    if WeeklyLeaderboard.objects.filter(week_start=week_start).exists():
+        return None
+    build_weekly_leaderboard(week_start)
+    return week_start
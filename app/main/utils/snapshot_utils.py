@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+from common.utils.stats_utils import get_recipe_stats
+from main.serializers import RecipeSerializer
+from .leaderboard_utils import get_weekly_leaderboard
+from recipes.models import Recipe
+
+# 모든 사용자에게 같은 메인 페이지 데이터 (사용자별 좋아요/북마크 여부는 요청마다 덧붙임)
+SNAPSHOT_KEY = "main:snapshot"
+
+# 응답 키와 카테고리 id
+CATEGORIES = {
+    "daily": 1,
+    "healthy": 2,
+    "desert": 3,
+    "midnightSnack": 4,
+}
+
+
+# 지난주 좋아요가 가장 많은 레시피 (없으면 None)
+def get_best_recipe(board):
+    best_recipe = board.best_recipe
+    if best_recipe is not None:
+        best_recipe.likes_count = get_recipe_stats(best_recipe).like_count
+    return best_recipe
+
+
+# 지난주 북마크가 가장 많은 레시피 (없으면 None)
+def get_best_bookmarked_recipe(board):
+    best_bookmarked_recipe = board.best_bookmarked_recipe
+    if best_bookmarked_recipe is not None:
+        best_bookmarked_recipe.bookmarks_count = get_recipe_stats(
+            best_bookmarked_recipe
+        ).bookmark_count
+    return best_bookmarked_recipe
+
+
+# 카테고리마다 보여줄 최신 레시피 수
+CATEGORY_RECIPE_COUNT = 4
+
+
+def get_category_recipes(category_ids, count=CATEGORY_RECIPE_COUNT):
+    """
+    카테고리별 최신 레시피 count 개를 쿼리 한 번으로 가져와서 {category_id: [레시피]} 로 반환합니다.
+    ROW_NUMBER() OVER (PARTITION BY category ORDER BY id DESC) 로 순위를 매기고
+    작성자와 좋아요/북마크 수를 함께 가져옵니다.
+    """
+    recipes = (
+        Recipe.objects.filter(category__in=category_ids)
+        .select_related("user")
+        .annotate(
+            likes_count=Coalesce(F("stats__like_count"), 0),
+            bookmarks_count=Coalesce(F("stats__bookmark_count"), 0),
+            row_number=Window(
+                RowNumber(), partition_by=F("category"), order_by=F("id").desc()
+            ),
+        )
+        .filter(row_number__lte=count)
+        .order_by("category", "row_number")
+    )
+    category_recipes = {category_id: [] for category_id in category_ids}
+    for recipe in recipes:
+        category_recipes[recipe.category].append(recipe)
+    return category_recipes
+
+
+def serialize_recipe(recipe):
+    return dict(RecipeSerializer(recipe).data) if recipe is not None else None
+
+
+def build_main_snapshot():
+    # 지난주 1위는 리더보드에서 기본 키로 읽음
+    board = get_weekly_leaderboard()
+    data = {
+        "best": serialize_recipe(get_best_recipe(board)),
+        "bestBookmarked": serialize_recipe(get_best_bookmarked_recipe(board)),
+    }
+    category_recipes = get_category_recipes(list(CATEGORIES.values()))
+    for key, category_id in CATEGORIES.items():
+        data[key] = [serialize_recipe(recipe) for recipe in category_recipes[category_id]]
+
+    recipe_ids = {recipe["recipe_id"] for recipe in iter_snapshot_recipes(data)}
+    return {"data": data, "recipe_ids": recipe_ids}
+
+
+def iter_snapshot_recipes(data):
+    for key in ("best", "bestBookmarked"):
+        if data[key] is not None:
+            yield data[key]
+    for key in CATEGORIES:
+        yield from data[key]
+
+
+def get_main_snapshot():
+    """
+    메인 페이지 공용 데이터를 캐시에서 꺼냅니다. 없으면 새로 만들어서 MAIN_SNAPSHOT_TIMEOUT 동안 저장합니다.
+    반환값은 {"data": 응답 데이터, "recipe_ids": 포함된 레시피 id 집합} 입니다.
+    """
+    snapshot = cache.get(SNAPSHOT_KEY)
+    if snapshot is None:
+        snapshot = build_main_snapshot()
+        cache.set(SNAPSHOT_KEY, snapshot, timeout=settings.MAIN_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def invalidate_main_snapshot(recipe_id=None):
+    # recipe_id 가 주어지면 스냅샷에 들어 있는 레시피일 때만 무효화
+    if recipe_id is not None:
+        snapshot = cache.get(SNAPSHOT_KEY)
+        if snapshot is None or recipe_id not in snapshot["recipe_ids"]:
+            return
+    cache.delete(SNAPSHOT_KEY)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from common.utils.stats_utils import reconcile_recipe_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "레시피 카운터(좋아요/북마크/댓글/조회 수)를 실제 데이터와 비교해서 다른 행을 다시 계산합니다. "
+        "카운터 행이 없는 레시피는 새로 채웁니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--recipe",
+            type=int,
+            action="append",
+            dest="recipe_ids",
+            help="확인할 레시피 id (여러 번 지정 가능, 없으면 전체)",
+        )
+
+    def handle(self, *args, **options):
+        count = reconcile_recipe_stats(options["recipe_ids"])
+        self.stdout.write(f"{count}개 레시피 카운터 수정 완료")
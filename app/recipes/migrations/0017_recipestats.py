@@ -0,0 +1,68 @@
+# Generated by Django 5.0.14 on 2026-10-18 12:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_recipe_stats(apps, schema_editor):
+    # 기존 레시피의 카운터를 현재 데이터로 채움
+    Recipe = apps.get_model("recipes", "Recipe")
+    RecipeStats = apps.get_model("recipes", "RecipeStats")
+
+    def count_by_recipe(app_label, model_name):
+        model = apps.get_model(app_label, model_name)
+        return dict(
+            model.objects.values("recipe_id")
+            .annotate(count=Count("id"))
+            .values_list("recipe_id", "count")
+        )
+
+    likes = count_by_recipe("likes", "Like")
+    bookmarks = count_by_recipe("bookmarks", "Bookmark")
+    comments = count_by_recipe("comments", "Comment")
+    views = count_by_recipe("collabo", "Interaction")
+
+    RecipeStats.objects.bulk_create(
+        [
+            RecipeStats(
+                recipe_id=recipe_id,
+                like_count=likes.get(recipe_id, 0),
+                bookmark_count=bookmarks.get(recipe_id, 0),
+                comment_count=comments.get(recipe_id, 0),
+                view_count=views.get(recipe_id, 0),
+            )
+            for recipe_id in Recipe.objects.values_list("id", flat=True).iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0016_updated_recipe'),
+        ('likes', '0001_initial'),
+        ('bookmarks', '0001_initial'),
+        ('comments', '0001_initial'),
+        ('collabo', '0007_interaction_user_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeStats',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='recipes.recipe')),
+                ('like_count', models.PositiveIntegerField(default=0)),
+                ('bookmark_count', models.PositiveIntegerField(default=0)),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+                ('view_count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(backfill_recipe_stats, migrations.RunPython.noop),
+    ]
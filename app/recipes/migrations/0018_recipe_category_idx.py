@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0017_recipestats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['category', '-id'], name='recipes_category_idx'),
+        ),
+    ]
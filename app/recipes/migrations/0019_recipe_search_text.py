@@ -0,0 +1,48 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:20
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def backfill_search_text(apps, schema_editor):
+    # 기존 레시피의 검색용 문자열을 제목과 재료 이름으로 채움 (common.utils.search_utils.build_search_text 와 같은 형식)
+    Recipe = apps.get_model("recipes", "Recipe")
+    Recipe_ingredient = apps.get_model("recipes", "Recipe_ingredient")
+
+    ingredient_names = {}
+    for recipe_id, name in Recipe_ingredient.objects.values_list(
+        "recipe_id", "ingredient__name"
+    ).iterator():
+        ingredient_names.setdefault(recipe_id, []).append(name)
+
+    recipes = []
+    for recipe in Recipe.objects.only("id", "title").iterator():
+        title = normalize(recipe.title)
+        parts = [title, title.replace(" ", "")]
+        parts.extend(normalize(name) for name in ingredient_names.get(recipe.id, []))
+        recipe.search_text = "\n".join(part for part in parts if part)
+        recipes.append(recipe)
+    Recipe.objects.bulk_update(recipes, ["search_text"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0018_recipe_category_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+    ]
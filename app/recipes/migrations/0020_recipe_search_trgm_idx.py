@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:20
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0019_recipe_search_text'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='recipes_search_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-19 01:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0020_recipe_search_trgm_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='updated_recipe',
+            index=models.Index(fields=['done', 'updated_at'], name='recipes_updated_done_idx'),
+        ),
+    ]
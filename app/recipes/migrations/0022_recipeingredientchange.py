@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-19 01:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0021_updated_recipe_done_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeIngredientChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('recipe_id', models.BigIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='recipes_ingchange_created_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from common.models import CommonDateModel
 from users.models import User
@@ -19,11 +20,36 @@ class Recipe(CommonDateModel):
     category = models.PositiveIntegerField(choices=CHOICES, default=5)
     story = models.CharField(max_length=255, null=True, blank=True)
     main_image = models.ImageField(upload_to=upload_image, null=True)  # 필수 필드
+    # 검색용 제목 + 재료 이름 (정규화해서 레시피 작성/수정 때 저장)
+    search_text = models.TextField(default="", blank=True)
+
+    class Meta:
+        indexes = [
+            # 메인 페이지 카테고리별 최신 레시피 (ROW_NUMBER() OVER (PARTITION BY category ORDER BY id DESC))
+            models.Index(fields=["category", "-id"], name="recipes_category_idx"),
+            # 검색어 부분 일치 (search_text LIKE '%검색어%')
+            GinIndex(
+                fields=["search_text"],
+                opclasses=["gin_trgm_ops"],
+                name="recipes_search_trgm_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.id}: {self.title}"
 
 
+class RecipeStats(CommonDateModel):
+    # 좋아요/북마크/댓글/조회 수를 쓰기 시점에 갱신해두고 목록에서는 그대로 읽음
+    recipe = models.OneToOneField(
+        Recipe, related_name="stats", on_delete=models.CASCADE, primary_key=True
+    )
+    like_count = models.PositiveIntegerField(default=0)
+    bookmark_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    view_count = models.PositiveBigIntegerField(default=0)
+
+
 class Unit(CommonDateModel):
     id = models.PositiveIntegerField(primary_key=True)
     unit = models.CharField(max_length=20, null=True, blank=True)
@@ -102,4 +128,21 @@ class Temp_step(CommonDateModel):
 class Updated_recipe(CommonDateModel):
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)
     status = models.CharField(max_length=10)
-    done = models.BooleanField(default=False)
\ No newline at end of file
+    done = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # 이웃 파일을 내보낸 뒤 유사도가 반영된 레시피 조회용
+            models.Index(fields=["done", "updated_at"], name="recipes_updated_done_idx"),
+        ]
+
+class RecipeIngredientChange(CommonDateModel):
+    # 재료가 바뀐 레시피 기록 (id 순서대로 읽어서 각 워커의 재료 -> 레시피 인덱스를 갱신)
+    # 삭제된 레시피도 기록해야 하므로 외래 키가 아닌 id 만 저장
+    recipe_id = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            # 오래된 기록 정리용
+            models.Index(fields=["created_at"], name="recipes_ingchange_created_idx"),
+        ]
@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Recipe, Recipe_ingredient, Recipe_step, Unit
 from ingredients.models import Ingredient
@@ -23,33 +24,36 @@ class RecipeSerializer(serializers.ModelSerializer):
         recipe_ingredients_data = self.initial_data.get('recipe_ingredients', [])
         recipe_steps_data = self.initial_data.get('steps', [])
 
-        # Recipe 객체 업데이트
-        instance.title = validated_data.get('title', instance.title)
-        instance.main_image = validated_data.get('main_image', instance.main_image)
-        instance.category = validated_data.get('category', instance.category)
-        instance.story = validated_data.get('story', instance.story)
-        instance.save()
-
-        # Recipe_ingredient 객체 업데이트
-        instance.recipe_ingredient.all().delete()
-        for ingredient_data in recipe_ingredients_data:
-            ingredient, created = Ingredient.objects.get_or_create(
-                name=ingredient_data['name']
-            )
-            unit = Unit.objects.get(id=ingredient_data['unit'])
-            Recipe_ingredient.objects.create(
-                recipe=instance,
-                ingredient=ingredient,
-                unit=unit,
-                quantity=ingredient_data['quantity']
-            )
-
-        # Recipe_step 객체 업데이트
-        instance.recipe_step.all().delete()
-        for step_data in recipe_steps_data:
-            Recipe_step.objects.create(
-                recipe=instance,
-                step=step_data,
-            )
+        # 재료와 단계를 모두 바꾼 뒤 마지막에 레시피를 저장해서 updated_at 을 바꿈
+        # (상세 캐시 키에 updated_at 이 들어가므로 일부만 바뀐 상태가 새 키로 캐시되지 않도록 한 트랜잭션에서 처리)
+        with transaction.atomic():
+            # Recipe_ingredient 객체 업데이트
+            instance.recipe_ingredient.all().delete()
+            for ingredient_data in recipe_ingredients_data:
+                ingredient, created = Ingredient.objects.get_or_create(
+                    name=ingredient_data['name']
+                )
+                unit = Unit.objects.get(id=ingredient_data['unit'])
+                Recipe_ingredient.objects.create(
+                    recipe=instance,
+                    ingredient=ingredient,
+                    unit=unit,
+                    quantity=ingredient_data['quantity']
+                )
+
+            # Recipe_step 객체 업데이트
+            instance.recipe_step.all().delete()
+            for step_data in recipe_steps_data:
+                Recipe_step.objects.create(
+                    recipe=instance,
+                    step=step_data,
+                )
+
+            # Recipe 객체 업데이트
+            instance.title = validated_data.get('title', instance.title)
+            instance.main_image = validated_data.get('main_image', instance.main_image)
+            instance.category = validated_data.get('category', instance.category)
+            instance.story = validated_data.get('story', instance.story)
+            instance.save()
 
         return instance
\ No newline at end of file
@@ -1,8 +1,67 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import Recipe, Updated_recipe
+from .models import Recipe, Recipe_ingredient, RecipeStats, Updated_recipe
+from bookmarks.models import Bookmark
+from comments.models import Comment
+from likes.models import Like
+from common.utils.ingredient_index import ingredient_index
+from common.utils.search_cache import invalidate_search_cache
+from common.utils.search_utils import refresh_search_text_on_commit
+from common.utils.stats_utils import decrease_recipe_stats, increase_recipe_stats
 
 @receiver(post_save, sender=Recipe)
 def create_updated_recipe_on_recipe(sender, instance, created, **kwargs):
     if created:
-        Updated_recipe.objects.create(status='new', recipe=instance)
\ No newline at end of file
+        Updated_recipe.objects.create(status='new', recipe=instance)
+        RecipeStats.objects.create(recipe=instance)
+
+
+@receiver(post_save, sender=Recipe)
+def refresh_search_text_on_recipe(sender, instance, update_fields, **kwargs):
+    # 제목이 바뀌었을 수 있는 저장이면 검색용 문자열 갱신 (제목을 빼고 저장한 경우는 제외)
+    if update_fields is None or "title" in update_fields:
+        refresh_search_text_on_commit([instance.id])
+
+
+@receiver(post_save, sender=Recipe_ingredient)
+@receiver(post_delete, sender=Recipe_ingredient)
+def refresh_search_text_on_recipe_ingredient(sender, instance, **kwargs):
+    # 레시피 재료가 추가/삭제되면 재료 이름이 들어간 검색용 문자열 갱신
+    refresh_search_text_on_commit([instance.recipe_id])
+
+
+@receiver(post_save, sender=Recipe_ingredient)
+@receiver(post_delete, sender=Recipe_ingredient)
+def refresh_ingredient_index_on_recipe_ingredient(sender, instance, **kwargs):
+    # 재료 -> 레시피 인덱스에서 이 레시피만 다시 읽게 함 (레시피 삭제는 재료 행 삭제로 함께 반영)
+    ingredient_index.refresh_recipe(instance.recipe_id)
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_from_search(sender, instance, **kwargs):
+    # 검색 결과 캐시에서 삭제된 레시피 제외
+    transaction.on_commit(invalidate_search_cache)
+
+
+# 좋아요/북마크/댓글이 생기거나 지워질 때 레시피 카운터 갱신
+STAT_FIELDS = {
+    Like: "like_count",
+    Bookmark: "bookmark_count",
+    Comment: "comment_count",
+}
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Bookmark)
+@receiver(post_save, sender=Comment)
+def increase_recipe_stats_on_create(sender, instance, created, **kwargs):
+    if created:
+        increase_recipe_stats(instance.recipe_id, **{STAT_FIELDS[sender]: 1})
+
+
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Bookmark)
+@receiver(post_delete, sender=Comment)
+def decrease_recipe_stats_on_delete(sender, instance, **kwargs):
+    decrease_recipe_stats(instance.recipe_id, **{STAT_FIELDS[sender]: 1})
@@ -1,3 +1,208 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from bookmarks.models import Bookmark
+from collabo.models import Group, Score
+from comments.models import Comment
+from common.utils.detail_utils import get_recipe_detail, recipe_detail_cache_key
+from common.utils.stats_utils import reconcile_recipe_stats
+from config.test_settings import TEST_CACHES
+from ingredients.models import Ingredient
+from likes.models import Like
+from recipes.models import Recipe, Recipe_ingredient, Recipe_step, RecipeStats, Unit
+from recipes.serializers import RecipeSerializer
+from users.models import User
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RecipeTestCase(TestCase):
+    def setUp(self):
+        # 레시피 수정 serializer 가 id=1 사용자를 가져오므로 id 를 지정
+        self.user = User.objects.create(id=1, social_id="tester", nickname="tester", age=20, gender=False)
+        self.unit = Unit.objects.create(id=1, unit="g")
+        self.recipe = Recipe.objects.create(user=self.user, title="김치 찌개", category=1)
+
+
+class RecipeStatsSignalTests(RecipeTestCase):
+    def get_stats(self):
+        return RecipeStats.objects.get(recipe=self.recipe)
+
+    def test_new_recipe_starts_with_zero_counters(self):
+        stats = self.get_stats()
+        self.assertEqual(
+            (stats.like_count, stats.bookmark_count, stats.comment_count, stats.view_count),
+            (0, 0, 0, 0),
+        )
+
+    def test_reactions_update_counters(self):
+        like = Like.objects.create(user=self.user, recipe=self.recipe)
+        Bookmark.objects.create(user=self.user, recipe=self.recipe)
+        Comment.objects.create(user=self.user, recipe=self.recipe, comment="맛있어요")
+        Comment.objects.create(user=self.user, recipe=self.recipe, comment="또 할게요")
+        stats = self.get_stats()
+        self.assertEqual(
+            (stats.like_count, stats.bookmark_count, stats.comment_count), (1, 1, 2)
+        )
+
+        like.delete()
+        Comment.objects.filter(recipe=self.recipe).delete()
+        stats = self.get_stats()
+        self.assertEqual(
+            (stats.like_count, stats.bookmark_count, stats.comment_count), (0, 1, 0)
+        )
+
+    def test_missing_counter_row_is_filled_from_real_counts(self):
+        Like.objects.create(user=self.user, recipe=self.recipe)
+        RecipeStats.objects.filter(recipe=self.recipe).delete()
+        Bookmark.objects.create(user=self.user, recipe=self.recipe)
+        stats = self.get_stats()
+        self.assertEqual((stats.like_count, stats.bookmark_count), (1, 1))
+
+    def test_reconcile_fixes_drifted_counters(self):
+        Like.objects.create(user=self.user, recipe=self.recipe)
+        RecipeStats.objects.filter(recipe=self.recipe).update(like_count=5, comment_count=2)
+
+        self.assertEqual(reconcile_recipe_stats([self.recipe.id]), 1)
+        stats = self.get_stats()
+        self.assertEqual((stats.like_count, stats.comment_count), (1, 0))
+        self.assertEqual(reconcile_recipe_stats([self.recipe.id]), 0)
+
+
+
+class SearchTextSignalTests(RecipeTestCase):
+    def get_search_text(self):
+        return Recipe.objects.get(id=self.recipe.id).search_text
+
+    def add_ingredient(self, ingredient):
+        with self.captureOnCommitCallbacks(execute=True):
+            Recipe_ingredient.objects.create(
+                recipe=self.recipe, ingredient=ingredient, unit=self.unit, quantity=1
+            )
+
+    def test_ingredient_rows_and_renames_refresh_search_text(self):
+        onion = Ingredient.objects.create(name="양파")
+        self.add_ingredient(onion)
+        self.assertEqual(self.get_search_text(), "김치 찌개\n김치찌개\n양파")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            onion.name = "적양파"
+            onion.save()
+        self.assertEqual(self.get_search_text(), "김치 찌개\n김치찌개\n적양파")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Recipe_ingredient.objects.filter(recipe=self.recipe).delete()
+        self.assertEqual(self.get_search_text(), "김치 찌개\n김치찌개")
+
+    def test_title_change_refreshes_search_text(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.title = "된장국"
+            self.recipe.save()
+        self.assertEqual(self.get_search_text(), "된장국\n된장국")
+
+
+class RecipeSearchKeywordViewTests(RecipeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            Recipe.objects.filter(id=self.recipe.id).update(main_image="recipes/a.jpg")
+            self.stew = Recipe.objects.create(
+                user=self.user, title="돼지고기 김치찜", category=1, main_image="recipes/a.jpg"
+            )
+            self.fried_rice = Recipe.objects.create(
+                user=self.user, title="볶음밥", category=1, main_image="recipes/a.jpg"
+            )
+            Recipe_ingredient.objects.create(
+                recipe=self.fried_rice,
+                ingredient=Ingredient.objects.create(name="김치"),
+                unit=self.unit,
+                quantity=1,
+            )
+
+    def search(self, keyword):
+        return self.client.get(f"/api/v1/recipes/search/{keyword}")
+
+    def test_title_prefix_then_title_then_ingredient(self):
+        response = self.search("김치")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [recipe["id"] for recipe in response.data["data"]],
+            [self.recipe.id, self.stew.id, self.fried_rice.id],
+        )
+        # 띄어 쓴 제목도 붙여 쓴 검색어로 찾음
+        self.assertEqual(
+            [recipe["id"] for recipe in self.search("김치찌개").data["data"]], [self.recipe.id]
+        )
+
+    def test_new_recipe_invalidates_cached_results(self):
+        self.assertEqual(self.search("된장").status_code, 404)
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = Recipe.objects.create(
+                user=self.user, title="된장 찌개", category=1, main_image="recipes/a.jpg"
+            )
+        response = self.search("된장")
+        self.assertEqual([recipe["id"] for recipe in response.data["data"]], [recipe.id])
+
+    def test_blank_keyword_is_rejected(self):
+        self.assertEqual(self.search("%20").status_code, 400)
+
+class RecipeCategoryListViewTests(RecipeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Recipe.objects.filter(id=self.recipe.id).update(main_image="recipes/a.jpg")
+        self.others = [
+            Recipe.objects.create(user=self.user, title=title, category=1, main_image="recipes/a.jpg")
+            for title in ("된장 찌개", "순두부 찌개")
+        ]
+        Recipe.objects.create(user=self.user, title="샐러드", category=2, main_image="recipes/a.jpg")
+
+    def test_returns_whole_category_with_recommended_first(self):
+        # 사용자(남성 20대) 그룹에서 인기 있는 레시피가 맨 앞
+        group = Group.objects.create(id=2, gender=False, age=20)
+        Score.objects.create(recipe=self.others[1], group=group, score=3)
+
+        response = self.client.get("/api/v1/recipes/category/daily")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("page", response.data)
+        ids = [recipe["id"] for recipe in response.data["data"]]
+        self.assertEqual(ids[0], self.others[1].id)
+        self.assertEqual(
+            set(ids), {self.recipe.id, self.others[0].id, self.others[1].id}
+        )
+
+    def test_unknown_category_is_not_found(self):
+        response = self.client.get("/api/v1/recipes/category/unknown")
+        self.assertEqual(response.status_code, 404)
+
+
+class RecipeDetailCacheTests(RecipeTestCase):
+    def test_update_caches_new_detail_under_new_key(self):
+        Recipe_step.objects.create(recipe=self.recipe, step="끓이기")
+        recipe = Recipe.objects.get(id=self.recipe.id)
+        old_key = recipe_detail_cache_key(recipe)
+        self.assertEqual(get_recipe_detail(recipe)["steps"], [{"step": "끓이기", "image": ""}])
+        self.assertIsNotNone(cache.get(old_key))
+
+        serializer = RecipeSerializer(
+            recipe,
+            data={
+                "title": "김치찌개",
+                "recipe_ingredients": [{"name": "김치", "unit": self.unit.id, "quantity": 1}],
+                "steps": ["썰기", "끓이기"],
+            },
+            partial=True,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        recipe = Recipe.objects.get(id=self.recipe.id)
+        self.assertNotEqual(recipe_detail_cache_key(recipe), old_key)
+        detail = get_recipe_detail(recipe)
+        self.assertEqual(detail["recipe"]["title"], "김치찌개")
+        self.assertEqual([ingredient["name"] for ingredient in detail["ingredients"]], ["김치"])
+        self.assertEqual([step["step"] for step in detail["steps"]], ["썰기", "끓이기"])
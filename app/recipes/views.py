@@ -1,19 +1,31 @@
 from django.shortcuts import render
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Exists, OuterRef
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.exceptions import NotFound
 
-from .models import Recipe, Recipe_ingredient, Recipe_step
-from .serializers import RecipeSerializer, Recipe_stepSerializer
+from .models import Recipe, Recipe_ingredient
+from .serializers import Recipe_stepSerializer
 from ingredients.models import Ingredient
 from bookmarks.models import Bookmark
 from likes.models import Like
 from comments.models import Comment
-from users.models import User
 
 from collabo.utils.interaction_utils import create_interaction
+from common.utils.detail_utils import get_recipe_detail
+from common.utils.fridge_utils import (
+    get_recipe_ingredients,
+    parse_fridge_cursor,
+    rank_fridge_recipes,
+)
+from common.utils.search_utils import (
+    get_search_results,
+    normalize_search_text,
+)
+from common.utils.stats_utils import get_recipe_stats
+from common.utils.viewer_utils import load_viewer_state
 
 class RecipeRecommendView(APIView):
     def post(self, request):
@@ -24,85 +36,69 @@ class RecipeRecommendView(APIView):
                 {"status": 400, "message": "사용자 인증이 필요합니다."}, status=400
             )
 
-            return Response(
-                {"status": 400, "message": "사용자 인증이 필요합니다."}, status=400
-            )
-
         data = request.data
         ingredient_ids = data.get("ingredients", [])
+        # 이전 페이지 응답의 nextCursor (첫 페이지는 없음)
+        cursor = data.get("cursor")
+        try:
+            cursor = parse_fridge_cursor(cursor) if cursor else None
+        except (AttributeError, ValueError):
+            return Response(
+                {"status": 400, "message": "cursor 형식이 올바르지 않습니다."}, status=400
+            )
 
         # 입력된 재료 ID로 실제 재료 객체 조회
-        ingredients = Ingredient.objects.filter(id__in=ingredient_ids)
+        ingredients = list(Ingredient.objects.filter(id__in=ingredient_ids))
         # 조회된 재료 객체의 이름 목록 생성
         ingredient_names = [ingredient.name for ingredient in ingredients]
+        fridge_ids = {ingredient.id for ingredient in ingredients}
 
-        # 입력된 재료를 포함하는 레시피 목록 조회
-        ## 유사도에서 
-        recipes = Recipe.objects.filter(
-            recipe_ingredient__ingredient__in=ingredients
-        ).distinct()
+        # 입력된 재료를 포함하는 레시피를 재료 충족률 순으로 정렬해서 한 페이지만 조회
+        recipes, next_cursor = rank_fridge_recipes(fridge_ids, cursor=cursor)
+        recipe_ids = [recipe.id for recipe in recipes]
+
+        # 페이지에 포함된 레시피의 재료와 사용자의 좋아요/북마크 상태를 한 번에 조회
+        recipe_ingredients = get_recipe_ingredients(recipe_ids)
+        viewer_state = load_viewer_state(user_id, recipe_ids)
 
         # 레시피 정보를 담을 리스트 초기화
         recipe_data = []
         for recipe in recipes:
-            # 레시피 작성자 정보 가져오기
-            user = User.objects.get(id=recipe.user_id)
-            # 레시피 좋아요 수 가져오기
-            like = Like.objects.filter(recipe_id=recipe.id).count()
-            # 레시피 북마크 수 가져오기
-            bookmark = Bookmark.objects.filter(recipe_id=recipe.id).count()
-
-            # 사용자의 좋아요 및 북마크 상태 확인
-            like_status = (
-                Like.objects.filter(recipe_id=recipe.id, user_id=user_id)
-                .values_list("id", flat=True)
-                .first()
-            )
-            if like_status:
-                like_status = 1
-            else:
-                like_status = -1
-
-            bookmark_status = (
-                Bookmark.objects.filter(recipe_id=recipe.id, user_id=user_id)
-                .values_list("id", flat=True)
-                .first()
-            )
-            if bookmark_status:
-                bookmark_status = 1
-            else:
-                bookmark_status = -1
-
-            # 레시피에 포함된 재료 이름 목록 생성
-            recipe_ingredients = [
-                item.ingredient.name for item in recipe.recipe_ingredient.all()
-            ]
-
-            # 입력된 재료 중 레시피에 포함된 재료와 포함되지 않은 재료 구분
+            # 입력된 재료 중 레시피에 포함된 재료와 레시피에 있지만 입력되지 않은 재료 구분
+            items = recipe_ingredients[recipe.id]
+            included_ids = {ingredient_id for ingredient_id, _ in items}
             include_ingredients = [
-                name for name in ingredient_names if name in recipe_ingredients
+                ingredient.name
+                for ingredient in ingredients
+                if ingredient.id in included_ids
             ]
             not_include_ingredients = [
-                name for name in recipe_ingredients if name not in include_ingredients
+                name for ingredient_id, name in items if ingredient_id not in fridge_ids
             ]
 
             recipe_info = {
                 "recipe_id": recipe.id,
-                "nickname": user.nickname,
+                "nickname": recipe.user.nickname,
                 "include_ingredients": include_ingredients,
                 "not_include_ingredients": not_include_ingredients,
+                "coverage": round(recipe.coverage, 2),
                 "title": recipe.title,
-                "likes": like,
-                "bookmark": bookmark,
-                "like_status": like_status,
-                "bookmark_status": bookmark_status,
+                "likes": viewer_state.like_count(recipe.id),
+                "bookmark": viewer_state.bookmark_count(recipe.id),
+                "like_status": viewer_state.like_status(recipe.id),
+                "bookmark_status": viewer_state.bookmark_status(recipe.id),
             }
             recipe_data.append(recipe_info)
 
         response_data = {
             "status": 200,
             "message": "조회 성공",
-            "data": {"ingredients": ingredient_names, "recipes": recipe_data},
+            "data": {
+                "ingredients": ingredient_names,
+                "recipes": recipe_data,
+                "nextCursor": next_cursor,
+                "hasNext": next_cursor is not None,
+            },
         }
 
         # 응답 반환
@@ -219,81 +215,83 @@ class CreateRecipe(APIView):
             )
 
         try:
-            temp_recipe = Temp_recipe.objects.filter(user_id=user_id, status=1).first()
-
-            if not temp_recipe:
-                return Response(
-                    {"error": "Temporary recipe not found."},
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-
-            # 요청 데이터를 복사하여 수정 가능하게 만듭니다.
-            data = request.data.copy()
-
-            recipe_ingredients_data = data.pop("recipe_ingredients", [])
-            steps_data = data.pop("steps", [])
-
-            recipe = Recipe.objects.create(user_id=user_id, **data)
-            temp_recipe.recipe = recipe
-            temp_recipe.save()
-
-            # recipe_ingredients 데이터 처리
-            for ingredient_data in recipe_ingredients_data:
-                ingredient_name = ingredient_data.get("name", None)
-                unit_id = ingredient_data.get("unit")
-                quantity = ingredient_data.get("quantity")
-
-                # 재료를 DB에서 찾거나 없으면 새로 생성
-                try:
-                    ingredient = Ingredient.objects.get(name=ingredient_name)
-                except Ingredient.DoesNotExist:
-                    # 존재하지 않는 경우 새로운 재료 생성
-                    ingredient = Ingredient.objects.create(name=ingredient_name)
-
-                # 단위 객체 가져오기
-                unit = Unit.objects.get(id=unit_id)
-
-                # RecipeIngredient 생성
-                Recipe_ingredient.objects.create(
-                    recipe=recipe, ingredient=ingredient, quantity=quantity, unit=unit
-                )
-
-            if temp_recipe.main_image:
-                main_image_source = temp_recipe.main_image.name
-                main_image_dest = f"{BUCKET_PATH}recipe/{recipe.id}/{os.path.basename(main_image_source)}"
-                copy_file(main_image_source, main_image_dest)
-
-                recipe.main_image = main_image_dest
-                recipe.save()
-
-            temp_steps = Temp_step.objects.filter(recipe=temp_recipe).order_by("order")
-            count = 0
-
-            for i, step_text in enumerate(steps_data, 1):
-                temp_image = None
-                if temp_steps and count < len(temp_steps):
-                    if i == temp_steps[count].order:
-                        temp_image = temp_steps[count].image
-                        count += 1
-
-                step_data = {"recipe": recipe.id, "step": step_text}
-                step_serializer = Recipe_stepSerializer(data=step_data)
-
-                if step_serializer.is_valid():
-                    recipe_step = step_serializer.save()
-                    if temp_image:
-                        temp_image_source = temp_image.name
-                        temp_image_dest = f"{BUCKET_PATH}recipe/{recipe.id}/{os.path.basename(temp_image_source)}"
-                        copy_file(temp_image_source, temp_image_dest)
-
-                        recipe_step.image = temp_image_dest
-                        recipe_step.save()
-                else:
-                    print("Errors:", step_serializer.errors)
-
-            # temp_recipe 상태 업데이트
-            temp_recipe.status = 0
-            temp_recipe.save()
+            # 레시피, 재료, 단계가 모두 저장된 뒤에만 보이도록 (상세 캐시에 일부만 저장되지 않게) 한 트랜잭션에서 처리
+            with transaction.atomic():
+                temp_recipe = Temp_recipe.objects.filter(user_id=user_id, status=1).first()
+
+                if not temp_recipe:
+                    return Response(
+                        {"error": "Temporary recipe not found."},
+                        status=status.HTTP_404_NOT_FOUND,
+                    )
+
+                # 요청 데이터를 복사하여 수정 가능하게 만듭니다.
+                data = request.data.copy()
+
+                recipe_ingredients_data = data.pop("recipe_ingredients", [])
+                steps_data = data.pop("steps", [])
+
+                recipe = Recipe.objects.create(user_id=user_id, **data)
+                temp_recipe.recipe = recipe
+                temp_recipe.save()
+
+                # recipe_ingredients 데이터 처리
+                for ingredient_data in recipe_ingredients_data:
+                    ingredient_name = ingredient_data.get("name", None)
+                    unit_id = ingredient_data.get("unit")
+                    quantity = ingredient_data.get("quantity")
+
+                    # 재료를 DB에서 찾거나 없으면 새로 생성
+                    try:
+                        ingredient = Ingredient.objects.get(name=ingredient_name)
+                    except Ingredient.DoesNotExist:
+                        # 존재하지 않는 경우 새로운 재료 생성
+                        ingredient = Ingredient.objects.create(name=ingredient_name)
+
+                    # 단위 객체 가져오기
+                    unit = Unit.objects.get(id=unit_id)
+
+                    # RecipeIngredient 생성
+                    Recipe_ingredient.objects.create(
+                        recipe=recipe, ingredient=ingredient, quantity=quantity, unit=unit
+                    )
+
+                if temp_recipe.main_image:
+                    main_image_source = temp_recipe.main_image.name
+                    main_image_dest = f"{BUCKET_PATH}recipe/{recipe.id}/{os.path.basename(main_image_source)}"
+                    copy_file(main_image_source, main_image_dest)
+
+                    recipe.main_image = main_image_dest
+                    recipe.save()
+
+                temp_steps = Temp_step.objects.filter(recipe=temp_recipe).order_by("order")
+                count = 0
+
+                for i, step_text in enumerate(steps_data, 1):
+                    temp_image = None
+                    if temp_steps and count < len(temp_steps):
+                        if i == temp_steps[count].order:
+                            temp_image = temp_steps[count].image
+                            count += 1
+
+                    step_data = {"recipe": recipe.id, "step": step_text}
+                    step_serializer = Recipe_stepSerializer(data=step_data)
+
+                    if step_serializer.is_valid():
+                        recipe_step = step_serializer.save()
+                        if temp_image:
+                            temp_image_source = temp_image.name
+                            temp_image_dest = f"{BUCKET_PATH}recipe/{recipe.id}/{os.path.basename(temp_image_source)}"
+                            copy_file(temp_image_source, temp_image_dest)
+
+                            recipe_step.image = temp_image_dest
+                            recipe_step.save()
+                    else:
+                        print("Errors:", step_serializer.errors)
+
+                # temp_recipe 상태 업데이트
+                temp_recipe.status = 0
+                temp_recipe.save()
 
             response_data = {
                 "status": 201,
@@ -311,31 +309,36 @@ class CreateRecipe(APIView):
 class RecipeDetailDeleteView(APIView):
     def get(self, request, id):
         try:
-            recipe = Recipe.objects.get(pk=id)
-            bookmarks_count = Bookmark.objects.filter(recipe_id=id).count()
-            likes_count = Like.objects.filter(recipe_id=id).count()
-
-            # 테스트용 user_id 하드코딩
             user = request.user
-            if user:
-
-                like_status = Like.objects.filter(recipe_id=id, user_id=user.id).first()
-
-                bookmark_status = Bookmark.objects.filter(
-                    recipe_id=id, user_id=user.id
-                ).first()
+            user_id = user.id if user else None
+
+            # 레시피, 작성자, 카운터, 사용자의 좋아요/북마크 여부를 쿼리 한 번으로 조회
+            recipe = (
+                Recipe.objects.select_related("user", "stats")
+                .annotate(
+                    is_liked=Exists(
+                        Like.objects.filter(recipe_id=OuterRef("pk"), user_id=user_id)
+                    ),
+                    is_bookmarked=Exists(
+                        Bookmark.objects.filter(recipe_id=OuterRef("pk"), user_id=user_id)
+                    ),
+                )
+                .get(pk=id)
+            )
+            stats = get_recipe_stats(recipe)
 
-            like_status = 1 if user and like_status else -1
-            bookmark_status = 1 if user and bookmark_status else -1
+            like_status = 1 if recipe.is_liked else -1
+            bookmark_status = 1 if recipe.is_bookmarked else -1
 
             # is_staff 값이 True이거나 user.id가 본인이면 canUpdate를 1로 설정
-            if user and (user.is_staff or user.id == recipe.user.id):
+            if user and (user.is_staff or user.id == recipe.user_id):
                 can_update = 1
             else:
                 can_update = 0
 
-            ingredients = Recipe_ingredient.objects.filter(recipe_id=id).order_by("id")
-            steps = Recipe_step.objects.filter(recipe_id=id).order_by("id")
+            # 레시피 필드, 재료, 단계는 (id, updated_at) 으로 캐시된 것을 사용
+            detail = get_recipe_detail(recipe)
+
             comments = (
                 Comment.objects.filter(recipe_id=id)
                 .select_related("user")
@@ -369,16 +372,15 @@ class RecipeDetailDeleteView(APIView):
                     }
                 )
 
-            serializer = RecipeSerializer(recipe)
             data = {
                 "status": status.HTTP_200_OK,
                 "message": "레시피 조회 성공",
                 "data": {
                     "can_update": can_update,
-                    **serializer.data,
-                    "like": likes_count,
+                    **detail["recipe"],
+                    "like": stats.like_count,
                     "like_status": like_status,
-                    "book": bookmarks_count,
+                    "book": stats.bookmark_count,
                     "book_status": bookmark_status,
                     "user": {
                         "id": recipe.user.id,
@@ -386,22 +388,8 @@ class RecipeDetailDeleteView(APIView):
                         "profile_image": get_image_uri(recipe.user.image),
                         "date": recipe.updated_at,
                     },
-                    "ingredients": [
-                        {
-                            "id": ingredient.id,
-                            "name": ingredient.ingredient.name,
-                            "quantity": ingredient.quantity,
-                            "unit": ingredient.unit.unit,
-                        }
-                        for ingredient in ingredients
-                    ],
-                    "steps": [
-                        {
-                            "step": step.step,
-                            "image": step.image.url if step.image else "",
-                        }
-                        for step in steps
-                    ],
+                    "ingredients": detail["ingredients"],
+                    "steps": detail["steps"],
                     "comments": comment_data,
                 },
             }
@@ -430,7 +418,26 @@ class RecipeDetailDeleteView(APIView):
         data = {"status": 200, "message": "레시피 삭제 성공"}
         return Response(data, status=status.HTTP_200_OK)
 
-from collabo.utils.similary_utils import get_recommend_recipes
+from collabo.utils.similary_utils import get_recommend_recipes, get_user_recommend_ids
+
+
+def get_recipe_list_data(recipes, user_id):
+    # 목록 응답 데이터 (좋아요/북마크 여부와 수는 목록 길이와 상관없이 쿼리 두 번으로 조회)
+    viewer_state = load_viewer_state(user_id, [recipe.id for recipe in recipes])
+    return [
+        {
+            "id": recipe.id,
+            "user": recipe.user.nickname,
+            "title": recipe.title,
+            "main_image": recipe.main_image.url,
+            "like": viewer_state.like_count(recipe.id),
+            "like_status": viewer_state.like_status(recipe.id),
+            "book": viewer_state.bookmark_count(recipe.id),
+            "book_status": viewer_state.bookmark_status(recipe.id),
+        }
+        for recipe in recipes
+    ]
+
 
 class RecipeCategoryListView(APIView):
     def get_category_name(self, category):
@@ -448,14 +455,24 @@ class RecipeCategoryListView(APIView):
 
         if category == "like":
             # 사용자가 좋아요를 누른 레시피만 필터링
-            filtered_recipes = Recipe.objects.filter(like__user_id=user_id)
+            filtered_recipes = Recipe.objects.filter(
+                like__user_id=user_id
+            ).select_related("user")
         elif category == "book":
             # 사용자가 북마크한 레시피만 필터링
-            filtered_recipes = Recipe.objects.filter(bookmark__user_id=user_id)
+            filtered_recipes = Recipe.objects.filter(
+                bookmark__user_id=user_id
+            ).select_related("user")
         elif category_name:
             similar_recipes, updated_recipes = get_recommend_recipes(user_id)
-            filtered_similar_recipes = similar_recipes.filter(category=category_name)
-            filtered_updated_recipes = updated_recipes.filter(category=category_name) if updated_recipes else []
+            filtered_similar_recipes = similar_recipes.filter(
+                category=category_name
+            ).select_related("user")
+            filtered_updated_recipes = (
+                updated_recipes.filter(category=category_name).select_related("user")
+                if updated_recipes is not None
+                else []
+            )
             filtered_recipes = list(filtered_similar_recipes) + list(filtered_updated_recipes)
         else:
             return Response(
@@ -465,27 +482,7 @@ class RecipeCategoryListView(APIView):
                 },
                 status=status.HTTP_404_NOT_FOUND,
             )
-        limit_recipe = filtered_recipes
-        recipe_data = []
-        for recipe in limit_recipe:
-            user = User.objects.get(id=recipe.user_id)
-            like = Like.objects.filter(recipe_id=recipe.id, user_id=user_id).first()
-            book = Bookmark.objects.filter(recipe_id=recipe.id, user_id=user_id).first()
-
-            like_status = 1 if like else -1
-            book_status = 1 if book else -1
-
-            recipe_info = {
-                "id": recipe.id,
-                "user": user.nickname,
-                "title": recipe.title,
-                "main_image": recipe.main_image.url,
-                "like": Like.objects.filter(recipe_id=recipe.id).count(),
-                "like_status": like_status,
-                "book": Bookmark.objects.filter(recipe_id=recipe.id).count(),
-                "book_status": book_status,
-            }
-            recipe_data.append(recipe_info)
+        recipe_data = get_recipe_list_data(filtered_recipes, user_id)
 
         response_data = {
             "status": 200,
@@ -503,44 +500,34 @@ class RecipeCategoryListView(APIView):
 class RecipeSearchKeywordView(APIView):
     def get(self, request, keyword):
         user_id = request.user.id
-        if not keyword:
+        if not normalize_search_text(keyword):
             return Response({"message": "검색어를 입력해 주세요."}, status=400)
 
-        similar_recipes, updated_recipes = get_recommend_recipes(user_id)
-        filtered_similer_recipes = similar_recipes.filter(
-            Q(title__icontains=keyword)
-            | Q(recipe_ingredient__ingredient__name__icontains=keyword)
-        ).distinct()
-        filtered_updated_recipes = updated_recipes.filter(
-            Q(title__icontains=keyword)
-            | Q(recipe_ingredient__ingredient__name__icontains=keyword)
-        ).distinct()
-
-        filtered_recipes = list(filtered_similer_recipes) + list(filtered_updated_recipes)
-
-        if not filtered_recipes:
+        # 검색 결과(검색 순위, 상호작용 수 순)는 검색어별로 캐시된 것을 사용
+        results = get_search_results(keyword)
+        if not results:
             return Response({"message": "해당되는 레시피가 없습니다."}, status=404)
 
-        recipe_data = []
-        for recipe in filtered_recipes:
-            user = User.objects.get(id=recipe.user_id)
-            like = Like.objects.filter(recipe_id=recipe.id, user_id=user_id).first()
-            book = Bookmark.objects.filter(recipe_id=recipe.id, user_id=user_id).first()
-
-            like_status = 1 if like else -1
-            book_status = 1 if book else -1
-
-            recipe_info = {
-                "id": recipe.id,
-                "user": user.nickname,
-                "title": recipe.title,
-                "main_image": recipe.main_image.url,
-                "like": Like.objects.filter(recipe_id=recipe.id).count(),
-                "like_status": like_status,
-                "book": Bookmark.objects.filter(recipe_id=recipe.id).count(),
-                "book_status": book_status,
-            }
-            recipe_data.append(recipe_info)
+        # 같은 검색 순위 안에서는 사용자의 추천 레시피를 추천 순서대로 앞에 둠
+        recommend_order = {
+            recipe_id: order
+            for order, recipe_id in enumerate(get_user_recommend_ids(user_id))
+        }
+        results = sorted(
+            results,
+            key=lambda result: (
+                -result[1],
+                recommend_order.get(result[0], len(recommend_order)),
+            ),
+        )
+        recipes = Recipe.objects.select_related("user").in_bulk(
+            [recipe_id for recipe_id, _ in results]
+        )
+        filtered_recipes = [
+            recipes[recipe_id] for recipe_id, _ in results if recipe_id in recipes
+        ]
+
+        recipe_data = get_recipe_list_data(filtered_recipes, user_id)
 
         response_data = {
             "status": 200,
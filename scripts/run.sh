@@ -2,4 +2,5 @@
 set -e
 python manage.py collectstatic --noinput
 python manage.py migrate
-gunicorn --bind 0.0.0.0:8000 config.wsgi:application
+# 워커 수, 로그, worker_exit 훅(남은 조회 기록 저장)은 설정 파일에서 읽음
+gunicorn -c gunicorn/gunicorn_config.py config.wsgi:application